@@ -0,0 +1,79 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+   DigitalOut custom pattern bit packing throughput.
+
+   Compares dwf.pack_bits / dwf.interleave_tristate (NumPy and pure Python
+   paths) with the per-bit loop FDwfDigitalOutDataSet used before.
+
+   Requires:
+       Python 3, numpy (optional)
+"""
+
+import random
+import timeit
+
+import dwf
+import dwf.lowlevel
+
+N_BITS = 1 << 20
+REPEAT = 5
+
+def legacy_pack(rgBits):
+    '''Per-bit loop, as FDwfDigitalOutDataSet used to pack the data'''
+    result = bytearray((len(rgBits) + 7) // 8)
+    index = 0
+    byte = 0x00
+    mask = 0x01
+    for io in rgBits:
+        if io: byte |= mask
+        mask <<= 1
+        if mask > 0x80:
+            result[index] = byte
+            mask = 0x01
+            byte = 0x00
+            index += 1
+    if index != len(result):
+        result[index] = byte
+    return bytes(result)
+
+def report(name, func, bits):
+    seconds = min(timeit.repeat(func, number=1, repeat=REPEAT))
+    print("%-32s %10.1f Mbit/s" % (name, bits / seconds / 1e6))
+
+bits = [random.random() < 0.5 for _ in range(N_BITS)]
+io = bits[0::2]
+oe = bits[1::2]
+assert legacy_pack(bits) == dwf.pack_bits(bits)
+
+report("legacy loop", lambda: legacy_pack(bits), N_BITS)
+
+backends = [('python', None)]
+if dwf.lowlevel._np is not None:
+    np = dwf.lowlevel._np
+    backends.insert(0, ('numpy', np))
+
+for name, module in backends:
+    saved = dwf.lowlevel._np
+    dwf.lowlevel._np = module
+    try:
+        data = bytes(bytearray(bits))
+        report("pack_bits (%s, list)" % name, lambda: dwf.pack_bits(bits),
+               N_BITS)
+        report("pack_bits (%s, bytes)" % name, lambda: dwf.pack_bits(data),
+               N_BITS)
+        if module is not None:
+            array = np.array(bits)
+            report("pack_bits (%s, bool array)" % name,
+                   lambda: dwf.pack_bits(array), N_BITS)
+        report("tri-state (%s)" % name,
+               lambda: dwf.pack_bits(dwf.interleave_tristate(io, oe)), N_BITS)
+        report("create_bitdata_stream (%s)" % name,
+               lambda: dwf.pack_bits(dwf.create_bitdata_stream(
+                   range(N_BITS // 16), 16)), N_BITS)
+        if module is not None:
+            report("create_bitdata_stream (%s, as_array)" % name,
+                   lambda: dwf.pack_bits(dwf.create_bitdata_stream(
+                       range(N_BITS // 16), 16, as_array=True)), N_BITS)
+    finally:
+        dwf.lowlevel._np = saved
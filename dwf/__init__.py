@@ -3,3 +3,12 @@
 
 from .lowlevel import *
 from .api import *
+from .worker import DwfAcquisitionWorker
+from .capture import DwfCaptureFile, DwfCaptureWriter
+from .decimate import DwfDecimator
+from .measure import DwfAnalogInMeasure, DwfDigitalInMeasure
+from .decode import DwfI2cDecoder, DwfSpiDecoder, DwfUartDecoder
+from .transitions import DwfTransitions
+from .search import DwfDigitalTrigger, DwfPatternSearch
+from .sync import DwfAnalogInSync, DwfSyncCapture
+from .pool import DwfHandlePool
@@ -0,0 +1,43 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Sample buffer helpers shared by the Class-based API.
+
+NumPy is optional. When it is installed, sample buffers are `numpy.ndarray`
+objects; otherwise they fall back to `array.array` with the same type code.
+Both support the buffer protocol, so the SDK writes into them directly.
+'''
+
+import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def uint(bits):
+    '''`array` type code of the unsigned integers of `bits` bits.
+
+    The sizes of the type codes depend on the platform, so they are checked.
+
+    Raises:
+        ValueError: No type code has that size.
+    '''
+    for typecode in 'BHILQ':
+        if array.array(typecode).itemsize * 8 == bits:
+            return typecode
+    raise ValueError("no %d bit unsigned type code" % bits)
+
+def empty(count, typecode):
+    '''Allocate a sample buffer of `count` items.
+
+    Args:
+        count (int): Number of items.
+        typecode (str): `array` module type code ('d', 'h', 'B', 'H', 'I')
+
+    Returns:
+        numpy.ndarray if NumPy is available, array.array otherwise.
+    '''
+    if numpy is not None:
+        return numpy.empty(count, dtype=typecode)
+    return array.array(typecode, [0]) * count
@@ -0,0 +1,133 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''asyncio support for the Class-based API.
+
+The SDK calls block, so they run on an executor with a single thread per
+device (shared by all the instruments opened on the same device). Waiting
+for the instrument is done with `asyncio.sleep`, at a cadence derived from
+the instrument configuration (see `dwf.poll`), so the event loop stays free.
+
+These coroutines are normally used through the instrument methods:
+`DwfAnalogIn.acquire`, `DwfAnalogIn.astream`, `DwfDigitalIn.acquire`,
+`DwfDigitalIn.astream` and `DwfAnalogOut.wait_done`.
+'''
+
+import asyncio
+import concurrent.futures
+import threading
+import weakref
+
+from .api import _handle
+from .poll import POLL_MAX, POLL_MIN, poll_interval
+from .stream import enabled_channels
+
+_executors = weakref.WeakKeyDictionary()
+_executors_lock = threading.Lock()
+
+def executor(dev):
+    '''Get the executor running the SDK calls of a device.
+
+    Args:
+        dev (dwf.Dwf): Instrument
+
+    Returns:
+        concurrent.futures.ThreadPoolExecutor with a single thread.
+    '''
+    handle = _handle(dev.hdwf) # one executor for all the leases of a pool
+    with _executors_lock:
+        pool = _executors.get(handle)
+        if pool is None:
+            pool = concurrent.futures.ThreadPoolExecutor(1)
+            _executors[handle] = pool
+        return pool
+
+def run(dev, func, *args):
+    '''Call `func(*args)` on the device executor.
+
+    Returns:
+        asyncio.Future with the result.
+    '''
+    return asyncio.get_running_loop().run_in_executor(
+        executor(dev), func, *args)
+
+def _buffer_time(dev):
+    '''Seconds to fill the buffer of an Analog In or Digital In instrument'''
+    if hasattr(dev, 'frequencyGet'):
+        frequency = dev.frequencyGet()
+    else:
+        frequency = dev.internalClockInfo() / float(dev.dividerGet())
+    return dev.bufferSizeGet() / frequency
+
+async def wait(dev, interval, *args, limit=None):
+    '''Wait for `dev.status(*args)` to return DONE.
+
+    With a `limit` (s), the interval doubles after each poll up to it.
+    '''
+    while await run(dev, dev.status, *args) != dev.STATE.DONE:
+        await asyncio.sleep(interval)
+        if limit is not None:
+            interval = min(interval * 2, limit)
+
+async def acquire(dev, channels=None):
+    '''Start an acquisition, wait for it, and read the samples.
+
+    Args:
+        dev (dwf.DwfAnalogIn or dwf.DwfDigitalIn): Configured instrument.
+        channels (list): Analog In channel indexes. Default is None, which
+            reads every enabled channel.
+
+    Returns:
+        For Analog In, tuple with one float64 array per channel; for Digital
+        In, one array of samples.
+    '''
+    interval = poll_interval(await run(dev, _buffer_time, dev))
+    await run(dev, dev.configure, False, True)
+    await wait(dev, interval, True)
+    count = await run(dev, dev.statusSamplesValid)
+    if not hasattr(dev, 'frequencyGet'): # Digital In
+        return await run(dev, dev.statusData, count)
+    if channels is None:
+        channels = await run(dev, enabled_channels, dev)
+    data = []
+    for channel in channels:
+        data.append(await run(dev, dev.statusData, channel, count, None, True))
+    return tuple(data)
+
+async def stream(dev, *args):
+    '''Iterate over a record stream without blocking the event loop.
+
+    Args:
+        dev (dwf.DwfAnalogIn or dwf.DwfDigitalIn): Configured instrument.
+        args: Arguments of the instrument `stream` method.
+
+    Yields:
+        dwf.DwfStreamChunk
+    '''
+    stream = await run(dev, dev.stream, *args)
+    await run(dev, stream.start)
+    try:
+        while not stream.done:
+            chunk = await run(dev, stream.poll)
+            if chunk is not None:
+                yield chunk
+            elif not stream.pending:
+                await asyncio.sleep(stream.scheduler.delay())
+    finally:
+        await run(dev, stream.stop)
+
+async def wait_done(dev, idxChannel):
+    '''Wait for an Analog Out channel to finish its run.
+
+    A run of 0 s (until stopped) has no duration to poll at: the interval
+    starts at POLL_MIN and backs off up to POLL_MAX.
+
+    Args:
+        dev (dwf.DwfAnalogOut): Instrument
+        idxChannel (int): Channel index
+    '''
+    seconds = await run(dev, dev.runGet, idxChannel)
+    if seconds:
+        await wait(dev, poll_interval(seconds), idxChannel)
+    else:
+        await wait(dev, POLL_MIN, idxChannel, limit=POLL_MAX)
@@ -1,14 +1,62 @@
 #! /usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import functools as _functools
+import time as _time
+import weakref as _weakref
 from enum import IntEnum
 
 from . import lowlevel as _l
+from . import _buffer
+from . import averaging as _averaging
+from . import capture as _capture
+from . import record as _record
+from . import segmented as _segmented
+from .averaging import DwfAnalogInAverager
+from .poll import DwfPollScheduler, poll_interval
+from .search import DwfPatternSearch
+from .segmented import DwfAnalogInSegments
+from .spectrum import DwfSpectrum
+from .transitions import DwfTransitions
+from .stream import (DwfAnalogInScanReader, DwfAnalogInStream, DwfStreamChunk,
+                     DwfDigitalInStream, enabled_channels)
 
 #################################################################
 # Class-based APIs
 #################################################################
 
+_shadows = _weakref.WeakKeyDictionary() # handle: {(tag, getter, args): value}
+_sample_formats = _weakref.WeakKeyDictionary() # handle: Digital In format
+
+def _handle(hdwf):
+    '''Device handle of an instrument's `hdwf`: the pooled handle of a
+    dwf.DwfHandlePool lease, shared by all its leases'''
+    return getattr(hdwf, 'handle', hdwf)
+
+def _shadow_cache(hdwf):
+    '''Shadow cache of a handle, None if it is disabled'''
+    try:
+        return _shadows.get(_handle(hdwf))
+    except TypeError: # handle without weak references
+        return None
+
+def _keep_sample_format(hdwf, bits):
+    '''Remember the Digital In sample format of a handle (None forgets it)'''
+    try:
+        if bits is None:
+            _sample_formats.pop(_handle(hdwf), None)
+        else:
+            _sample_formats[_handle(hdwf)] = bits
+    except TypeError: # handle without weak references
+        pass
+
+def _known(enum, value):
+    '''`value` as an `enum` member if it is one, else the raw int'''
+    try:
+        return enum(value)
+    except ValueError:
+        return int(value)
+
 def _make_set(value, enum):
     ''' Helper function which turns the input `value` into a tuple of enums.
 
@@ -170,6 +218,87 @@ class DwfDevice(object):
         '''
         return _l.FDwfEnumConfigInfo(self.idxDevice, info)
 
+    def info(self, config=0):
+        '''Get the device description: name, serial number, type and the
+        configuration information, e.g. to store it with a capture.
+
+        Args:
+            config (int): Index of the device configuration to describe.
+                Default is 0.
+
+        Returns:
+            dict with the 'deviceName', 'userName', 'SN', 'deviceType',
+            'deviceVersion', 'config' and 'configInfo' (name: value) keys.
+            'deviceType' is the DEVID name, or the raw id of the devices
+            not in DEVID.
+        '''
+        devid, devver = _l.FDwfEnumDeviceType(self.idxDevice)
+        devid = _known(self.DEVID, devid)
+        # FDwfEnumConfig selects the device of the FDwfEnumConfigInfo calls
+        _l.FDwfEnumConfig(self.idxDevice)
+        return {
+            'deviceName': self.deviceName(),
+            'userName': self.userName(),
+            'SN': self.SN(),
+            'deviceType': getattr(devid, 'name', devid),
+            'deviceVersion': int(devver), # names are shared between devices
+            'config': config,
+            'configInfo': dict((info.name, _l.FDwfEnumConfigInfo(config, info))
+                               for info in self.CONFIGINFO),
+        }
+
+    def open(self, config=None):
+        '''Open this device.
+
+        Args:
+            config (int): Configuration to use. Default is None, which uses the
+                current configuration.
+
+        Returns:
+            dwf.Dwf device.
+        '''
+        return Dwf(self.idxDevice, idxCfg=config)
+
+class DwfDeviceRecord(object):
+    '''Metadata of an enumerated device, read by `DwfEnumerationSnapshot`.
+
+    Attributes:
+        idxDevice (int): Device index in the enumeration.
+        deviceName (str): Device name.
+        userName (str): User set name.
+        SN (str): Serial number.
+        deviceType (dwf.DwfDevice.DEVID): Device type, the raw int for the
+            types not in DEVID.
+        deviceVersion (int): Device revision, as in `DwfDevice.info`: the
+            DEVVER names are shared between devices.
+        opened (bool): True if the device was opened at enumeration time.
+        configs (tuple): Configuration information of each device
+            configuration, as {dwf.DwfDevice.CONFIGINFO: value} dicts.
+    '''
+    __slots__ = ('idxDevice', 'deviceName', 'userName', 'SN', 'deviceType',
+                 'deviceVersion', 'opened', 'configs')
+
+    def __init__(self, idxDevice):
+        super(DwfDeviceRecord, self).__init__()
+        self.idxDevice = idxDevice
+        devid, devver = _l.FDwfEnumDeviceType(idxDevice)
+        self.deviceType = _known(DwfDevice.DEVID, devid)
+        self.deviceVersion = int(devver)
+        self.deviceName = _l.FDwfEnumDeviceName(idxDevice)
+        self.userName = _l.FDwfEnumUserName(idxDevice)
+        self.SN = _l.FDwfEnumSN(idxDevice)
+        self.opened = bool(_l.FDwfEnumDeviceIsOpened(idxDevice))
+        # FDwfEnumConfig selects the device of the FDwfEnumConfigInfo calls
+        count = _l.FDwfEnumConfig(idxDevice)
+        self.configs = tuple(
+            dict((info, _l.FDwfEnumConfigInfo(config, info))
+                 for info in DwfDevice.CONFIGINFO)
+            for config in range(count))
+
+    def __repr__(self):
+        return '<DwfDeviceRecord %d: %s %s>' % (
+            self.idxDevice, self.deviceName, self.SN)
+
     def open(self, config=None):
         '''Open this device.
 
@@ -182,6 +311,72 @@ class DwfDevice(object):
         '''
         return Dwf(self.idxDevice, idxCfg=config)
 
+class DwfEnumerationSnapshot(object):
+    '''Enumeration of the connected devices, with all their metadata read
+    in one pass and kept until refreshed.
+
+    `DwfEnumeration` returns `DwfDevice` objects, each method of which is an
+    SDK call. The snapshot reads everything at once, and reads it again only
+    when `refresh` is called or, if `ttl` is set, when the devices are
+    accessed more than `ttl` seconds after the last read.
+
+    Example:
+    >>> devices = dwf.DwfEnumerationSnapshot(ttl=5.0)
+    >>> for dev in devices:
+    ...     print(dev.deviceName, dev.SN, dev.opened)
+    >>> devices.find('SN:210244516509').open()
+
+    Args:
+        enumfilter (dwf.ENUMFILTER): Device type to enumerate. Default is
+            dwf.ENUMFILTER.ALL.
+        ttl (float): Seconds the snapshot stays valid. Default is None, which
+            refreshes only when asked.
+
+    Attributes:
+        timestamp (float): time.monotonic() of the last read.
+    '''
+    def __init__(self, enumfilter=ENUMFILTER.ALL, ttl=None):
+        super(DwfEnumerationSnapshot, self).__init__()
+        self.enumfilter = enumfilter
+        self.ttl = ttl
+        self.refresh()
+
+    def refresh(self):
+        '''Enumerate the devices and read their metadata.'''
+        num = _l.FDwfEnum(self.enumfilter)
+        self._devices = tuple(DwfDeviceRecord(i) for i in range(num))
+        self.timestamp = _time.monotonic()
+
+    @property
+    def expired(self):
+        '''True if the snapshot is older than `ttl`.'''
+        if self.ttl is None:
+            return False
+        return _time.monotonic() - self.timestamp > self.ttl
+
+    @property
+    def devices(self):
+        '''Tuple of dwf.DwfDeviceRecord, refreshed first if expired.'''
+        if self.expired:
+            self.refresh()
+        return self._devices
+
+    def __len__(self):
+        return len(self.devices)
+
+    def __iter__(self):
+        return iter(self.devices)
+
+    def __getitem__(self, index):
+        return self.devices[index]
+
+    def find(self, SN):
+        '''Record of a device by serial number, None if not connected.'''
+        for record in self.devices:
+            if record.SN == SN:
+                return record
+        return None
+
 class _HDwf(object):
     '''Context manager for the DWF Hardware pointer, which automatically closes
     the connection upon deletion.
@@ -195,6 +390,8 @@ class _HDwf(object):
     Args:
         hdwf: Hardware context from FDwfDeviceOpen.
     '''
+    pooled = False # kept open by a dwf.DwfHandlePool
+
     def __init__(self, hdwf):
         super(_HDwf, self).__init__()
         self.hdwf = hdwf
@@ -205,6 +402,11 @@ class _HDwf(object):
         used as a parameter.'''
         return self.hdwf
 
+    @property
+    def handle(self):
+        '''This handle, as for the leases of a dwf.DwfHandlePool.'''
+        return self
+
     def close(self):
         '''Close the Hardware context if it is valid.'''
         if self.hdwf != _l.hdwfNone:
@@ -212,7 +414,8 @@ class _HDwf(object):
             self.hdwf = _l.hdwfNone
 
     def __del__(self):
-        self.close()
+        if not self.pooled:
+            self.close()
 
 class Dwf(object):
     ''' Main DWF device wrapper.
@@ -233,8 +436,14 @@ class Dwf(object):
         idxCfg (int): Device configuration to use. The Device configuration can
             be found in the Waveforms GUI / Device Manager. Default is None (ie
             use the current configuration)
+
+    Attributes:
+        pool (dwf.DwfHandlePool): Process-wide pool the devices are leased
+            from, when set. Default is None, which opens and closes the
+            device with each instance.
     '''
     DEVICE_NONE             = _l.hdwfNone
+    pool                    = None
 
     class TRIGSRC(IntEnum):
         '''Trigger sources'''
@@ -277,6 +486,10 @@ class Dwf(object):
         if isinstance(idxDevice, DwfDevice):
             idxDevice = idxDevice.idxDevice
 
+        if self.pool is not None:
+            self.hdwf = self.pool.lease(idxDevice, idxCfg)
+            return
+
         if idxCfg is None:
             hdwf = _l.FDwfDeviceOpen(idxDevice)
         else:
@@ -288,7 +501,7 @@ class Dwf(object):
         self.hdwf = _HDwf(hdwf)
 
     def close(self):
-        '''Close the HDWF instance.'''
+        '''Close the HDWF instance, or give it back to the pool.'''
         self.hdwf.close()
 
     def autoConfigureSet(self, auto_configure):
@@ -319,6 +532,7 @@ class Dwf(object):
         '''Reset the Device, and configure all device and instrument parameters
         to default values.'''
         _l.FDwfDeviceReset(self.hdwf)
+        _keep_sample_format(self.hdwf, None)
 
     def enableSet(self, enable):
         '''Not sure what this does - Enable / Disable the device maybe?'''
@@ -363,7 +577,116 @@ class Dwf(object):
         '''Generate one pulse on the PC trigger line'''
         _l.FDwfDeviceTriggerPC(self.hdwf)
 
+    def shadowCacheSet(self, enable):
+        '''Enable or disable the shadow cache of the instrument settings.
+
+        With the cache, the `*Get` methods read the device once and are then
+        served from memory. Setting an exact value (enable flag, mode,
+        trigger source, ...) stores it in the cache; with the -1 index
+        (every channel) it drops the cached values of that setting. Setting
+        a value the device can coerce (rate, range, size, ...) drops it, to
+        read back what was applied. A setter also drops the settings that
+        depend on it (e.g. the buffer size on a channel enable); `reset`
+        and `configure` drop them all.
+
+        The cache is shared by the instruments opened on this handle (e.g.
+        `DwfAnalogIn(dev)`); call `shadowCacheClear` after changing the
+        device through another handle or the low level functions.
+
+        Args:
+            enable (bool): True -> Enable, False -> Disable
+        '''
+        if enable:
+            _shadows.setdefault(_handle(self.hdwf), {})
+        else:
+            _shadows.pop(_handle(self.hdwf), None)
+
+    def shadowCacheGet(self):
+        '''Get the shadow cache setting.
+
+        Returns:
+            True if the shadow cache is enabled, False otherwise.
+        '''
+        return _shadow_cache(self.hdwf) is not None
+
+    def shadowCacheClear(self):
+        '''Drop every cached setting, to read them from the device again.'''
+        cache = _shadow_cache(self.hdwf)
+        if cache is not None:
+            cache.clear()
+
 # ANALOG IN INSTRUMENT FUNCTIONS
+class DwfAnalogInRawData(object):
+    '''Raw ADC samples returned by `DwfAnalogIn.statusDataRaw`.
+
+    The samples are signed 16 bit ADC codes, left aligned regardless of the
+    ADC resolution, so that:
+
+        volts = code * scale + offset
+
+    The channel range and offset are read by `DwfAnalogIn.statusDataRaw`
+    along with the samples, so the data converts with the configuration it
+    was acquired with.
+
+    Args:
+        data (buffer): int16 sample buffer
+        dev (dwf.DwfAnalogIn): Instrument the samples were read from.
+        idxChannel (int): Analog In channel index
+        voltsRange (float): Channel range of the acquisition
+        voltOffset (float): Channel offset of the acquisition
+
+    Attributes:
+        scale (float): Volts per code (channel range / 65536)
+        offset (float): Channel offset in Volts
+    '''
+    __slots__ = ('data', 'dev', 'idxChannel', 'scale', 'offset', '_bits')
+
+    def __init__(self, data, dev, idxChannel, voltsRange, voltOffset):
+        super(DwfAnalogInRawData, self).__init__()
+        self.data = data
+        self.dev = dev
+        self.idxChannel = idxChannel
+        self.scale = voltsRange / 65536.0
+        self.offset = voltOffset
+        self._bits = None
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def bits(self):
+        '''Number of ADC bits'''
+        if self._bits is None:
+            self._bits = self.dev.bitsInfo()
+        return self._bits
+
+    @property
+    def resolution(self):
+        '''Voltage of one ADC step (the low 16 - `bits` bits are zero)'''
+        return self.scale * (1 << (16 - self.bits))
+
+    def volts(self, out=None):
+        '''Convert the samples to Volts.
+
+        Args:
+            out (buffer): Writable float64 buffer to store the result in.
+                Default is None, which allocates a new array.
+
+        Returns:
+            Samples in Volts (numpy.ndarray, array.array or `out`)
+        '''
+        scale, offset = self.scale, self.offset
+        if out is None:
+            out = _buffer.empty(len(self.data), 'd')
+        if _buffer.numpy is not None:
+            result = _buffer.numpy.asarray(out)
+            _buffer.numpy.multiply(self.data, scale, out=result)
+            result += offset
+        else:
+            for i, code in enumerate(self.data):
+                out[i] = code * scale + offset
+        return out
+
 class DwfAnalogIn(Dwf):
     class ACQMODE(IntEnum):
         '''acquisition modes'''
@@ -416,10 +739,338 @@ class DwfAnalogIn(Dwf):
         return _l.FDwfAnalogInStatusIndexWrite(self.hdwf)
     def statusAutotriggered(self):
         return bool(_l.FDwfAnalogInStatusAutoTriggered(self.hdwf))
-    def statusData(self, idxChannel, data_num):
-        return _l.FDwfAnalogInStatusData(self.hdwf, idxChannel, data_num)
-    def statusNoise(self, idxChannel, data_num):
-        return _l.FDwfAnalogInStatusNoise(self.hdwf, idxChannel, data_num)
+    def statusData(self, idxChannel, data_num, out=None, asarray=False):
+        '''Get the acquired samples of a channel, in Volts.
+
+        By default the samples are returned as a tuple of floats. To avoid
+        creating a Python object per sample, pass a float64 buffer as `out`
+        (numpy array or a contiguous slice of one, array('d'), ...) and the
+        SDK writes into it directly, or set `asarray` to get a new array.
+
+        Example:
+        >>> samples = numpy.empty(8192)
+        >>> dev.statusData(0, 4096, out=samples[4096:])
+
+        Args:
+            idxChannel (int): Analog In channel index
+            data_num (int): Number of samples to copy
+            out (buffer): Writable float64 buffer holding at least `data_num`
+                samples. Default is None.
+            asarray (bool): If True and `out` is None, return a new
+                numpy.ndarray (array.array without NumPy). Default is False.
+
+        Returns:
+            `out`, the new array, or a tuple of floats.
+        '''
+        if out is None and not asarray:
+            return _l.FDwfAnalogInStatusData(self.hdwf, idxChannel, data_num)
+        if out is None:
+            out = _buffer.empty(data_num, 'd')
+        _l.FDwfAnalogInStatusData(self.hdwf, idxChannel, out, data_num)
+        return out
+    def statusNoise(self, idxChannel, data_num, out=None, asarray=False):
+        '''Get the noise (min, max) samples of a channel, in Volts.
+
+        Args:
+            idxChannel (int): Analog In channel index
+            data_num (int): Number of samples to copy
+            out (tuple): (min, max) pair of writable float64 buffers, see
+                `statusData`. Default is None.
+            asarray (bool): If True and `out` is None, return new arrays.
+                Default is False.
+
+        Returns:
+            (min, max) buffers, or tuples of floats.
+        '''
+        if out is None and not asarray:
+            return _l.FDwfAnalogInStatusNoise(self.hdwf, idxChannel, data_num)
+        if out is None:
+            out = (_buffer.empty(data_num, 'd'), _buffer.empty(data_num, 'd'))
+        _l.FDwfAnalogInStatusNoise(
+            self.hdwf, idxChannel, out[0], out[1], data_num)
+        return out
+    def statusData2(self, idxChannel, idxData, data_num, out=None,
+                    asarray=False):
+        '''Get `data_num` samples of a channel, starting at buffer index
+        `idxData`, in Volts.
+
+        Used with `statusIndexWrite` in the scan modes to read only the newly
+        written part of the buffer, see `scanReader`.
+
+        Args:
+            idxChannel (int): Analog In channel index
+            idxData (int): First buffer index to copy
+            data_num (int): Number of samples to copy
+            out (buffer): Writable float64 buffer, see `statusData`. Default
+                is None.
+            asarray (bool): If True and `out` is None, return a new array.
+                Default is False.
+
+        Returns:
+            `out`, the new array, or a tuple of floats.
+        '''
+        if out is None and not asarray:
+            return _l.FDwfAnalogInStatusData2(
+                self.hdwf, idxChannel, idxData, data_num)
+        if out is None:
+            out = _buffer.empty(data_num, 'd')
+        _l.FDwfAnalogInStatusData2(
+            self.hdwf, idxChannel, out, idxData, data_num)
+        return out
+    def scanReader(self, channels=None):
+        '''Create a reader returning only the samples written since the
+        previous poll, in the SCAN_SHIFT and SCAN_SCREEN acquisition modes.
+
+        Example:
+        >>> reader = dev.scanReader([0])
+        >>> dev.configure(False, True)
+        >>> while True:
+        ...     (new_samples,) = reader.read()
+
+        Args:
+            channels (list): Channel indexes to read. Default is None, which
+                reads every enabled channel.
+
+        Returns:
+            dwf.DwfAnalogInScanReader
+        '''
+        return DwfAnalogInScanReader(self, channels)
+    def stream(self, chunk_size=8192, channels=None, samples=None,
+               duration=None, buffers=4):
+        '''Run a RECORD mode acquisition and iterate over it in chunks.
+
+        Example:
+        >>> for chunk in dev.stream(65536, samples=10000000):
+        ...     ch0 = chunk.data[0]
+
+        Args:
+            chunk_size (int): Samples per channel in each chunk. Default is
+                8192.
+            channels (list): Channel indexes. Default is None, which streams
+                every enabled channel.
+            samples (int): Number of samples to acquire. Default is None.
+            duration (float): Acquisition length in seconds, used when
+                `samples` is None. Default is None (run until stopped).
+            buffers (int): Number of chunks in the buffer ring. Default is 4.
+
+        Returns:
+            dwf.DwfAnalogInStream, yielding dwf.DwfStreamChunk
+        '''
+        return DwfAnalogInStream(
+            self, chunk_size, channels, samples, duration, buffers)
+    def record_to_file(self, path, samples=None, duration=None,
+                       channels=None, chunk_size=65536, fmt=None):
+        '''Run a RECORD mode acquisition straight into a memory-mapped file.
+
+        The file is preallocated for `samples` samples per channel, so the
+        capture length is limited by the disk, not the memory. See dwf.record
+        for the file formats; read the file back with `dwf.record.load`.
+
+        Example:
+        >>> dev.frequencySet(1e6)
+        >>> info = dev.record_to_file('capture.npy', duration=600)
+        >>> info['lost']
+        []
+
+        Args:
+            path (str): File path. A '.npy' extension writes a NumPy file.
+            samples (int): Samples per channel to record.
+            duration (float): Record length in seconds, used when `samples`
+                is None.
+            channels (list): Channel indexes. Default is None, which records
+                every enabled channel.
+            chunk_size (int): Samples per channel copied at once. Default is
+                65536.
+            fmt (str): 'npy' or 'raw'. Default is None (from the extension).
+
+        Returns:
+            dict of the metadata written: rate, range, offset, trigger
+            position, lost and corrupted spans, ...
+        '''
+        stream = self.stream(chunk_size, channels, samples, duration)
+        return _record.record(stream, path, self._streamInfo(stream), fmt)
+    def capture_to_file(self, path, samples=None, duration=None,
+                        channels=None, chunk_size=65536, device=None):
+        '''Run a RECORD mode acquisition into an indexed capture file.
+
+        Unlike `record_to_file`, the length does not need to be known: the
+        chunks are appended until the acquisition stops. Open the file with
+        dwf.DwfCaptureFile for random access by sample or time.
+
+        Args:
+            path (str): File path.
+            samples (int): Samples per channel to record. Default is None.
+            duration (float): Record length in seconds, used when `samples`
+                is None. Default is None (run until stopped).
+            channels (list): Channel indexes. Default is None, which records
+                every enabled channel.
+            chunk_size (int): Samples per channel in each chunk of the file.
+                Default is 65536.
+            device (dwf.DwfDevice): Enumerated device, to store its name,
+                serial number and configuration. Default is None.
+
+        Returns:
+            dict of the metadata written.
+        '''
+        stream = self.stream(chunk_size, channels, samples, duration)
+        metadata = self._streamInfo(stream)
+        if device is not None:
+            metadata['device'] = device.info()
+        return _capture.capture(stream, path, metadata)
+    def _streamInfo(self, stream):
+        '''Instrument metadata stored with the recorded files'''
+        return {
+            'instrument': 'AnalogIn',
+            'channels': list(stream.channels),
+            'range': [self.channelRangeGet(c) for c in stream.channels],
+            'offset': [self.channelOffsetGet(c) for c in stream.channels],
+            'trigger_position': self.triggerPositionGet(),
+        }
+    def acquire(self, channels=None):
+        '''Start an acquisition and read it, without blocking the event loop.
+
+        Example:
+        >>> ch0, ch1 = await dev.acquire()
+
+        Args:
+            channels (list): Channel indexes. Default is None, which reads
+                every enabled channel.
+
+        Returns:
+            Coroutine returning a tuple with one float64 array per channel.
+        '''
+        from . import aio # Python 3 only
+        return aio.acquire(self, channels)
+    def astream(self, chunk_size=8192, channels=None, samples=None,
+                duration=None, buffers=4):
+        '''Asynchronous version of `stream`.
+
+        Example:
+        >>> async for chunk in dev.astream(65536, duration=60):
+        ...     ch0 = chunk.data[0]
+
+        Returns:
+            Asynchronous generator yielding dwf.DwfStreamChunk
+        '''
+        from . import aio # Python 3 only
+        return aio.stream(
+            self, chunk_size, channels, samples, duration, buffers)
+    def segmented(self, frames, channels=None, samples=None, trigsrc=None,
+                  position=None, timeout=None, interval=0.0):
+        '''Capture `frames` triggered acquisitions into one preallocated
+        (frames x channels x samples) array, re-arming after each trigger.
+
+        Configure the trigger (type, channel, level, ...) first. Each frame
+        is timestamped, so rare events can be told apart from the re-arm
+        dead time with `DwfAnalogInSegments.intervals`.
+
+        Example:
+        >>> dev.triggerAutoTimeoutSet() # disable auto trigger
+        >>> seg = dev.segmented(1000, samples=1024, position=0,
+        ...                     trigsrc=dev.TRIGSRC.DETECTOR_ANALOG_IN)
+        >>> seg.data.shape
+        (1000, 1, 1024)
+
+        Args:
+            frames (int): Number of frames to capture.
+            channels (list): Channel indexes. Default is None, which
+                captures every enabled channel.
+            samples (int): Samples per frame (buffer size). Default is None
+                (keep the buffer size).
+            trigsrc (TRIGSRC): Trigger source. Default is None (keep).
+            position (float): Trigger position (s). Default is None (keep).
+            timeout (float): Seconds to wait for each trigger before giving
+                up. Default is None (no limit).
+            interval (float): Sleep (s) between status reads. Default is 0
+                (busy polling, for the shortest re-arm time).
+
+        Returns:
+            dwf.DwfAnalogInSegments
+        '''
+        return _segmented.segmented(self, frames, channels, samples, trigsrc,
+                                    position, timeout, interval)
+    def average(self, frames, channels=None, alpha=None, align=True,
+                timeout=None, interval=0.0):
+        '''Average repeated SINGLE acquisitions in constant memory.
+
+        Each capture is folded into running mean, variance, min / max
+        envelopes and (with `alpha`) an exponential average, instead of
+        keeping every `statusData` result.
+
+        Example:
+        >>> avg = dev.average(1000)
+        >>> mean, noise = avg.mean[0], avg.std()[0]
+
+        Args:
+            frames (int): Number of captures.
+            channels (list): Channel indexes. Default is None, which
+                averages every enabled channel.
+            alpha (float): Weight of the last capture in the exponential
+                average. Default is None (no exponential average).
+            align (bool): Line up the captures on their trigger index, from
+                `triggerPositionStatus`. Default is True.
+            timeout (float): Seconds to wait for each capture. Default is
+                None (no limit).
+            interval (float): Sleep (s) between status reads. Default is 0.
+
+        Returns:
+            dwf.DwfAnalogInAverager
+        '''
+        return _averaging.average(self, frames, channels, alpha, align,
+                                  timeout, interval)
+    def spectrum(self, nfft=None, channels=None, window='hann', overlap=0.5,
+                 alpha=None):
+        '''Create a Welch spectrum analyzer for the streamed channels.
+
+        The sample rate is read with `frequencyGet`, so call this after
+        configuring the acquisition. Requires NumPy.
+
+        Example:
+        >>> spec = dev.spectrum()
+        >>> for chunk in spec.attach(dev.stream(65536, duration=10)):
+        ...     pass
+        >>> floor = spec.noise_floor() # V/sqrt(Hz)
+
+        Args:
+            nfft (int): Segment size. Default is None, which uses the buffer
+                size (`bufferSizeGet`).
+            channels (list): Channel indexes, as passed to `stream`. Default
+                is None (every enabled channel).
+            window (str): Window name. Default is 'hann'.
+            overlap (float): Segment overlap. Default is 0.5.
+            alpha (float): Exponential average weight. Default is None
+                (linear average).
+
+        Returns:
+            dwf.DwfSpectrum
+        '''
+        if nfft is None:
+            nfft = self.bufferSizeGet()
+        if channels is None:
+            channels = enabled_channels(self)
+        return DwfSpectrum(self.frequencyGet(), nfft, len(channels), window,
+                           overlap, alpha)
+    def statusDataRaw(self, idxChannel, data_num, out=None):
+        '''Get the acquired samples of a channel as raw 16 bit ADC codes.
+
+        This takes a quarter of the memory of `statusData`; the codes are
+        converted to Volts later on with `DwfAnalogInRawData.volts`.
+
+        Args:
+            idxChannel (int): Analog In channel index
+            data_num (int): Number of samples to copy
+            out (buffer): Writable int16 buffer holding at least `data_num`
+                samples. Default is None, which allocates a new array.
+
+        Returns:
+            dwf.DwfAnalogInRawData wrapping the int16 samples.
+        '''
+        if out is None:
+            out = _buffer.empty(data_num, 'h')
+        _l.FDwfAnalogInStatusData16(self.hdwf, idxChannel, out, 0, data_num)
+        return DwfAnalogInRawData(out, self, idxChannel,
+                                  self.channelRangeGet(idxChannel),
+                                  self.channelOffsetGet(idxChannel))
     def statusSample(self, idxChannel):
         return _l.FDwfAnalogInStatusSample(self.hdwf, idxChannel)
     def statusRecord(self):
@@ -754,6 +1405,17 @@ class DwfAnalogOut(Dwf):
     def nodeDataInfo(self, idxChannel, node):
         return _l.FDwfAnalogOutNodeDataInfo(self.hdwf, idxChannel, node)
     def nodeDataSet(self, idxChannel, node, rgdData):
+        '''Set the custom waveform samples, normalized to [-1, 1].
+
+        Contiguous float64 buffers (numpy arrays, array('d'), memoryview) are
+        passed to the SDK without copying; other sequences are converted in
+        a single bulk operation.
+
+        Args:
+            idxChannel (int): Analog Out channel index
+            node (dwf.DwfAnalogOut.NODE): Node
+            rgdData (buffer or sequence): Samples
+        '''
         _l.FDwfAnalogOutNodeDataSet(self.hdwf, idxChannel, node, rgdData)
 
 # needed for EExplorer, don't care for ADiscovery
@@ -778,7 +1440,59 @@ class DwfAnalogOut(Dwf):
     def nodePlayStatus(self, idxChannel, node):
         return _l.FDwfAnalogOutNodePlayStatus(self.hdwf, idxChannel, node)
     def nodePlayData(self, idxChannel, node, rgdData):
+        '''Send the next block of samples for the PLAY function.
+
+        Accepts the same inputs as `nodeDataSet`, without copying contiguous
+        float64 buffers.
+
+        Args:
+            idxChannel (int): Analog Out channel index
+            node (dwf.DwfAnalogOut.NODE): Node
+            rgdData (buffer or sequence): Samples
+        '''
         _l.FDwfAnalogOutNodePlayData(self.hdwf, idxChannel, node, rgdData)
+    def playScheduler(self, idxChannel, node, target=0.5):
+        '''Create a poll scheduler for the PLAY function.
+
+        The scheduler plans the `nodePlayStatus` polls from the play rate and
+        the free space reported, to refill the buffer when `target` of it is
+        free.
+
+        Example:
+        >>> sched = dev.playScheduler(0, dev.NODE.CARRIER)
+        >>> while True:
+        ...     free, lost, corrupted = dev.nodePlayStatus(0, dev.NODE.CARRIER)
+        ...     sched.update(free, lost)
+        ...     dev.nodePlayData(0, dev.NODE.CARRIER, next_samples(free))
+        ...     sched.wait()
+
+        Args:
+            idxChannel (int): Analog Out channel index
+            node (dwf.DwfAnalogOut.NODE): Node
+            target (float): Free buffer fraction to refill at. Default is 0.5.
+
+        Returns:
+            dwf.DwfPollScheduler
+        '''
+        rate = self.nodeFrequencyGet(idxChannel, node)
+        buffer_size = self.nodeDataInfo(idxChannel, node)[1]
+        return DwfPollScheduler(rate, buffer_size, target)
+    def wait_done(self, idxChannel):
+        '''Wait for a channel to finish its run, without blocking the event
+        loop.
+
+        Example:
+        >>> dev.configure(0, True)
+        >>> await dev.wait_done(0)
+
+        Args:
+            idxChannel (int): Analog Out channel index
+
+        Returns:
+            Coroutine
+        '''
+        from . import aio # Python 3 only
+        return aio.wait_done(self, idxChannel)
 
 # ANALOG IO INSTRUMENT FUNCTIONS
 class DwfAnalogIO(Dwf):
@@ -994,14 +1708,15 @@ class DwfDigitalIn(Dwf):
     Configure Sample Rate:
     >>> dev.dividerSet(100)      # Divider set
 
-    Acquire and wait:
+    Acquire and wait, polling a few times per buffer duration:
     >>> dev.configure(False, True)
-    >>> status = dev.status(True)
-    >>> while status != dwf.Dwf.STATE.DONE:
-    ...    time.sleep(0.5)
-    ...    status = dev.status(True)
+    >>> interval = dwf.poll_interval(32 / (dev.internalClockInfo() / 100))
+    >>> while dev.status(True) != dwf.Dwf.STATE.DONE:
+    ...    time.sleep(interval)
     ...
 
+    For long captures, see `stream` (RECORD mode).
+
     Get results:
     >>> data = dev.statusData(32)
 
@@ -1037,6 +1752,9 @@ class DwfDigitalIn(Dwf):
         SIMPLE          = _l.DwfDigitalInSampleModeSimple
         NOISE           = _l.DwfDigitalInSampleModeNoise
 
+    # array type code for each sample format
+    _TYPECODES = dict((bits, _buffer.uint(bits)) for bits in (8, 16, 32))
+
     def __init__(self, idxDevice=-1, idxCfg=None):
         if isinstance(idxDevice, Dwf):
             self.hdwf = idxDevice.hdwf
@@ -1054,6 +1772,7 @@ class DwfDigitalIn(Dwf):
         if parent:
             super(DwfDigitalIn, self).reset()
         _l.FDwfDigitalInReset(self.hdwf)
+        _keep_sample_format(self.hdwf, None)
 
     def configure(self, reconfigure, start):
         '''Configure the device and stop / stop the the acquisition.
@@ -1111,33 +1830,236 @@ class DwfDigitalIn(Dwf):
         '''
         return bool(_l.FDwfDigitalInStatusAutoTriggered(self.hdwf))
 
-    def statusData(self, count):
+    def statusData(self, count, out=None):
         '''Acquire sample data from the instrument.
 
-        The sample format is specified by sampleFormatSet method.
+        The sample format is specified by sampleFormatSet method, and is
+        remembered from the last call to it on the device handle, by any
+        instrument (it is only read back from the device when it has not
+        been set or read since the last reset).
+
+        The SDK copies the samples straight into a uint8, uint16 or uint32
+        array matching the sample format, no per-sample conversion is done.
+
+        Args:
+            count (int): Number of samples to copy
+            out (buffer): Writable buffer of at least `count` samples to copy
+                the data into. Default is None, which allocates a new array.
+
+        Returns:
+            Retreived data in the set format (numpy.ndarray, or array.array
+            when NumPy is not installed), or `out`.
+        '''
+        bit_width = self._sampleFormat()
+        if out is None:
+            out = _buffer.empty(count, self._TYPECODES[bit_width])
+        _l.FDwfDigitalInStatusData(self.hdwf, out, count * (bit_width // 8))
+        return out
+
+    def statusData2(self, idxSample, count, out=None):
+        '''Acquire sample data from the instrument, starting at a sample
+        index.
+
+        Same as statusData, but `count` samples are copied starting at sample
+        `idxSample` of the last status read. In RECORD mode, this is the index
+        in the block reported available by statusRecord.
 
         Args:
+            idxSample (int): Index of the first sample to copy
             count (int): Number of samples to copy
+            out (buffer): Writable buffer of at least `count` samples to copy
+                the data into. Default is None, which allocates a new array.
+
+        Returns:
+            Retreived data in the set format (numpy.ndarray, or array.array
+            when NumPy is not installed), or `out`.
+        '''
+        bit_width = self._sampleFormat()
+        if out is None:
+            out = _buffer.empty(count, self._TYPECODES[bit_width])
+        _l.FDwfDigitalInStatusData2(
+            self.hdwf, out, idxSample, count * (bit_width // 8))
+        return out
+
+    def stream(self, chunk_size=65536, samples=None, buffers=4):
+        '''Run a RECORD mode acquisition and iterate over it in chunks.
+
+        The chunks are uint8, uint16 or uint32 arrays, depending on the sample
+        format.
+
+        Example:
+        >>> dev.sampleFormatSet(16)
+        >>> dev.triggerPositionSet(10000000)
+        >>> for chunk in dev.stream():
+        ...     process(chunk.data)
+
+        Args:
+            chunk_size (int): Samples in each chunk. Default is 65536.
+            samples (int): Number of samples to acquire. Default is None,
+                which uses the trigger position (see triggerPositionSet).
+            buffers (int): Number of chunks in the buffer ring. Default is 4.
+
+        Returns:
+            dwf.DwfDigitalInStream, yielding dwf.DwfStreamChunk
+        '''
+        return DwfDigitalInStream(self, chunk_size, samples, buffers)
+
+    def record_to_file(self, path, samples=None, chunk_size=65536, fmt=None):
+        '''Run a RECORD mode acquisition straight into a memory-mapped file.
+
+        The samples are stored in the set sample format. See dwf.record for
+        the file formats; read the file back with `dwf.record.load`.
+
+        Example:
+        >>> dev.sampleFormatSet(16)
+        >>> info = dev.record_to_file('capture.npy', samples=50000000)
+
+        Args:
+            path (str): File path. A '.npy' extension writes a NumPy file.
+            samples (int): Number of samples to record. Default is None,
+                which uses the trigger position (see triggerPositionSet).
+            chunk_size (int): Samples copied at once. Default is 65536.
+            fmt (str): 'npy' or 'raw'. Default is None (from the extension).
 
         Returns:
-            Retreived data in the set format (list of integers)
+            dict of the metadata written: rate, sample format, divider,
+            trigger position, lost and corrupted spans, ...
         '''
-        bit_width = self.sampleFormatGet()
-        countOfDataBytes = count * (bit_width // 8)
-        data = _l.FDwfDigitalInStatusData(self.hdwf, countOfDataBytes)
+        stream = self.stream(chunk_size, samples)
+        return _record.record(stream, path, self._streamInfo(stream), fmt)
 
-        if bit_width == 16:
-            data = [  (data[2*i+1] & 0xff) << 8
-                    | (data[2*i] & 0xff)
-                    for i in range(len(data) // 2)]
-        elif bit_width == 32:
-            data = [  ((data[4*i+3] & 0xff) << 24)
-                    | ((data[4*i+2] & 0xff) << 16)
-                    | ((data[4*i+1] & 0xff) << 8)
-                    | (data[4*i] & 0xff)
-                     for i in range(len(data) // 4)]
+    def capture_to_file(self, path, samples=None, chunk_size=65536,
+                        device=None):
+        '''Run a RECORD mode acquisition into an indexed capture file.
 
-        return data
+        Unlike `record_to_file`, the length does not need to be known: the
+        chunks are appended until the acquisition stops. Open the file with
+        dwf.DwfCaptureFile for random access by sample or time.
+
+        Args:
+            path (str): File path.
+            samples (int): Number of samples to record. Default is None,
+                which uses the trigger position (see triggerPositionSet).
+            chunk_size (int): Samples in each chunk of the file. Default is
+                65536.
+            device (dwf.DwfDevice): Enumerated device, to store its name,
+                serial number and configuration. Default is None.
+
+        Returns:
+            dict of the metadata written.
+        '''
+        stream = self.stream(chunk_size, samples)
+        metadata = self._streamInfo(stream)
+        if device is not None:
+            metadata['device'] = device.info()
+        return _capture.capture(stream, path, metadata)
+
+    def transitions(self, samples=None, chunk_size=65536):
+        '''Run a RECORD mode acquisition into a transition list.
+
+        Only the samples where the bus value changes are kept, so long,
+        mostly idle captures fit in memory. Requires NumPy.
+
+        Example:
+        >>> trans = dev.transitions(10**8)
+        >>> trans.edges(0, 'rising')
+
+        Args:
+            samples (int): Number of samples to record. Default is None,
+                which uses the trigger position (see triggerPositionSet).
+            chunk_size (int): Samples read at once. Default is 65536.
+
+        Returns:
+            dwf.DwfTransitions
+        '''
+        stream = self.stream(chunk_size, samples)
+        result = DwfTransitions(stream.typecode, stream.frequency)
+        for chunk in stream:
+            result.add(chunk)
+        return result
+
+    def search(self, *steps, **kwargs):
+        '''Run a RECORD mode acquisition and search it for a condition, or a
+        sequence of conditions, set like `triggerSet`. Requires NumPy.
+
+        The samples are searched chunk by chunk and not kept: this is a
+        software trigger for long captures. See dwf.DwfPatternSearch.
+
+        Example:
+        >>> dev.search((0, 0, 0x01, 0), samples=10**8) # DIO 0 rising edges
+        >>> dev.search(dwf.DwfDigitalTrigger.pattern(0xff, 0x12),
+        ...            dwf.DwfDigitalTrigger.pattern(0xff, 0x34), limit=1)
+
+        Args:
+            *steps: Conditions, as dwf.DwfDigitalTrigger or 4-tuples
+                (level_low, level_high, edge_rise, edge_fall).
+            samples (int): Number of samples to record. Default is None,
+                which uses the trigger position (see triggerPositionSet).
+            limit (int): Stop the acquisition after this many matches.
+                Default is None.
+            every (bool): See dwf.DwfPatternSearch. Default is False.
+            chunk_size (int): Samples read at once. Default is 65536.
+
+        Returns:
+            numpy.ndarray of the match sample indexes.
+        '''
+        samples = kwargs.pop('samples', None)
+        limit = kwargs.pop('limit', None)
+        chunk_size = kwargs.pop('chunk_size', 65536)
+        search = DwfPatternSearch(*steps, **kwargs)
+        found = []
+        chunks = iter(self.stream(chunk_size, samples))
+        try:
+            for chunk in chunks:
+                found.append(search.add(chunk))
+                if limit is not None and search.matches >= limit:
+                    break
+        finally:
+            chunks.close()
+        numpy = _buffer.numpy
+        result = numpy.concatenate(found + [numpy.empty(0, numpy.int64)])
+        return result if limit is None else result[:limit]
+
+    def _streamInfo(self, stream):
+        '''Instrument metadata stored with the recorded files'''
+        return {
+            'instrument': 'DigitalIn',
+            'sample_format': self._sampleFormat(),
+            'divider': self.dividerGet(),
+            'trigger_position': stream.samples,
+        }
+
+    def acquire(self):
+        '''Start an acquisition and read it, without blocking the event loop.
+
+        Example:
+        >>> samples = await dev.acquire()
+
+        Returns:
+            Coroutine returning an array of samples in the set format.
+        '''
+        from . import aio # Python 3 only
+        return aio.acquire(self)
+
+    def astream(self, chunk_size=65536, samples=None, buffers=4):
+        '''Asynchronous version of `stream`.
+
+        Example:
+        >>> async for chunk in dev.astream():
+        ...     process(chunk.data)
+
+        Returns:
+            Asynchronous generator yielding dwf.DwfStreamChunk
+        '''
+        from . import aio # Python 3 only
+        return aio.stream(self, chunk_size, samples, buffers)
+
+    def _sampleFormat(self):
+        '''Sample format, from the cache or from the device.'''
+        try:
+            return _sample_formats[_handle(self.hdwf)]
+        except (KeyError, TypeError):
+            return self.sampleFormatGet()
 
     def statusRecord(self):
         '''Get the number of samples available, lost, or corrupted.
@@ -1226,6 +2148,7 @@ class DwfDigitalIn(Dwf):
                 - 32
         '''
         _l.FDwfDigitalInSampleFormatSet(self.hdwf, bits)
+        _keep_sample_format(self.hdwf, bits)
 
     def sampleFormatGet(self):
         '''Get the instrument's bit format.
@@ -1233,7 +2156,9 @@ class DwfDigitalIn(Dwf):
         Returns:
             Bit format as an integer (8, 16, 32)
         '''
-        return _l.FDwfDigitalInSampleFormatGet(self.hdwf)
+        bits = _l.FDwfDigitalInSampleFormatGet(self.hdwf)
+        _keep_sample_format(self.hdwf, bits)
+        return bits
 
     def bufferSizeInfo(self):
         '''Get the Maximum buffer size for the Digital In Instrument.
@@ -1999,3 +2924,150 @@ class DwfDigitalOut(Dwf):
             rgBits (list): Array of bits / bytes to be sent.
         '''
         _l.FDwfDigitalOutDataSet(self.hdwf, idxChannel, rgBits)
+
+# Shadow cache of the instrument settings, see Dwf.shadowCacheSet
+def _clear(tag, func):
+    '''Drop the cached settings of `tag` (all of them for None) after
+    calling `func`'''
+    @_functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        result = func(self, *args, **kwargs)
+        cache = _shadow_cache(self.hdwf)
+        if cache:
+            for key in [key for key in cache if tag in (None, key[0])]:
+                del cache[key]
+        return result
+    return wrapper
+
+def _cached(tag, func):
+    @_functools.wraps(func)
+    def getter(self, *args, **kwargs):
+        cache = _shadow_cache(self.hdwf)
+        if cache is None or kwargs:
+            return func(self, *args, **kwargs)
+        key = (tag, func.__name__, args)
+        try:
+            return cache[key]
+        except KeyError:
+            value = cache[key] = func(self, *args)
+            return value
+    return getter
+
+def _shadowed(tag, name, func, kind, dependents):
+    '''Setter `func` of the getter `name`, keeping the cache up to date.
+
+    `kind` converts the written value to the type read back, for the
+    settings the device keeps as written; None for those it can coerce.
+    `dependents` are the getters whose values the setting can change.
+    '''
+    arity = func.__code__.co_argcount - 2 # self and the value
+    @_functools.wraps(func)
+    def setter(self, *args, **kwargs):
+        result = func(self, *args, **kwargs)
+        cache = _shadow_cache(self.hdwf)
+        if cache is None:
+            return result
+        index = args[:arity]
+        drop = set(dependents)
+        if kind is None or kwargs or len(args) != arity + 1 or any(
+                isinstance(i, int) and i < 0 for i in index):
+            # coerced, or -1 setting every channel (or node): read back
+            drop.add(name)
+        else:
+            try:
+                cache[(tag, name, index)] = kind(args[arity])
+            except (TypeError, ValueError):
+                drop.add(name)
+        for k in [k for k in cache if k[0] == tag and k[1] in drop]:
+            del cache[k]
+        return result
+    return setter
+
+def _shadow(cls, exact=None, values=(), depends=None, invalidate=()):
+    '''Serve the `<name>Get` methods of `cls` from the shadow cache.
+
+    Args:
+        exact (dict): Settings the device keeps as written, with the type
+            their getter returns: their setter stores the value written.
+        values: Settings the device can coerce: their setter drops the
+            cached values, read back from the device by the next get.
+        depends (dict): Settings the device can change when another one is
+            set, by the name of that one.
+        invalidate: Other methods that change the settings.
+    '''
+    tag = cls.__name__
+    exact = exact or {}
+    depends = depends or {}
+    for name in tuple(exact) + tuple(values):
+        getter = getattr(cls, name + 'Get')
+        setattr(cls, name + 'Get', _cached(tag, getter))
+        setattr(cls, name + 'Set', _shadowed(
+            tag, getter.__name__, getattr(cls, name + 'Set'),
+            exact.get(name), [d + 'Get' for d in depends.get(name, ())]))
+    for name in ('reset', 'configure') + tuple(invalidate):
+        if name in cls.__dict__:
+            # a device reset drops the settings of every instrument
+            setattr(cls, name, _clear(None if cls is Dwf else tag,
+                                      getattr(cls, name)))
+
+_shadow(Dwf, exact={'autoConfigure': bool, 'trigger': Dwf.TRIGSRC})
+_shadow(DwfAnalogIn,
+        exact={'acquisitionMode': DwfAnalogIn.ACQMODE, 'channelEnable': bool,
+               'channelFilter': DwfAnalogIn.FILTER,
+               'triggerSource': DwfAnalogIn.TRIGSRC,
+               'triggerType': DwfAnalogIn.TRIGTYPE, 'triggerChannel': int,
+               'triggerFilter': DwfAnalogIn.FILTER,
+               'triggerCondition': DwfAnalogIn.TRIGCOND,
+               'triggerLengthCondition': DwfAnalogIn.TRIGLEN},
+        values=('recordLength', 'frequency', 'bufferSize', 'channelRange',
+                'channelOffset', 'channelAttenuation', 'triggerPosition',
+                'triggerAutoTimeout', 'triggerHoldOff', 'triggerLevel',
+                'triggerHysteresis', 'triggerLength'),
+        depends={
+            'acquisitionMode': ('frequency', 'bufferSize', 'recordLength',
+                                'triggerPosition'),
+            'channelEnable': ('frequency', 'bufferSize'),
+            'frequency': ('recordLength', 'triggerPosition'),
+            'bufferSize': ('triggerPosition',),
+            'channelRange': ('channelOffset', 'triggerLevel',
+                             'triggerHysteresis'),
+            'channelAttenuation': ('channelRange', 'channelOffset',
+                                   'triggerLevel', 'triggerHysteresis'),
+            'triggerChannel': ('triggerLevel', 'triggerHysteresis')})
+_shadow(DwfAnalogOut,
+        exact={'master': int, 'triggerSource': DwfAnalogOut.TRIGSRC,
+               'repeatTrigger': bool, 'mode': DwfAnalogOut.MODE,
+               'idle': DwfAnalogOut.IDLE, 'nodeEnable': bool,
+               'nodeFunction': DwfAnalogOut.FUNC, 'customAMFMEnable': bool},
+        values=('run', 'wait', 'repeat', 'limitation', 'nodeFrequency',
+                'nodeAmplitude', 'nodeModulation', 'nodeOffset',
+                'nodeSymmetry', 'nodePhase'),
+        depends={
+            'mode': ('limitation', 'nodeAmplitude', 'nodeOffset'),
+            'nodeFunction': ('nodeFrequency', 'nodeAmplitude', 'nodeOffset',
+                             'nodeSymmetry', 'nodePhase')})
+_shadow(DwfAnalogIO, exact={'enable': bool}, values=('channelNode',))
+_shadow(DwfDigitalIO, values=('outputEnable', 'output'),
+        depends={'outputEnable': ('output',)})
+_shadow(DwfDigitalIn,
+        exact={'clockSource': DwfDigitalIn.CLOCKSOURCE,
+               'sampleMode': DwfDigitalIn.SAMPLEMODE,
+               'acquisitionMode': DwfDigitalIn.ACQMODE,
+               'triggerSource': DwfDigitalIn.TRIGSRC},
+        values=('divider', 'sampleFormat', 'bufferSize', 'triggerPosition',
+                'triggerAutoTimeout', 'trigger'),
+        depends={
+            'clockSource': ('divider',),
+            'sampleMode': ('bufferSize', 'triggerPosition'),
+            'acquisitionMode': ('bufferSize', 'triggerPosition'),
+            'sampleFormat': ('bufferSize', 'triggerPosition'),
+            'bufferSize': ('triggerPosition',)})
+_shadow(DwfDigitalOut,
+        exact={'triggerSource': DwfDigitalOut.TRIGSRC, 'repeatTrigger': bool,
+               'enable': bool, 'output': DwfDigitalOut.OUTPUT,
+               'type': DwfDigitalOut.TYPE, 'idle': DwfDigitalOut.IDLE},
+        values=('run', 'wait', 'repeat', 'dividerInit', 'divider',
+                'counterInit', 'counter'),
+        depends={'type': ('dividerInit', 'divider', 'counterInit',
+                          'counter')},
+        invalidate=('dataSet',))
@@ -0,0 +1,223 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Averaging of repeated acquisitions in constant memory.
+
+`DwfAnalogInAverager` folds each capture into running statistics (mean and
+variance with Welford's method, min / max envelopes and an optional
+exponential average), so averaging many frames does not keep them around.
+`average` runs the repeated SINGLE acquisitions, reading each one into the
+same buffers.
+'''
+
+import array
+import math
+import time
+
+from . import _buffer
+from .stream import enabled_channels
+
+def _full(count, value):
+    '''float64 buffer of `count` items set to `value`'''
+    if _buffer.numpy is not None:
+        return _buffer.numpy.full(count, value)
+    return array.array('d', [value]) * count
+
+def trigger_index(dev, samples):
+    '''Index of the trigger in the last acquisition of an instrument.
+
+    The trigger position is relative to the middle of the buffer, and a
+    positive position leaves more samples after the trigger.
+
+    Args:
+        dev (dwf.DwfAnalogIn): Instrument
+        samples (int): Buffer size
+
+    Returns:
+        int
+    '''
+    position = dev.triggerPositionStatus()
+    return samples // 2 - int(round(position * dev.frequencyGet()))
+
+class DwfAnalogInAverager(object):
+    '''Running statistics of repeated captures, per channel and sample.
+
+    Frames can be shifted before being added, to line them up on their
+    trigger. Each sample then has its own count, as the edges of shifted
+    frames only cover part of the record.
+
+    Example:
+    >>> avg = dwf.DwfAnalogInAverager(1, 8192, alpha=0.1)
+    >>> for frame in frames:
+    ...     avg.add(frame)
+    >>> mean, std = avg.mean[0], avg.std()[0]
+
+    Args:
+        channels (int): Number of channels.
+        samples (int): Samples per channel.
+        alpha (float): Weight of the last frame in the exponential average,
+            between 0 and 1. Default is None (no exponential average).
+
+    Attributes:
+        frames (int): Number of frames added.
+        counts: Number of frames added at each sample index.
+        mean, minimum, maximum: Running mean and envelopes, a list with one
+            float64 array per channel.
+        ema: Exponential average, like `mean`, or None if `alpha` is None.
+    '''
+    def __init__(self, channels, samples, alpha=None):
+        super(DwfAnalogInAverager, self).__init__()
+        self.channels = int(channels)
+        self.samples = int(samples)
+        self.alpha = alpha
+        self.reset()
+
+    def reset(self):
+        '''Forget the frames added so far.'''
+        def new(value):
+            return [_full(self.samples, value) for _ in range(self.channels)]
+        self.frames = 0
+        self.counts = _full(self.samples, 0.0)
+        self.mean = new(0.0)
+        self.minimum = new(float('inf'))
+        self.maximum = new(float('-inf'))
+        self.ema = None if self.alpha is None else new(0.0)
+        self._m2 = new(0.0)
+
+    def add(self, frame, shift=0):
+        '''Add a capture.
+
+        Args:
+            frame: One sequence of samples per channel, `samples` long.
+            shift (int): Accumulator index of the frame's first sample.
+                Samples shifted out of the record are left out. Default is 0.
+        '''
+        start = max(shift, 0)
+        stop = min(self.samples, self.samples + shift)
+        if start >= stop:
+            return
+        first = start - shift
+        self.frames += 1
+        numpy = _buffer.numpy
+        if numpy is not None:
+            counts = self.counts[start:stop]
+            counts += 1
+            for c, data in enumerate(frame):
+                x = numpy.asarray(data)[first:first + stop - start]
+                self._add_array(c, start, stop, x, counts)
+            return
+        for i in range(start, stop):
+            self.counts[i] += 1
+        for c, data in enumerate(frame):
+            self._add_list(c, start, stop, data, first)
+
+    def _add_array(self, c, start, stop, x, counts):
+        numpy = _buffer.numpy
+        mean = self.mean[c][start:stop]
+        delta = x - mean
+        mean += delta / counts
+        self._m2[c][start:stop] += delta * (x - mean)
+        numpy.minimum(self.minimum[c][start:stop], x,
+                      out=self.minimum[c][start:stop])
+        numpy.maximum(self.maximum[c][start:stop], x,
+                      out=self.maximum[c][start:stop])
+        if self.ema is not None:
+            ema = self.ema[c][start:stop]
+            ema += self.alpha * (x - ema)
+            ema[counts == 1] = x[counts == 1]
+
+    def _add_list(self, c, start, stop, data, first):
+        mean, m2 = self.mean[c], self._m2[c]
+        lo, hi = self.minimum[c], self.maximum[c]
+        ema = None if self.ema is None else self.ema[c]
+        for i in range(start, stop):
+            x = data[first + i - start]
+            n = self.counts[i]
+            delta = x - mean[i]
+            mean[i] += delta / n
+            m2[i] += delta * (x - mean[i])
+            lo[i] = min(lo[i], x)
+            hi[i] = max(hi[i], x)
+            if ema is not None:
+                ema[i] = x if n == 1 else ema[i] + self.alpha * (x - ema[i])
+
+    def variance(self):
+        '''Sample variance, a list with one float64 array per channel. NaN
+        where less than two frames were added.'''
+        result = []
+        for m2 in self._m2:
+            if _buffer.numpy is not None:
+                with _buffer.numpy.errstate(divide='ignore', invalid='ignore'):
+                    var = m2 / (self.counts - 1)
+                var[self.counts < 2] = _buffer.numpy.nan
+            else:
+                var = array.array('d', [
+                    m / (n - 1) if n >= 2 else float('nan')
+                    for m, n in zip(m2, self.counts)])
+            result.append(var)
+        return result
+
+    def std(self):
+        '''Sample standard deviation, like `variance`.'''
+        if _buffer.numpy is not None:
+            return [_buffer.numpy.sqrt(v) for v in self.variance()]
+        return [array.array('d', [math.sqrt(x) for x in v])
+                for v in self.variance()]
+
+def average(dev, frames, channels=None, alpha=None, align=True,
+            timeout=None, interval=0.0):
+    '''Run repeated SINGLE acquisitions and average them.
+
+    The instrument (buffer size, trigger, ...) is configured by the caller.
+    Each capture is read into the same buffers and folded into a
+    DwfAnalogInAverager, so the memory used does not grow with `frames`.
+
+    Args:
+        dev (dwf.DwfAnalogIn): Configured instrument.
+        frames (int): Number of captures.
+        channels (list): Channel indexes. Default is None, which averages
+            every enabled channel.
+        alpha (float): Exponential average weight, see DwfAnalogInAverager.
+            Default is None.
+        align (bool): Shift each capture to line up its trigger (reported by
+            `triggerPositionStatus`) with the first one. Default is True.
+        timeout (float): Seconds to wait for each capture. Default is None
+            (no limit).
+        interval (float): Sleep (s) between status reads. Default is 0.
+
+    Returns:
+        dwf.DwfAnalogInAverager, with `frames` less than requested if a
+        capture timed out.
+    '''
+    if channels is None:
+        channels = enabled_channels(dev)
+    size = dev.bufferSizeGet()
+    averager = DwfAnalogInAverager(len(channels), size, alpha)
+    buffers = [_buffer.empty(size, 'd') for _ in channels]
+    dev.acquisitionModeSet(dev.ACQMODE.SINGLE)
+    done = dev.STATE.DONE
+    reference = None
+    dev.configure(True, True)
+    try:
+        for frame in range(frames):
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while dev.status(True) != done:
+                if deadline is not None and time.monotonic() > deadline:
+                    return averager
+                if interval:
+                    time.sleep(interval)
+            for channel, buf in zip(channels, buffers):
+                dev.statusData(channel, size, out=buf)
+            shift = 0
+            if align:
+                index = trigger_index(dev, size)
+                if reference is None:
+                    reference = index
+                shift = reference - index
+            if frame + 1 < frames:
+                # the samples were copied: re-arm before averaging them
+                dev.configure(False, True)
+            averager.add(buffers, shift)
+    finally:
+        dev.configure(False, False)
+    return averager
@@ -0,0 +1,296 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Chunked capture files with an index, for random access to long records.
+
+The record chunks (see `dwf.DwfAnalogIn.stream`, `dwf.DwfDigitalIn.stream`)
+are appended as they arrive, so the capture length does not need to be known
+in advance. When the file is closed, an index is written with the position
+of each chunk on the time line (lost samples included) and its min / max per
+channel, followed by the metadata as JSON.
+
+File layout:
+    - HEADER (64 bytes): magic, version, index offset, number of chunks,
+      metadata offset and size.
+    - Chunks: the samples of each channel, one channel after the other.
+    - Index: file offsets, first sample and sample count of each chunk
+      (uint64), then the minimums and maximums (float64, chunks x channels).
+    - Metadata (JSON).
+
+`DwfCaptureFile` memory-maps the file and only reads the chunks needed for
+the requested sample or time range. Reading requires NumPy.
+'''
+
+import array
+import json
+import mmap
+import struct
+import sys
+import time
+
+from . import _buffer
+from .record import _descr
+
+# magic, version, index offset, chunk count, metadata offset, metadata size
+HEADER = struct.Struct('<6sHQQQQ')
+HEADER_SIZE = 64
+MAGIC = b'DWFCAP'
+VERSION = 1
+
+def _min_max(part):
+    '''Minimum and maximum of a chunk's samples'''
+    if not len(part):
+        return float('nan'), float('nan')
+    if _buffer.numpy is not None:
+        part = _buffer.numpy.asarray(part)
+        return float(part.min()), float(part.max())
+    return float(min(part)), float(max(part))
+
+class DwfCaptureWriter(object):
+    '''Write record chunks to a capture file.
+
+    Args:
+        path (str): File path.
+        typecode (str): `array` type code of the samples ('d', 'B', 'H', 'I')
+        channels (int): Number of channels, or None for a single array of
+            samples (Digital In).
+        rate (float): Sample rate (Hz).
+        metadata (dict): Instrument and device metadata to store.
+    '''
+    def __init__(self, path, typecode, channels, rate, metadata=None):
+        super(DwfCaptureWriter, self).__init__()
+        self.path = path
+        self.channels = channels
+        self.itemsize = array.array(typecode).itemsize
+        self.metadata = dict(metadata or {})
+        self.metadata.update({
+            'dtype': _descr(typecode),
+            'channels_count': channels,
+            'rate': rate,
+            'lost': [],
+            'corrupted': [],
+            'created': time.time(),
+        })
+        self.position = 0
+        self._offsets = array.array('Q')
+        self._starts = array.array('Q')
+        self._counts = array.array('Q')
+        self._mins = array.array('d')
+        self._maxs = array.array('d')
+        self._file = open(path, 'wb')
+        self._file.write(b'\0' * HEADER_SIZE)
+
+    def write(self, chunk):
+        '''Append a dwf.DwfStreamChunk.
+
+        The chunk is split where samples were lost, so that the index keeps
+        each sample at its place on the time line.
+        '''
+        if chunk.corrupted:
+            self.metadata['corrupted'].append([self.position, chunk.corrupted])
+        parts = chunk.data if self.channels is not None else (chunk.data,)
+        start = 0
+        for offset, lost in tuple(chunk.spans()) + ((len(chunk), 0),):
+            self._segment(parts, start, offset)
+            if lost:
+                self.metadata['lost'].append([self.position, lost])
+                self.position += lost
+            start = offset
+
+    def _segment(self, parts, start, stop):
+        count = stop - start
+        if count <= 0:
+            return
+        self._offsets.append(self._file.tell())
+        self._starts.append(self.position)
+        self._counts.append(count)
+        for part in parts:
+            view = memoryview(part).cast('B')
+            self._file.write(
+                view[start * self.itemsize:stop * self.itemsize])
+            low, high = _min_max(part[start:stop])
+            self._mins.append(low)
+            self._maxs.append(high)
+        self.position += count
+
+    def close(self):
+        '''Write the index and metadata, and close the file.'''
+        if self._file is None:
+            return
+        f = self._file
+        f.write(b'\0' * (-f.tell() % 8))
+        index = f.tell()
+        for table in (self._offsets, self._starts, self._counts,
+                      self._mins, self._maxs):
+            if sys.byteorder != 'little':
+                table = array.array(table.typecode, table)
+                table.byteswap()
+            f.write(table.tobytes())
+        self.metadata['samples'] = self.position
+        metadata = json.dumps(self.metadata, sort_keys=True).encode('utf-8')
+        meta_offset = f.tell()
+        f.write(metadata)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, index, len(self._starts),
+                            meta_offset, len(metadata)))
+        f.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+def capture(stream, path, metadata=None):
+    '''Run a record stream and write it to a capture file.
+
+    Args:
+        stream (dwf.DwfAnalogInStream or dwf.DwfDigitalInStream): Stream
+        path (str): File path.
+        metadata (dict): Instrument and device metadata to store.
+
+    Returns:
+        dict of the metadata written.
+    '''
+    channels = getattr(stream, 'channels', None)
+    with DwfCaptureWriter(path, stream.typecode,
+                          None if channels is None else len(channels),
+                          stream.frequency, metadata) as f:
+        for chunk in stream:
+            f.write(chunk)
+    return f.metadata
+
+class DwfCaptureFile(object):
+    '''Memory-mapped capture file reader.
+
+    Example:
+    >>> with dwf.DwfCaptureFile('capture.dwfcap') as cap:
+    ...     window = cap.time(3600.0, 3600.5) # half a second, one hour in
+    ...     low, high = cap.summary(0, cap.samples)
+
+    Args:
+        path (str): Capture file path.
+
+    Attributes:
+        metadata (dict): Metadata stored with the capture.
+        rate (float): Sample rate (Hz).
+        samples (int): Length of the capture in samples, lost ones included.
+        starts, counts: First sample and sample count of each chunk.
+        mins, maxs: Minimum and maximum of each chunk (chunks x channels).
+    '''
+    def __init__(self, path):
+        super(DwfCaptureFile, self).__init__()
+        numpy = _buffer.numpy
+        if numpy is None:
+            raise ImportError("reading capture files requires NumPy")
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index, chunks, meta_offset, meta_size = \
+            HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError("%s is not a capture file" % path)
+        self.metadata = json.loads(
+            self._map[meta_offset:meta_offset + meta_size].decode('utf-8'))
+        self.rate = self.metadata['rate']
+        self.samples = self.metadata['samples']
+        self.channels = self.metadata['channels_count']
+        self.dtype = numpy.dtype(self.metadata['dtype'])
+        width = self.channels or 1
+        tables = []
+        for dtype, count in (('<u8', chunks), ('<u8', chunks), ('<u8', chunks),
+                             ('<f8', chunks * width), ('<f8', chunks * width)):
+            tables.append(numpy.frombuffer(
+                self._map, dtype, count, index).astype(dtype[1:]))
+            index += 8 * count
+        self.offsets, self.starts, self.counts, mins, maxs = tables
+        self.mins = mins.reshape(chunks, width)
+        self.maxs = maxs.reshape(chunks, width)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def chunk(self, index):
+        '''Samples of a chunk, without copying.
+
+        Returns:
+            Array of shape (channels, count), or (count,) for Digital In.
+        '''
+        numpy = _buffer.numpy
+        count = int(self.counts[index])
+        data = numpy.frombuffer(self._map, self.dtype,
+                                count * (self.channels or 1),
+                                int(self.offsets[index]))
+        if self.channels is None:
+            return data
+        return data.reshape(self.channels, count)
+
+    def _chunks(self, start, stop):
+        '''Indexes of the chunks overlapping [start, stop)'''
+        numpy = _buffer.numpy
+        first = max(numpy.searchsorted(self.starts, start, 'right') - 1, 0)
+        last = numpy.searchsorted(self.starts, stop, 'left')
+        return range(first, last)
+
+    def read(self, start, stop):
+        '''Read a range of samples.
+
+        Lost samples read as NaN for Analog In, and 0 for Digital In.
+
+        Args:
+            start (int): First sample.
+            stop (int): Sample after the last one.
+
+        Returns:
+            New array of shape (channels, stop - start), or (stop - start,)
+            for Digital In.
+        '''
+        numpy = _buffer.numpy
+        start = max(int(start), 0)
+        stop = max(min(int(stop), self.samples), start)
+        shape = (stop - start,)
+        if self.channels is not None:
+            shape = (self.channels,) + shape
+        fill = numpy.nan if self.dtype.kind == 'f' else 0
+        out = numpy.full(shape, fill, self.dtype)
+        for i in self._chunks(start, stop):
+            begin = int(self.starts[i])
+            end = begin + int(self.counts[i])
+            lo, hi = max(begin, start), min(end, stop)
+            if lo < hi:
+                out[..., lo - start:hi - start] = \
+                    self.chunk(i)[..., lo - begin:hi - begin]
+        return out
+
+    def time(self, t_start, t_stop):
+        '''Read the samples between two times, in seconds from the start of
+        the capture.'''
+        return self.read(int(t_start * self.rate), int(t_stop * self.rate))
+
+    def summary(self, start, stop):
+        '''Minimum and maximum of a range of samples, from the chunk index.
+
+        The whole chunks overlapping the range are included, so this is an
+        envelope of the range, computed without reading the samples.
+
+        Returns:
+            (min, max) arrays with one value per channel.
+        '''
+        chunks = self._chunks(start, stop)
+        if not len(chunks):
+            return None
+        chunks = slice(chunks[0], chunks[-1] + 1)
+        return self.mins[chunks].min(axis=0), self.maxs[chunks].max(axis=0)
+
+    def close(self):
+        '''Close the file. The mapping is released once the arrays returned
+        by `chunk` are not used anymore.'''
+        if self._map is not None:
+            self._map = None
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,265 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Display decimation for live views.
+
+A live plot only needs one or two values per pixel. `DwfDecimator` reduces
+the samples of a stream to a fixed number of pixels as they arrive, so the
+cost of drawing depends on the plot width, not on the sample rate:
+    - Analog In: the min / max envelope of the samples of each pixel, and
+      optionally one sample per pixel picked with the Largest-Triangle-
+      Three-Buckets (LTTB) algorithm, which keeps the shape of the signal.
+    - Digital In: the AND / OR of the samples of each pixel, so a bit that
+      is 0 in the AND and 1 in the OR changed during the pixel.
+'''
+
+import array
+import functools
+import operator
+
+from . import _buffer
+
+def _ring(size, typecode):
+    if _buffer.numpy is not None:
+        return _buffer.numpy.zeros(size, typecode)
+    return array.array(typecode, [0]) * size
+
+def _ordered(ring, head, count):
+    '''Last `count` items of a ring buffer written up to `head`, oldest
+    first.'''
+    size = len(ring)
+    start = (head - count) % size
+    if start + count <= size:
+        return ring[start:start + count]
+    if _buffer.numpy is not None:
+        return _buffer.numpy.concatenate((ring[start:], ring[:head]))
+    return ring[start:] + ring[:head]
+
+class DwfDecimator(object):
+    '''Incremental per-pixel decimation of a stream.
+
+    The view holds the last `width` pixels, each one summarizing
+    `samples_per_pixel` consecutive samples. Feed it the samples as they
+    arrive with `add`, or let it follow a record stream with `attach`; the
+    pixel being filled is left out of the view until it is complete.
+
+    Example:
+    >>> view = dwf.DwfDecimator(800, 1000000, channels=1)
+    >>> for chunk in view.attach(dev.stream(65536)):
+    ...     low, high = view.envelope()
+    ...     fill_between(range(len(low[0])), low[0], high[0])
+
+    Args:
+        width (int): Number of pixels in the view.
+        span (int): Samples shown in the view; each pixel summarizes
+            `span // width` samples (at least one).
+        channels (int): Number of channels for Analog In data (a tuple of
+            arrays), or None for Digital In data (a single array). Default is
+            None.
+        typecode (str): `array` type code of the samples: 'd' for Analog In,
+            'B', 'H' or 'I' for Digital In. Default is 'd'.
+        lttb (bool): Also pick one sample per pixel with LTTB (Analog In
+            only). Default is False.
+
+    Attributes:
+        samples (int): Samples added.
+        pixels (int): Pixels completed.
+    '''
+    def __init__(self, width, span, channels=None, typecode='d', lttb=False):
+        super(DwfDecimator, self).__init__()
+        self.width = int(width)
+        self.samples_per_pixel = max(int(span) // self.width, 1)
+        self.channels = channels
+        self.typecode = typecode
+        self.logic = typecode != 'd'
+        if lttb and self.logic:
+            raise ValueError("LTTB needs Analog In samples")
+        self.lttb = lttb
+        numpy = _buffer.numpy
+        if numpy is None:
+            self._ops = ((operator.and_, operator.or_) if self.logic
+                         else (min, max))
+        elif self.logic:
+            self._ops = (numpy.bitwise_and, numpy.bitwise_or)
+        else:
+            self._ops = (numpy.minimum, numpy.maximum)
+        self.reset()
+
+    def reset(self):
+        '''Clear the view.'''
+        count = self.channels or 1
+        self.samples = 0
+        self.pixels = 0
+        self._low = [_ring(self.width, self.typecode) for _ in range(count)]
+        self._high = [_ring(self.width, self.typecode) for _ in range(count)]
+        self._fill = 0
+        self._partial = [None] * count
+        if self.lttb:
+            self._values = [_ring(self.width, 'd') for _ in range(count)]
+            self._indexes = [_ring(self.width, 'd') for _ in range(count)]
+            self._bucket = [_buffer.empty(self.samples_per_pixel, 'd')
+                            for _ in range(count)]
+            self._pending = [None] * count
+            self._last = [None] * count
+            self.points = 0
+
+    def _reduce(self, op, values):
+        if _buffer.numpy is not None:
+            return op.reduce(values)
+        return functools.reduce(op, values)
+
+    def add(self, data):
+        '''Add samples.
+
+        Args:
+            data: A tuple with one array per channel (Analog In), a single
+                array (Digital In), or a dwf.DwfStreamChunk.
+        '''
+        data = getattr(data, 'data', data)
+        parts = data if self.channels is not None else (data,)
+        size = len(parts[0])
+        spp = self.samples_per_pixel
+        pos = 0
+        while pos < size:
+            if self._fill == 0 and size - pos >= spp:
+                # whole pixels at once
+                count = (size - pos) // spp
+                self._add_pixels(parts, pos, count)
+                pos += count * spp
+                continue
+            count = min(spp - self._fill, size - pos)
+            low_op, high_op = self._ops
+            for c, part in enumerate(parts):
+                values = part[pos:pos + count]
+                low = self._reduce(low_op, values)
+                high = self._reduce(high_op, values)
+                if self._fill:
+                    low = low_op(self._partial[c][0], low)
+                    high = high_op(self._partial[c][1], high)
+                self._partial[c] = (low, high)
+                if self.lttb:
+                    self._bucket[c][self._fill:self._fill + count] = values
+            self._fill += count
+            pos += count
+            if self._fill == spp:
+                self._fill = 0
+                head = self.pixels % self.width
+                for c in range(len(parts)):
+                    self._low[c][head], self._high[c][head] = self._partial[c]
+                    if self.lttb:
+                        self._select(c, self._bucket[c], self.pixels)
+                self.pixels += 1
+        self.samples += size
+
+    def _add_pixels(self, parts, pos, count):
+        spp = self.samples_per_pixel
+        numpy = _buffer.numpy
+        for c, part in enumerate(parts):
+            values = part[pos:pos + count * spp]
+            if numpy is not None:
+                blocks = numpy.asarray(values).reshape(count, spp)
+                lows = self._ops[0].reduce(blocks, axis=1)
+                highs = self._ops[1].reduce(blocks, axis=1)
+            else:
+                blocks = [values[i * spp:(i + 1) * spp] for i in range(count)]
+                lows = [self._reduce(self._ops[0], b) for b in blocks]
+                highs = [self._reduce(self._ops[1], b) for b in blocks]
+            # only the last `width` pixels can be seen
+            skip = max(count - self.width, 0)
+            for i in range(skip, count):
+                head = (self.pixels + i) % self.width
+                self._low[c][head] = lows[i]
+                self._high[c][head] = highs[i]
+            if self.lttb:
+                for i in range(count):
+                    self._select(c, values[i * spp:(i + 1) * spp],
+                                 self.pixels + i)
+        self.pixels += count
+
+    def _select(self, c, bucket, pixel):
+        '''LTTB: pick the point of the previous bucket making the largest
+        triangle with the previously picked point and the average of
+        `bucket`.'''
+        spp = self.samples_per_pixel
+        pending = self._pending[c]
+        if _buffer.numpy is not None:
+            bucket = _buffer.numpy.array(bucket, 'd')
+            cy = float(bucket.mean())
+        else:
+            bucket = array.array('d', bucket)
+            cy = sum(bucket) / len(bucket)
+        self._pending[c] = bucket
+        if pending is None:
+            return
+        start = (pixel - 1) * spp
+        cx = pixel * spp + (spp - 1) / 2.0
+        last = self._last[c]
+        if last is None:
+            # the first point of the stream is kept
+            index = 0
+        elif _buffer.numpy is not None:
+            ax, ay = last
+            xs = _buffer.numpy.arange(start, start + spp)
+            area = abs((ax - cx) * (pending - ay) - (ax - xs) * (cy - ay))
+            index = int(area.argmax())
+        else:
+            ax, ay = last
+            area = [abs((ax - cx) * (y - ay) - (ax - start - i) * (cy - ay))
+                    for i, y in enumerate(pending)]
+            index = area.index(max(area))
+        self._last[c] = (start + index, pending[index])
+        head = (pixel - 1) % self.width
+        self._indexes[c][head] = start + index
+        self._values[c][head] = pending[index]
+        if c == len(self._pending) - 1:
+            self.points = pixel
+
+    @property
+    def start(self):
+        '''Index of the first sample of the view.'''
+        return max(self.pixels - self.width, 0) * self.samples_per_pixel
+
+    def envelope(self):
+        '''Per-pixel envelope of the view, oldest pixel first.
+
+        Returns:
+            (low, high): min / max (Analog In) or AND / OR (Digital In) of
+            each pixel. Lists with one array per channel for Analog In,
+            single arrays for Digital In.
+        '''
+        count = min(self.pixels, self.width)
+        head = self.pixels % self.width
+        low = [_ordered(r, head, count) for r in self._low]
+        high = [_ordered(r, head, count) for r in self._high]
+        if self.channels is None:
+            return low[0], high[0]
+        return low, high
+
+    def points_lttb(self):
+        '''Samples picked by LTTB, one per pixel, oldest first. The last
+        complete pixel is picked once the next one is complete.
+
+        Returns:
+            (indexes, values): lists with one float64 array per channel of
+            the sample indexes and values.
+        '''
+        if not self.lttb:
+            raise ValueError("LTTB is not enabled")
+        count = min(self.points, self.width)
+        head = self.points % self.width
+        return ([_ordered(r, head, count) for r in self._indexes],
+                [_ordered(r, head, count) for r in self._values])
+
+    def attach(self, stream):
+        '''Add the chunks of a record stream as they are iterated.
+
+        Args:
+            stream: Iterable of dwf.DwfStreamChunk (dwf.DwfAnalogInStream,
+                dwf.DwfDigitalInStream, dwf.DwfAcquisitionWorker).
+
+        Yields:
+            The chunks, after adding them to the view.
+        '''
+        for chunk in stream:
+            self.add(chunk)
+            yield chunk
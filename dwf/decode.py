@@ -0,0 +1,407 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Serial bus decoders for Digital In captures. Requires NumPy.
+
+The decoders work on the packed samples returned by `DwfDigitalIn.statusData`
+or yielded by `DwfDigitalIn.stream` (bit n of a sample is DIO n). The clock
+edges and frame boundaries are found with array operations, and the bits of
+all the frames of a chunk are sampled at once; Python code only runs once
+per frame, to build its record.
+
+Feed the decoders chunk after chunk: the samples of a frame that is not
+complete yet are kept for the next call. Lost samples (see
+`dwf.DwfStreamChunk.spans`) drop the frame in progress where they happen.
+A capture compressed to a `dwf.DwfTransitions` list is decoded with
+`decode_transitions`, without expanding it.
+
+Example:
+>>> uart = dwf.DwfUartDecoder(dev, rx=0, baud=115200)
+>>> for chunk in dev.stream(65536):
+...     for record in uart.feed(chunk):
+...         print(record.time, record.data, record.errors)
+'''
+
+import collections
+
+from . import _buffer
+
+DwfDecodeRecord = collections.namedtuple(
+    'DwfDecodeRecord', ('index', 'time', 'data', 'errors', 'info'))
+DwfDecodeRecord.__doc__ = '''A decoded frame.
+
+    Attributes:
+        index (int): Sample index of the start of the frame, lost samples
+            included.
+        time (float): `index` in seconds.
+        data: Bytes of the frame (a tuple of ints for words of more than 8
+            bits).
+        errors (tuple): Error names, empty if the frame is valid.
+        info (dict): Protocol specific fields.
+'''
+
+def sample_rate(dev):
+    '''Sample rate (Hz) of a Digital In instrument:
+    `internalClockInfo() / dividerGet()`.'''
+    return dev.internalClockInfo() / float(dev.dividerGet())
+
+def _words(bits, msb_first):
+    '''Pack rows of bits into integers'''
+    numpy = _buffer.numpy
+    count = bits.shape[1]
+    shifts = numpy.arange(count)
+    if msb_first:
+        shifts = shifts[::-1]
+    return (bits.astype(numpy.int64) << shifts).sum(axis=1)
+
+def _data(words, width):
+    if width <= 8:
+        return bytes(bytearray(int(w) for w in words))
+    return tuple(int(w) for w in words)
+
+def _rising(line):
+    numpy = _buffer.numpy
+    return numpy.flatnonzero(~line[:-1] & line[1:]) + 1
+
+def _falling(line):
+    numpy = _buffer.numpy
+    return numpy.flatnonzero(line[:-1] & ~line[1:]) + 1
+
+class _Decoder(object):
+    '''Chunk handling common to the decoders.
+
+    Subclasses implement `_decode(x, base)`, which returns the records found
+    in the packed samples `x` (whose first sample is at index `base`) and
+    the index of the first sample not consumed. The edges are only looked
+    for from index 1: the sample before the unconsumed ones is kept with
+    them, to find the edges at the start of the next chunk.
+    '''
+    def __init__(self, rate):
+        super(_Decoder, self).__init__()
+        if _buffer.numpy is None:
+            raise ImportError("decoding requires NumPy")
+        if hasattr(rate, 'dividerGet'):
+            rate = sample_rate(rate)
+        self.rate = float(rate)
+        self.reset()
+
+    def reset(self):
+        '''Forget the samples kept, and restart at sample index 0.'''
+        self.position = 0
+        self._tail = None
+        self._base = 0
+
+    def feed(self, data):
+        '''Decode a chunk of samples.
+
+        Args:
+            data: Array of packed samples, or a dwf.DwfStreamChunk.
+
+        Returns:
+            list of dwf.DwfDecodeRecord, for the frames completed.
+        '''
+        numpy = _buffer.numpy
+        if hasattr(data, 'spans'):
+            gaps = tuple(data.spans())
+            data = data.data
+        else:
+            gaps = ()
+        x = numpy.asarray(data)
+        records = []
+        start = 0
+        for offset, count in gaps + ((len(x), 0),):
+            records.extend(self._feed(x[start:offset]))
+            if count:
+                # the frame in progress is lost
+                self._tail = None
+                self.position += count
+            start = offset
+        return records
+
+    def _feed(self, x):
+        numpy = _buffer.numpy
+        if self._tail is None:
+            base = self.position
+        else:
+            base = self._base
+            x = numpy.concatenate((self._tail, x))
+        self.position = base + len(x)
+        if len(x) < 2:
+            records, consumed = [], len(x)
+        else:
+            records, consumed = self._decode(x, base)
+        keep = max(int(consumed) - 1, 0)
+        self._tail = x[keep:].copy()
+        self._base = base + keep
+        return records
+
+    def decode(self, data):
+        '''Decode a whole capture, from sample index 0.'''
+        self.reset()
+        return self.feed(data)
+
+    def decode_transitions(self, transitions):
+        '''Decode a whole capture from its transition list, without
+        expanding the samples.
+
+        Args:
+            transitions (dwf.DwfTransitions): Capture
+
+        Returns:
+            list of dwf.DwfDecodeRecord
+        '''
+        self.reset()
+        if len(transitions) < 2:
+            return []
+        # each transition stands for the run of samples it starts
+        records, consumed = self._decode(transitions.values, 0)
+        indexes = transitions.indexes
+        return [r._replace(index=int(indexes[r.index]),
+                           time=indexes[r.index] / self.rate)
+                for r in records]
+
+    def _bit(self, x, pin):
+        return ((x >> pin) & 1).astype(bool)
+
+    def _record(self, index, data, errors=(), info=None):
+        return DwfDecodeRecord(index, index / self.rate, data, tuple(errors),
+                               info or {})
+
+class DwfUartDecoder(_Decoder):
+    '''Asynchronous serial (UART) decoder, one record per character.
+
+    Args:
+        rate (float): Sample rate (Hz), or the dwf.DwfDigitalIn instrument
+            to read it from.
+        rx (int): DIO pin of the line.
+        baud (float): Baud rate.
+        bits (int): Data bits. Default is 8.
+        parity (str): None, 'even' or 'odd'. Default is None.
+        stop (int): Stop bits. Default is 1.
+        inverted (bool): Line is low when idle. Default is False.
+
+    Records: `errors` can hold 'parity' and 'framing' (a stop bit is low).
+    '''
+    def __init__(self, rate, rx, baud, bits=8, parity=None, stop=1,
+                 inverted=False):
+        if parity not in (None, 'even', 'odd'):
+            raise ValueError("parity must be None, 'even' or 'odd'")
+        super(DwfUartDecoder, self).__init__(rate)
+        numpy = _buffer.numpy
+        self.rx = rx
+        self.baud = float(baud)
+        self.bits = bits
+        self.parity = parity
+        self.stop = stop
+        self.inverted = inverted
+        count = 1 + bits + (parity is not None) + stop
+        per_bit = self.rate / self.baud
+        # sample each bit in its middle, from the start bit falling edge
+        self._offsets = numpy.round(
+            (numpy.arange(count) + 0.5) * per_bit).astype(numpy.int64)
+
+    def _line(self, x):
+        line = self._bit(x, self.rx)
+        return ~line if self.inverted else line
+
+    def _decode(self, x, base):
+        line = self._line(x)
+        return self._frames(_falling(line), len(line), line.__getitem__, base)
+
+    def decode_transitions(self, transitions):
+        # the bits are sampled in the middle of their period: look the line
+        # level up in the list at these times
+        numpy = _buffer.numpy
+        self.reset()
+        indexes = transitions.indexes
+        line = self._line(transitions.values)
+        def sample(positions):
+            return line[numpy.searchsorted(indexes, positions, 'right') - 1]
+        return self._frames(
+            indexes[_falling(line)], transitions.samples, sample, 0)[0]
+
+    def _frames(self, falls, size, sample, base):
+        '''Find the frames starting at the falling edges `falls` of a line of
+        `size` samples, `sample(positions)` returning the line levels.'''
+        numpy = _buffer.numpy
+        offsets = self._offsets
+        starts = []
+        consumed = size
+        k = 0
+        while k < len(falls):
+            start = falls[k]
+            if start + offsets[-1] >= size:
+                consumed = start # frame not complete
+                break
+            if sample(start + offsets[0]):
+                k += 1 # glitch, not a start bit
+                continue
+            starts.append(start)
+            # the next start bit comes after the middle of the stop bit
+            k = numpy.searchsorted(falls, start + offsets[-1], 'right')
+        if not starts:
+            return [], consumed
+        starts = numpy.array(starts)
+        frames = sample(starts[:, None] + offsets)
+        bits = frames[:, 1:1 + self.bits]
+        words = _words(bits, False)
+        errors = numpy.zeros((len(starts), 2), bool)
+        if self.parity is not None:
+            ones = bits.sum(axis=1) + frames[:, 1 + self.bits]
+            errors[:, 0] = ones % 2 != (self.parity == 'odd')
+        errors[:, 1] = ~frames[:, -self.stop:].all(axis=1)
+        records = []
+        for start, word, (parity, framing) in zip(starts, words, errors):
+            names = ('parity',) * int(parity) + ('framing',) * int(framing)
+            records.append(self._record(base + int(start),
+                                        _data((word,), self.bits), names))
+        return records, consumed
+
+class DwfSpiDecoder(_Decoder):
+    '''SPI decoder.
+
+    With a chip select pin, there is one record per transaction (chip select
+    active); without, one record per word.
+
+    Args:
+        rate (float): Sample rate (Hz), or the dwf.DwfDigitalIn instrument
+            to read it from.
+        sclk (int): DIO pin of the clock.
+        mosi (int): DIO pin of the controller output.
+        miso (int): DIO pin of the controller input. Default is None.
+        cs (int): DIO pin of the active low chip select. Default is None.
+        mode (int): SPI mode, 0 to 3 (clock polarity * 2 + phase). Default
+            is 0.
+        bits (int): Bits per word. Default is 8.
+        msb_first (bool): Default is True.
+
+    Records: `data` holds the MOSI words and `info['miso']` the MISO words.
+    `errors` can hold 'incomplete' (chip select released in the middle of a
+    word; the partial word is dropped).
+    '''
+    def __init__(self, rate, sclk, mosi, miso=None, cs=None, mode=0, bits=8,
+                 msb_first=True):
+        super(DwfSpiDecoder, self).__init__(rate)
+        self.sclk = sclk
+        self.mosi = mosi
+        self.miso = miso
+        self.cs = cs
+        self.mode = mode
+        self.bits = bits
+        self.msb_first = msb_first
+
+    def _edges(self, x):
+        clock = self._bit(x, self.sclk)
+        polarity, phase = self.mode >> 1, self.mode & 1
+        # data is sampled on the rising edge in modes 0 and 3
+        if polarity == phase:
+            return _rising(clock)
+        return _falling(clock)
+
+    def _words(self, x, edges):
+        '''MOSI and MISO words sampled at `edges` (a multiple of `bits`)'''
+        result = []
+        for pin in (self.mosi, self.miso):
+            if pin is None:
+                result.append(None)
+                continue
+            bits = self._bit(x, pin)[edges].reshape(-1, self.bits)
+            result.append(_words(bits, self.msb_first))
+        return result
+
+    def _transaction(self, index, x, edges, errors=()):
+        mosi, miso = self._words(x, edges)
+        info = {}
+        if miso is not None:
+            info['miso'] = _data(miso, self.bits)
+        return self._record(index, _data(mosi, self.bits), errors, info)
+
+    def _decode(self, x, base):
+        numpy = _buffer.numpy
+        edges = self._edges(x)
+        if self.cs is None:
+            count = len(edges) // self.bits
+            records = []
+            for i in range(count):
+                word = edges[i * self.bits:(i + 1) * self.bits]
+                records.append(self._transaction(
+                    base + int(word[0]), x, word))
+            if count * self.bits < len(edges):
+                return records, int(edges[count * self.bits])
+            return records, len(x)
+        active = ~self._bit(x, self.cs)
+        begins, ends = _rising(active), _falling(active)
+        records = []
+        for begin in begins:
+            k = numpy.searchsorted(ends, begin)
+            if k == len(ends):
+                return records, int(begin) # transaction not complete
+            end = ends[k]
+            inside = edges[numpy.searchsorted(edges, begin):
+                           numpy.searchsorted(edges, end)]
+            count = len(inside) // self.bits
+            errors = ('incomplete',) if count * self.bits < len(inside) else ()
+            records.append(self._transaction(
+                base + int(begin), x, inside[:count * self.bits], errors))
+        return records, len(x)
+
+class DwfI2cDecoder(_Decoder):
+    '''I2C decoder, one record per transfer (from a start or repeated start
+    condition to the next stop or repeated start).
+
+    Args:
+        rate (float): Sample rate (Hz), or the dwf.DwfDigitalIn instrument
+            to read it from.
+        scl (int): DIO pin of the clock.
+        sda (int): DIO pin of the data.
+
+    Records: `data` holds the bytes after the address byte. `info` holds
+    'address' (7 bit), 'read' (bool), 'acks' (one bool per byte, address
+    included) and 'stop' (False for a repeated start). `errors` can hold
+    'nack' (the address was not acknowledged) and 'incomplete' (a byte was
+    cut by a start or stop condition).
+    '''
+    def __init__(self, rate, scl, sda):
+        super(DwfI2cDecoder, self).__init__(rate)
+        self.scl = scl
+        self.sda = sda
+
+    def _decode(self, x, base):
+        numpy = _buffer.numpy
+        scl = self._bit(x, self.scl)
+        sda = self._bit(x, self.sda)
+        # SDA changes while SCL is high: start (falling) or stop (rising)
+        falls, rises = _falling(sda), _rising(sda)
+        starts = falls[scl[falls] & scl[falls - 1]]
+        stops = rises[scl[rises] & scl[rises - 1]]
+        conditions = numpy.union1d(starts, stops)
+        clocks, releases = _rising(scl), _falling(scl)
+        records = []
+        for start in starts:
+            k = numpy.searchsorted(conditions, start, 'right')
+            if k == len(conditions):
+                return records, int(start) # transfer not complete
+            end = conditions[k]
+            inside = clocks[numpy.searchsorted(clocks, start):
+                            numpy.searchsorted(clocks, end)]
+            if len(inside):
+                # SCL rises before a stop or repeated start: not a bit
+                k = numpy.searchsorted(releases, inside[-1])
+                if k == len(releases) or releases[k] > end:
+                    inside = inside[:-1]
+            count = len(inside) // 9
+            errors = []
+            if count * 9 < len(inside):
+                errors.append('incomplete')
+            groups = sda[inside[:count * 9]].reshape(count, 9)
+            words = _words(groups[:, :8], True)
+            acks = tuple(bool(a) for a in ~groups[:, 8])
+            info = {'acks': acks, 'stop': bool(end in stops)}
+            if count:
+                info['address'] = int(words[0]) >> 1
+                info['read'] = bool(words[0] & 1)
+                if not acks[0]:
+                    errors.append('nack')
+            records.append(self._record(
+                base + int(start), _data(words[1:], 8), errors, info))
+        return records, len(x)
@@ -3,7 +3,11 @@
 
 import sys
 import os
+import array
 from ctypes import *
+from ctypes import _Pointer
+
+from ._buffer import numpy as _np
 
 if sys.platform.startswith("win"):
     dwfdll = cdll.dwf
@@ -206,9 +210,7 @@ class DWFError(RuntimeError):
         return "ERROR(%d): %s" % (
             self.error, self.errormsg)
 def _mkstring(buf):
-    if sys.version_info[0] >= 3:
-        return bytes(buf.value).decode('latin-1')
-    return str(buf.value)
+    return bytes(buf.value).decode('latin-1')
 
 _ARGIN = 1
 _ARGOUT = 2
@@ -231,6 +233,61 @@ def _define(funcname, protos, params, prefix=""):
 def _xdefine(funcname, protos, params):
     _define(funcname, protos, params, prefix="_")
 
+# format characters accepted for typed sample buffers; c_ubyte buffers take
+# any format, since they are only a destination for raw bytes.
+_BUFFER_FORMATS = {c_double: 'd', c_short: 'h'}
+def _c_array(buf, ctype, count=None, writable=True):
+    '''Return a ctypes array of `ctype` sharing memory with `buf`.
+
+    `buf` may be a ctypes object (returned unchanged) or any writable,
+    C-contiguous object supporting the buffer protocol: array.array,
+    bytearray, memoryview, numpy.ndarray (or a contiguous slice of one).
+
+    For input-only data (`writable` False), read-only buffers such as bytes
+    are accepted too, and copied once.
+    '''
+    if isinstance(buf, (Array, _Pointer)):
+        return buf
+    try:
+        view = memoryview(buf)
+    except TypeError:
+        # not a buffer (byref(), c_void_p, ...): let ctypes convert it
+        return buf
+    if view.readonly and writable:
+        raise TypeError("sample buffer must be writable")
+    if not view.c_contiguous:
+        raise ValueError("sample buffer must be C contiguous")
+    if ctype in _BUFFER_FORMATS:
+        if view.format.lstrip('@=<') != _BUFFER_FORMATS[ctype]:
+            raise TypeError("sample buffer format '%s' does not match '%s'" % (
+                view.format, _BUFFER_FORMATS[ctype]))
+    length = view.nbytes // sizeof(ctype)
+    if count is not None and count > length:
+        raise ValueError("sample buffer holds %d items, %d requested" % (
+            length, count))
+    if view.readonly:
+        return (ctype * length).from_buffer_copy(view.cast('B'))
+    return (ctype * length).from_buffer(view.cast('B'))
+
+def _c_input(data, ctype, typecode, count=None):
+    '''Return a ctypes array of `ctype` holding the input samples `data`.
+
+    Contiguous buffers of the right type (numpy float64 arrays, array('d'),
+    ctypes arrays, ...) are passed without copying; anything else (lists,
+    other dtypes, strided arrays) is converted in a single bulk operation.
+    '''
+    if isinstance(data, (Array, _Pointer)):
+        return data
+    try:
+        return _c_array(memoryview(data), ctype, count, writable=False)
+    except (TypeError, ValueError):
+        pass # not a buffer, or not the right format / layout
+    if _np is not None:
+        data = _np.ascontiguousarray(data, dtype=typecode).ravel()
+    else:
+        data = array.array(typecode, data)
+    return _c_array(data, ctype, count, writable=False)
+
 # Error and version APIs:
 #  FDwfGetLastError(DWFERC *pdwferc);
 _define("FDwfGetLastError",
@@ -383,12 +440,46 @@ _xdefine("FDwfAnalogInStatusData",
 def FDwfAnalogInStatusData(hdwf, idxChannel,
                            rgdVoltData_or_cdData, cdData=None):
     if cdData is not None:
-        return _FDwfAnalogInStatusData(hdwf, idxChannel,
-                                       rgdVoltData_or_cdData, cdData)
+        rgdVoltData = _c_array(rgdVoltData_or_cdData, c_double, cdData)
+        return _FDwfAnalogInStatusData(hdwf, idxChannel, rgdVoltData, cdData)
     cdData = int(rgdVoltData_or_cdData)
     rgdVoltData = (c_double * cdData)()
     _FDwfAnalogInStatusData(hdwf, idxChannel, rgdVoltData, cdData)
     return tuple(rgdVoltData)
+#  FDwfAnalogInStatusData2(HDWF hdwf, int idxChannel, double *rgdVoltData, int idxData, int cdData);
+_xdefine("FDwfAnalogInStatusData2",
+         (HDWF, c_int, POINTER(c_double), c_int, c_int,),
+         ((_ARGIN, "hdwf"), (_ARGIN, "idxChannel"), (_ARGIN, "rgdVoltData"),
+          (_ARGIN, "idxData"), (_ARGIN, "cdData"),))
+def FDwfAnalogInStatusData2(hdwf, idxChannel,
+                            rgdVoltData_or_idxData, idxData_or_cdData,
+                            cdData=None):
+    if cdData is not None:
+        rgdVoltData = _c_array(rgdVoltData_or_idxData, c_double, cdData)
+        return _FDwfAnalogInStatusData2(
+            hdwf, idxChannel, rgdVoltData, idxData_or_cdData, cdData)
+    idxData = int(rgdVoltData_or_idxData)
+    cdData = int(idxData_or_cdData)
+    rgdVoltData = (c_double * cdData)()
+    _FDwfAnalogInStatusData2(hdwf, idxChannel, rgdVoltData, idxData, cdData)
+    return tuple(rgdVoltData)
+#  FDwfAnalogInStatusData16(HDWF hdwf, int idxChannel, short *rgu16Data, int idxData, int cdData);
+_xdefine("FDwfAnalogInStatusData16",
+         (HDWF, c_int, POINTER(c_short), c_int, c_int,),
+         ((_ARGIN, "hdwf"), (_ARGIN, "idxChannel"), (_ARGIN, "rgu16Data"),
+          (_ARGIN, "idxData"), (_ARGIN, "cdData"),))
+def FDwfAnalogInStatusData16(hdwf, idxChannel,
+                             rgu16Data_or_idxData, idxData_or_cdData,
+                             cdData=None):
+    if cdData is not None:
+        rgu16Data = _c_array(rgu16Data_or_idxData, c_short, cdData)
+        return _FDwfAnalogInStatusData16(
+            hdwf, idxChannel, rgu16Data, idxData_or_cdData, cdData)
+    idxData = int(rgu16Data_or_idxData)
+    cdData = int(idxData_or_cdData)
+    rgu16Data = (c_short * cdData)()
+    _FDwfAnalogInStatusData16(hdwf, idxChannel, rgu16Data, idxData, cdData)
+    return tuple(rgu16Data)
 #  FDwfAnalogInStatusNoise(HDWF hdwf, int idxChannel, double *rgdMin, double *rgdMax, int cdData);
 _xdefine("FDwfAnalogInStatusNoise",
          (HDWF, c_int, POINTER(c_double), POINTER(c_double), c_int,),
@@ -398,7 +489,8 @@ def FDwfAnalogInStatusNoise(hdwf, dxChannel,
                             rgdMin_or_cdData, rgdMax=None, cdData=None):
     if rgdMax is not None and cdData is not None:
         return _FDwfAnalogInStatusNoise(
-            hdwf, dxChannel, rgdMin_or_cdData, rgdMax, cdData)
+            hdwf, dxChannel, _c_array(rgdMin_or_cdData, c_double, cdData),
+            _c_array(rgdMax, c_double, cdData), cdData)
     cdData = rgdMin_or_cdData
     rgdMin = (c_double * cdData)()
     rgdMax = (c_double * cdData)()
@@ -948,12 +1040,9 @@ _xdefine("FDwfAnalogOutNodeDataSet",
          ((_ARGIN, "hdwf"), (_ARGIN, "idxChannel"), (_ARGIN, "node"),
           (_ARGIN, "rgdData"), (_ARGIN, "cdData"), ))
 def FDwfAnalogOutNodeDataSet(hdwf, idxChannel, node, rgdData, cdData=None):
-    if cdData is not None:
-        return _FDwfAnalogOutNodeDataSet(
-            hdwf, idxChannel, node, rgdData, cdData)
-    cdData = len(rgdData)
-    rgdData_ = (c_double * cdData)()
-    for i, v in enumerate(rgdData): rgdData_[i] = rgdData[i]
+    rgdData_ = _c_input(rgdData, c_double, 'd', cdData)
+    if cdData is None:
+        cdData = len(rgdData_)
     return _FDwfAnalogOutNodeDataSet(hdwf, idxChannel, node, rgdData_, cdData)
 
 # needed for EExplorer, don't care for ADiscovery
@@ -991,12 +1080,9 @@ _xdefine("FDwfAnalogOutNodePlayData",
          ((_ARGIN, "hdwf"), (_ARGIN, "idxChannel"), (_ARGIN, "node"),
           (_ARGIN, "rgdData"), (_ARGIN, "cdData"),))
 def FDwfAnalogOutNodePlayData(hdwf, idxChannel, node, rgdData, cdData=None):
-    if cdData is not None:
-        return _FDwfAnalogOutNodePlayData(
-            hdwf, idxChannel, node, rgdData, cdData)
-    cdData = len(rgdData)
-    rgdData_ = (c_double * cdData)()
-    for i, v in enumerate(rgdData): rgdData_[i] = rgdData[i]
+    rgdData_ = _c_input(rgdData, c_double, 'd', cdData)
+    if cdData is None:
+        cdData = len(rgdData_)
     return _FDwfAnalogOutNodePlayData(hdwf, idxChannel, node, rgdData_, cdData)
 
 # ANALOG IO INSTRUMENT FUNCTIONS
@@ -1177,11 +1263,29 @@ _xdefine("FDwfDigitalInStatusData",
          ((_ARGIN, "hdwf"), (_ARGIN, "rgData"), (_ARGIN, "countOfDataBytes"),))
 def FDwfDigitalInStatusData(hdwf, rgData_or_count, countOfDataBytes=None):
     if countOfDataBytes is not None:
-        return _FDwfDigitalInStatusData(hdwf, rgData_or_count, countOfDataBytes)
+        rgData = _c_array(rgData_or_count, c_ubyte, countOfDataBytes)
+        return _FDwfDigitalInStatusData(hdwf, rgData, countOfDataBytes)
     countOfDataBytes = rgData_or_count
     rgData = (c_ubyte * countOfDataBytes)()
     _FDwfDigitalInStatusData(hdwf, rgData, countOfDataBytes)
-    return tuple([ rgData[i] for i in range(countOfDataBytes) ])
+    return tuple(rgData)
+#  FDwfDigitalInStatusData2(HDWF hdwf, void *rgData, int idxSample, int countOfDataBytes);
+_xdefine("FDwfDigitalInStatusData2",
+         (HDWF, POINTER(c_ubyte), c_int, c_int,),
+         ((_ARGIN, "hdwf"), (_ARGIN, "rgData"), (_ARGIN, "idxSample"),
+          (_ARGIN, "countOfDataBytes"),))
+def FDwfDigitalInStatusData2(hdwf, rgData_or_idxSample,
+                             idxSample_or_countOfDataBytes,
+                             countOfDataBytes=None):
+    if countOfDataBytes is not None:
+        rgData = _c_array(rgData_or_idxSample, c_ubyte, countOfDataBytes)
+        return _FDwfDigitalInStatusData2(
+            hdwf, rgData, idxSample_or_countOfDataBytes, countOfDataBytes)
+    idxSample = int(rgData_or_idxSample)
+    countOfDataBytes = int(idxSample_or_countOfDataBytes)
+    rgData = (c_ubyte * countOfDataBytes)()
+    _FDwfDigitalInStatusData2(hdwf, rgData, idxSample, countOfDataBytes)
+    return tuple(rgData)
 #  FDwfDigitalInStatusRecord(HDWF hdwf, int *pcdDataAvailable, int *pcdDataLost, int *pcdDataCorrupt);
 _define("FDwfDigitalInStatusRecord",
         (HDWF, POINTER(c_int), POINTER(c_int), POINTER(c_int),),
@@ -1531,41 +1635,15 @@ _xdefine("FDwfDigitalOutDataSet",
           (_ARGIN, "rgBits"), (_ARGIN, "countOfBits"),))
 def FDwfDigitalOutDataSet(hdwf, idxChannel, rgBits, countOfBits=None):
     if countOfBits is not None:
-        return _FDwfDigitalOutDataSet(hdwf, idxChannel, rgBits, countOfBits)
-    if type(rgBits[0]) is tuple: #rgBits is sequence of tuple
-        countOfBits = len(rgBits)*2
-        rgBits_ = (c_ubyte * ((countObBits + 7)// 8))()
-        index = 0
-        byte = 0x00
-        mask = 0x01
-        for io, oe in rgBits:
-            if io: byte |= mask
-            mask <<= 1
-            if oe: byte |= mask
-            mask <<= 1
-            if mask > 0x80:
-                rgBits_[index] = byte
-                mask = 0x01
-                byte = 0x00
-                index += 1
-        if index != len(rgBits_):
-            rgBits_[index] = byte
-    else:
-        countOfBits = len(rgBits)
-        rgBits_ = (c_ubyte * ((countOfBits + 7)// 8))()
-        index = 0
-        byte = 0x00
-        mask = 0x01
-        for io in rgBits:
-            if io: byte |= mask
-            mask <<= 1
-            if mask > 0x80:
-                rgBits_[index] = byte
-                mask = 0x01
-                byte = 0x00
-                index += 1
-        if index != len(rgBits_):
-            rgBits_[index] = byte
+        rgBits_ = _c_array(rgBits, c_ubyte, (countOfBits + 7) // 8,
+                           writable=False)
+        return _FDwfDigitalOutDataSet(hdwf, idxChannel, rgBits_, countOfBits)
+    if _is_tristate(rgBits): #rgBits is sequence of tuple
+        rgBits = interleave_tristate(rgBits)
+    countOfBits = len(rgBits)
+    packed = pack_bits(rgBits)
+    rgBits_ = (c_ubyte * max(len(packed), 1)).from_buffer_copy(
+        packed or b'\x00')
     return _FDwfDigitalOutDataSet(hdwf, idxChannel, rgBits_, countOfBits)
 # bits order is lsb first
 #  for TS output the count of bits its the total number of IO|OE bits,
@@ -1577,7 +1655,115 @@ def FDwfDigitalOutDataSet(hdwf, idxChannel, rgBits, countOfBits=None):
 # [ (IO, OE), (IO, OE) ... (IO, OE) ]
 
 # FDwfDigitalOutDataSet support functions
-def create_bitdata_stream(data, bits, msb_first=False):
+_BIT_CHARS = bytes(bytearray([0x30] + [0x31] * 255)) # 0 -> '0', others -> '1'
+def _bit_bytes(bits):
+    '''One byte (0 or non zero) per bit, for the pure Python fallbacks'''
+    if isinstance(bits, (bytes, bytearray)):
+        return bits
+    if isinstance(bits, memoryview):
+        return bits.tobytes()
+    return bytearray(1 if b else 0 for b in bits)
+
+def _is_tristate(rgBits):
+    '''True for a sequence of (IO, OE) tuples, or an (N, 2) array'''
+    if getattr(rgBits, 'ndim', 1) == 2:
+        return True
+    return len(rgBits) > 0 and isinstance(rgBits[0], tuple)
+
+def pack_bits(bits, msb_first=False):
+    '''Pack a sequence of bits into bytes.
+
+    Bit 0 of the sequence is stored in the LSB of the first byte, which is the
+    order FDwfDigitalOutDataSet expects, or in the MSB when `msb_first` is set.
+    The last byte is padded with zeros.
+
+    Args:
+        bits: Sequence of bits: list of bools / ints, bytes or bytearray
+            holding one bit per byte, or a NumPy (bool) array.
+        msb_first (bool): Pack each byte MSB first. Default is False.
+
+    Returns:
+        Packed bits (bytes)
+    '''
+    if _np is not None:
+        if isinstance(bits, (bytes, bytearray, memoryview)):
+            bits = _np.frombuffer(bits, dtype=_np.uint8)
+        bits = _np.asarray(bits).ravel() != 0
+        return _np.packbits(
+            bits, bitorder='big' if msb_first else 'little').tobytes()
+    text = _bit_bytes(bits).translate(_BIT_CHARS).decode('ascii')
+    if not text:
+        return b''
+    count = (len(text) + 7) // 8
+    if msb_first:
+        text = text + '0' * (count * 8 - len(text))
+        return int(text, 2).to_bytes(count, 'big')
+    return int(text[::-1], 2).to_bytes(count, 'little')
+
+def interleave_tristate(io, oe=None):
+    '''Build the IO|OE|IO|OE|... bit sequence used by the tri-state output.
+
+    Args:
+        io: IO (output value) bits, or a sequence of (IO, OE) tuples / an
+            (N, 2) array when `oe` is None.
+        oe: OE (output enable) bits. Default is None.
+
+    Returns:
+        Interleaved bits, twice the length of `io` (NumPy bool array, or
+        bytearray of 0 / 1 without NumPy).
+    '''
+    if oe is None:
+        if _np is not None:
+            return _np.asarray(io).reshape(-1, 2).ravel() != 0
+        io, oe = zip(*io) if len(io) else ((), ())
+    if _np is not None:
+        result = _np.empty(2 * len(io), dtype=bool)
+        result[0::2] = _np.asarray(io) != 0
+        result[1::2] = _np.asarray(oe) != 0
+        return result
+    result = bytearray(2 * len(io))
+    result[0::2] = _bit_bytes(io)
+    result[1::2] = _bit_bytes(oe)
+    return result
+
+def _uint64_words(data, bits):
+    '''`data` as a NumPy uint64 array, the negative words in two's
+    complement; None without NumPy, or for words NumPy cannot hold.'''
+    if _np is None or bits > 64:
+        return None
+    try:
+        words = _np.asarray(data)
+        if words.dtype.kind == 'O': # integers of more than 64 bits
+            return None
+        return words.astype(_np.uint64)
+    except (OverflowError, ValueError):
+        return None
+
+def create_bitdata_stream(data, bits, msb_first=False, as_array=False):
+    '''Serialize data words into a bit sequence for FDwfDigitalOutDataSet.
+
+    Args:
+        data: Sequence of integers
+        bits (int): Number of bits per word
+        msb_first (bool): Send each word MSB first. Default is False (LSB
+            first).
+        as_array (bool): Return a NumPy bool array. Default is False.
+
+    Returns:
+        Bit sequence: list of bools, or NumPy bool array with `as_array`
+
+    Raises:
+        ImportError: `as_array` is set and NumPy is not installed.
+    '''
+    if as_array and _np is None:
+        raise ImportError("as_array requires NumPy")
+    words = _uint64_words(data, bits)
+    if words is not None:
+        shifts = _np.arange(bits, dtype=_np.uint64)
+        if msb_first:
+            shifts = shifts[::-1]
+        result = ((words.reshape(-1, 1) >> shifts) & 1).astype(bool).ravel()
+        return result if as_array else result.tolist()
     result = []
     for v in data:
         for i in range(bits):
@@ -1586,15 +1772,36 @@ def create_bitdata_stream(data, bits, msb_first=False):
             else:
                 mask = 1 << i
             result.append((v & mask) != 0)
-    return result
-def create_bus_bitdata_streams(data, bits):
+    return _np.array(result, bool) if as_array else result
+def create_bus_bitdata_streams(data, bits, as_array=False):
+    '''Split data words into one bit sequence per bus line.
+
+    Args:
+        data: Sequence of integers
+        bits (int): Number of bits (bus lines)
+        as_array (bool): Return NumPy bool arrays. Default is False.
+
+    Returns:
+        Tuple of `bits` bit sequences, bit 0 first: lists of bools, or NumPy
+        bool arrays with `as_array`
+
+    Raises:
+        ImportError: `as_array` is set and NumPy is not installed.
+    '''
+    if as_array and _np is None:
+        raise ImportError("as_array requires NumPy")
+    words = _uint64_words(data, bits)
+    if words is not None:
+        result = tuple(((words >> _np.uint64(i)) & 1).astype(bool)
+                       for i in range(bits))
+        return result if as_array else tuple(d.tolist() for d in result)
     result = []
     for i in range(bits):
         d = []
         mask = 1 << i
         for v in data:
             d.append((v & mask) != 0)
-        result.append(d)
+        result.append(_np.array(d, bool) if as_array else d)
     return tuple(result)
 
 # OBSOLETE, do not use them:
@@ -1722,12 +1929,10 @@ _xdefine("FDwfAnalogOutPlayData",
          ((_ARGIN, "hdwf"), (_ARGIN, "idxChannel"),
           (_ARGIN, "rgdData"), (_ARGIN, "cdData"),))
 def FDwfAnalogOutPlayData(hdwf, idxChannel, rgdData, cdData=None):
-    if cdData is not None:
-        return _FDwfAnalogOutPlayData(hdwf, idxChannel, rgdData, cdData)
-    cdData = len(rgdData)
-    rgdData_ = (c_double * cdData)()
-    for i, v in enumerate(cdData): rgdData_[i] = rgdData[i]
-    return _FDwfAnalogOutPlayData(hdwf, idxChannel, rgdData, cdData)
+    rgdData_ = _c_input(rgdData, c_double, 'd', cdData)
+    if cdData is None:
+        cdData = len(rgdData_)
+    return _FDwfAnalogOutPlayData(hdwf, idxChannel, rgdData_, cdData)
 #  FDwfEnumAnalogInChannels(int idxDevice, int *pnChannels);
 _define("FDwfEnumAnalogInChannels",
         (c_int, POINTER(c_int),),
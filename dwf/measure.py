@@ -0,0 +1,362 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Incremental measurements on streamed samples.
+
+The statistics are updated chunk by chunk and carried across the chunk
+boundaries, so a stream (see `dwf.DwfAnalogIn.stream`,
+`dwf.DwfDigitalIn.stream`) can be monitored for as long as needed without
+keeping its samples:
+    - `DwfAnalogInMeasure`: DC mean, RMS, AC RMS, min, max, peak-to-peak,
+      rising edge frequency and period, and duty cycle of each channel.
+    - `DwfDigitalInMeasure`: frequency, period and duty cycle of each bit.
+
+Frequency and duty cycle are measured over the whole periods between the
+first and the last rising edge seen.
+'''
+
+import math
+
+from . import _buffer
+
+class _EdgeCounter(object):
+    '''Rising edges and high time of a logic signal, across chunks.
+
+    Lost samples split the signal into segments: the periods are measured
+    in each contiguous segment and summed, as the edges in a gap are not
+    seen.'''
+    def __init__(self):
+        super(_EdgeCounter, self).__init__()
+        self.state = None # unknown
+        self.edges = 0
+        self.high = 0 # high samples before the current chunk
+        # whole periods of the closed segments
+        self._periods = 0
+        self._span = 0
+        self._high_time = 0
+        self._segment()
+
+    def _segment(self):
+        self._edges = 0
+        self.first = None
+        self.last = None
+        self._high_first = 0
+        self._high_last = 0
+
+    def update(self, state, position, known=0):
+        '''Add a chunk of states (booleans), the first one at sample index
+        `position`. The states before index `known` are not valid, so no
+        edge is detected there.'''
+        numpy = _buffer.numpy
+        if not len(state):
+            return
+        if numpy is not None:
+            state = numpy.asarray(state, bool)
+            rising = numpy.flatnonzero(state[1:] & ~state[:-1]) + 1
+            rising = rising[rising > known]
+            if self.state is False and state[0]:
+                rising = numpy.concatenate(([0], rising))
+            highs = numpy.cumsum(state)
+            # high samples before the first and the last edge only
+            before = [int(highs[i - 1]) if i else 0
+                      for i in rising[[0, -1]]] if len(rising) else []
+            total = int(highs[-1])
+            if known < len(state):
+                self.state = bool(state[-1])
+        else:
+            rising, before, total = [], [], 0
+            previous = self.state
+            for i, s in enumerate(state):
+                if i < known:
+                    s = None
+                elif s and previous is False:
+                    rising.append(i)
+                    before.append(total)
+                total += bool(s)
+                previous = None if s is None else bool(s)
+            self.state = previous
+        if len(rising):
+            if self.first is None:
+                self.first = position + int(rising[0])
+                self._high_first = self.high + before[0]
+            self.last = position + int(rising[-1])
+            self._high_last = self.high + before[-1]
+            self._edges += len(rising)
+            self.edges += len(rising)
+        self.high += total
+
+    def gap(self):
+        '''Samples were lost: close the current segment, no edge can be
+        detected across the gap.'''
+        self.state = None
+        if self._edges >= 2:
+            self._periods += self._edges - 1
+            self._span += self.last - self.first
+            self._high_time += self._high_last - self._high_first
+        self._segment()
+
+    def results(self, rate):
+        periods, span, high = self._periods, self._span, self._high_time
+        if self._edges >= 2:
+            periods += self._edges - 1
+            span += self.last - self.first
+            high += self._high_last - self._high_first
+        if not periods:
+            return {'frequency': None, 'period': None, 'duty': None}
+        frequency = periods * rate / float(span)
+        return {
+            'frequency': frequency,
+            'period': 1.0 / frequency,
+            'duty': high / float(span),
+        }
+
+def _spans(data, lost):
+    '''Contiguous parts of `data` (array, or tuple of arrays) as (part,
+    lost) pairs, `lost` being the samples lost before the part. A
+    dwf.DwfStreamChunk is split where its samples were lost.'''
+    if hasattr(data, 'spans'):
+        gaps = tuple(data.spans())
+        data = data.data
+    else:
+        gaps = ((0, lost),) if lost else ()
+    channels = isinstance(data, tuple)
+    length = len(data[0]) if channels and data else len(data)
+    start, before = 0, 0
+    for offset, count in gaps + ((length, 0),):
+        if channels:
+            part = tuple(d[start:offset] for d in data)
+        else:
+            part = data[start:offset]
+        yield part, before
+        start, before = offset, count
+
+def _hysteresis(data, low, high, state):
+    '''Logic state of analog samples: high above `high`, low below `low`,
+    unchanged in between.
+
+    Args:
+        state: State before the first sample, None if unknown.
+
+    Returns:
+        (states, known): `known` is the index of the first valid state. When
+        `state` is unknown, the samples before the first threshold crossing
+        read as low.
+    '''
+    numpy = _buffer.numpy
+    if numpy is not None:
+        x = numpy.asarray(data)
+        above = x > high
+        marks = above | (x < low)
+        last = numpy.maximum.accumulate(
+            numpy.where(marks, numpy.arange(1, len(x) + 1), 0))
+        known = 0
+        if state is None:
+            known = int(marks.argmax()) if marks.any() else len(x)
+        return numpy.where(last > 0, above[last - 1], bool(state)), known
+    result = []
+    known = 0 if state is not None else None
+    state = bool(state)
+    for i, x in enumerate(data):
+        if x > high or x < low:
+            state = x > high
+            if known is None:
+                known = i
+        result.append(state)
+    return result, len(result) if known is None else known
+
+class DwfAnalogInMeasure(object):
+    '''Scope measurements of Analog In channels, updated incrementally.
+
+    Example:
+    >>> meas = dwf.DwfAnalogInMeasure(2, dev.frequencyGet())
+    >>> for chunk in meas.attach(dev.stream(65536)):
+    ...     print(meas.results()[0]['frequency'])
+
+    Args:
+        channels (int): Number of channels.
+        rate (float): Sample rate (Hz).
+        level (float): Edge detection level (V). Default is None, which uses
+            the middle of the first chunk's range of each channel.
+        hysteresis (float): Edge detection hysteresis (V): the signal must
+            cross `level` +/- `hysteresis` / 2. Default is 0.
+
+    Attributes:
+        samples (int): Samples measured, per channel.
+    '''
+    def __init__(self, channels, rate, level=None, hysteresis=0.0):
+        super(DwfAnalogInMeasure, self).__init__()
+        self.channels = int(channels)
+        self.rate = float(rate)
+        self.level = level
+        self.hysteresis = hysteresis
+        self.reset()
+
+    def reset(self):
+        '''Restart the measurements.'''
+        self.samples = 0
+        self._position = 0
+        self._levels = [self.level] * self.channels
+        self._sum = [0.0] * self.channels
+        self._squares = [0.0] * self.channels
+        self._min = [float('inf')] * self.channels
+        self._max = [float('-inf')] * self.channels
+        self._edges = [_EdgeCounter() for _ in range(self.channels)]
+
+    def add(self, data, lost=0):
+        '''Add samples.
+
+        Args:
+            data: A tuple with one array per channel, or a
+                dwf.DwfStreamChunk (its lost samples are then put where they
+                were).
+            lost (int): Samples lost before `data`. Default is 0.
+        '''
+        for part, lost in _spans(data, lost):
+            if lost:
+                self._position += lost
+                for edges in self._edges:
+                    edges.gap()
+            self._add(part)
+
+    def _add(self, data):
+        numpy = _buffer.numpy
+        for c, part in enumerate(data):
+            if not len(part):
+                continue
+            if numpy is not None:
+                x = numpy.asarray(part)
+                low, high = float(x.min()), float(x.max())
+                self._sum[c] += float(x.sum())
+                self._squares[c] += float(numpy.dot(x, x))
+            else:
+                low, high = min(part), max(part)
+                self._sum[c] += sum(part)
+                self._squares[c] += sum(v * v for v in part)
+            self._min[c] = min(self._min[c], low)
+            self._max[c] = max(self._max[c], high)
+            if self._levels[c] is None:
+                self._levels[c] = (low + high) / 2.0
+            level, half = self._levels[c], self.hysteresis / 2.0
+            edges = self._edges[c]
+            state, known = _hysteresis(part, level - half, level + half,
+                                       edges.state)
+            edges.update(state, self._position, known)
+        if len(data):
+            self.samples += len(data[0])
+            self._position += len(data[0])
+
+    def results(self):
+        '''Measurements of each channel.
+
+        Returns:
+            list with a dict per channel: mean, rms, ac_rms, min, max,
+            pk2pk, frequency (Hz), period (s) and duty (0 to 1). The edge
+            based values are None until two rising edges were seen.
+        '''
+        result = []
+        for c in range(self.channels):
+            if not self.samples:
+                result.append(None)
+                continue
+            mean = self._sum[c] / self.samples
+            square = self._squares[c] / self.samples
+            values = {
+                'mean': mean,
+                'rms': math.sqrt(square),
+                'ac_rms': math.sqrt(max(square - mean * mean, 0.0)),
+                'min': self._min[c],
+                'max': self._max[c],
+                'pk2pk': self._max[c] - self._min[c],
+            }
+            values.update(self._edges[c].results(self.rate))
+            result.append(values)
+        return result
+
+    def attach(self, stream):
+        '''Measure the chunks of a record stream as they are iterated.
+
+        Yields:
+            The chunks, after measuring them.
+        '''
+        for chunk in stream:
+            self.add(chunk)
+            yield chunk
+
+class DwfDigitalInMeasure(object):
+    '''Frequency and duty cycle of Digital In bits, updated incrementally.
+
+    Example:
+    >>> meas = dwf.DwfDigitalInMeasure([0, 3], rate)
+    >>> for chunk in meas.attach(dev.stream(65536)):
+    ...     print(meas.results()[3]['frequency'])
+
+    Args:
+        bits (list): Bit indexes in the samples to measure.
+        rate (float): Sample rate (Hz).
+
+    Attributes:
+        samples (int): Samples measured.
+    '''
+    def __init__(self, bits, rate):
+        super(DwfDigitalInMeasure, self).__init__()
+        self.bits = tuple(bits)
+        self.rate = float(rate)
+        self.reset()
+
+    def reset(self):
+        '''Restart the measurements.'''
+        self.samples = 0
+        self._position = 0
+        self._edges = [_EdgeCounter() for _ in self.bits]
+
+    def add(self, data, lost=0):
+        '''Add samples.
+
+        Args:
+            data: Array of samples, or a dwf.DwfStreamChunk (its lost
+                samples are then put where they were).
+            lost (int): Samples lost before `data`. Default is 0.
+        '''
+        for part, lost in _spans(data, lost):
+            if lost:
+                self._position += lost
+                for edges in self._edges:
+                    edges.gap()
+            self._add(part)
+
+    def _add(self, data):
+        numpy = _buffer.numpy
+        if numpy is not None:
+            data = numpy.asarray(data)
+        for bit, edges in zip(self.bits, self._edges):
+            if numpy is not None:
+                state = (data >> bit) & 1
+            else:
+                state = [(v >> bit) & 1 for v in data]
+            edges.update(state, self._position)
+        self.samples += len(data)
+        self._position += len(data)
+
+    def results(self):
+        '''Measurements of each bit.
+
+        Returns:
+            dict of {bit: dict of frequency (Hz), period (s), duty (0 to 1)
+            and edges (rising edges seen)}.
+        '''
+        result = {}
+        for bit, edges in zip(self.bits, self._edges):
+            values = edges.results(self.rate)
+            values['edges'] = edges.edges
+            result[bit] = values
+        return result
+
+    def attach(self, stream):
+        '''Measure the chunks of a record stream as they are iterated.
+
+        Yields:
+            The chunks, after measuring them.
+        '''
+        for chunk in stream:
+            self.add(chunk)
+            yield chunk
@@ -0,0 +1,125 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Poll scheduling for the streaming instruments.
+
+Polling the instrument status in a tight loop burns a CPU core, and a fixed
+sleep either adds latency or lets the device buffer overflow. The scheduler
+works out when to poll next from the rate the device buffer fills at (or,
+for Analog Out play mode, empties at) so the buffer stays around a target
+fill level.
+'''
+
+import time
+
+# Poll at least every POLL_MAX seconds, and at most every POLL_MIN seconds.
+POLL_MIN = 0.001
+POLL_MAX = 0.1
+
+def poll_interval(seconds, fraction=0.25):
+    '''Poll interval for an instrument filling its buffer in `seconds`.
+
+    A `fraction` of the buffer duration, bounded by POLL_MIN and POLL_MAX.
+    '''
+    return min(max(seconds * fraction, POLL_MIN), POLL_MAX)
+
+class DwfPollScheduler(object):
+    '''Adaptive poll timing for a device buffer.
+
+    Call `update` after each status read with the buffer level: the samples
+    available for an acquisition (`statusRecord`), or the free samples for
+    Analog Out play mode (`nodePlayStatus`). The buffer is assumed to be
+    drained (or refilled) after each poll. The fill rate is estimated from
+    the level and the time elapsed since the previous poll (increases are
+    followed at once, decreases are smoothed), and `wait` sleeps until the
+    buffer reaches `target` of its size.
+
+    Example:
+    >>> sched = dwf.DwfPollScheduler(dev.frequencyGet(), dev.bufferSizeGet())
+    >>> while True:
+    ...     dev.status(True)
+    ...     available, lost, corrupted = dev.statusRecord()
+    ...     sched.update(available, lost)
+    ...     read(available)
+    ...     sched.wait()
+
+    Args:
+        rate (float): Nominal sample rate (Hz), used until the fill rate is
+            measured.
+        buffer_size (int): Device buffer size in samples.
+        target (float): Buffer fill level to poll at, as a fraction of its
+            size. Default is 0.5.
+        min_interval (float): Shortest interval (s). Default is POLL_MIN.
+        max_interval (float): Longest interval (s). Default is POLL_MAX.
+
+    Attributes:
+        fill_rate (float): Estimated fill rate (samples per second).
+        max_fill (float): Largest buffer level seen, as a fraction of its
+            size. 1.0 or more means the buffer overflowed.
+        overflows (int): Polls where the buffer was full or samples were
+            lost.
+        polls (int): Number of updates.
+    '''
+    # weight of the last measurement when the fill rate decreases
+    SMOOTHING = 0.25
+
+    def __init__(self, rate, buffer_size, target=0.5, min_interval=POLL_MIN,
+                 max_interval=POLL_MAX):
+        super(DwfPollScheduler, self).__init__()
+        self.rate = float(rate)
+        self.buffer_size = max(int(buffer_size), 1)
+        self.target = target
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.fill_rate = self.rate
+        self.max_fill = 0.0
+        self.overflows = 0
+        self.polls = 0
+        self._last = None
+        self._next = None
+
+    @property
+    def headroom(self):
+        '''Unused part of the buffer at the fullest poll (fraction).'''
+        return max(1.0 - self.max_fill, 0.0)
+
+    def interval(self):
+        '''Time (s) for the buffer to fill up to the target level.'''
+        if self.fill_rate <= 0:
+            return self.max_interval
+        seconds = self.target * self.buffer_size / self.fill_rate
+        return min(max(seconds, self.min_interval), self.max_interval)
+
+    def update(self, level, lost=0):
+        '''Record the buffer level read at a poll, and plan the next one.
+
+        Args:
+            level (int): Samples in the buffer (available or free).
+            lost (int): Samples lost since the previous poll. Default is 0.
+        '''
+        now = time.monotonic()
+        level += lost
+        if self._last is not None and now > self._last:
+            measured = level / (now - self._last)
+            if measured > self.fill_rate:
+                # filling faster than expected: follow at once
+                self.fill_rate = measured
+            else:
+                self.fill_rate += self.SMOOTHING * (measured - self.fill_rate)
+        fill = float(level) / self.buffer_size
+        self.max_fill = max(self.max_fill, fill)
+        if lost or fill >= 1.0:
+            self.overflows += 1
+        self.polls += 1
+        self._last = now
+        self._next = now + self.interval()
+
+    def delay(self):
+        '''Time (s) left until the next poll.'''
+        if self._next is None:
+            return self.interval()
+        return max(self._next - time.monotonic(), 0.0)
+
+    def wait(self):
+        '''Sleep until the next poll.'''
+        time.sleep(self.delay())
@@ -0,0 +1,190 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Pool of opened devices.
+
+Opening a device takes about a second. With a pool set as `dwf.Dwf.pool`,
+the instruments lease a handle kept open by the pool instead: closing an
+instrument resets the device and keeps the handle for the next one, and a
+device unused for `idle_timeout` seconds is closed.
+'''
+
+import threading
+
+from . import api
+
+class _Entry(object):
+    '''Pooled handle and its leases'''
+    __slots__ = ('handle', 'refs', 'timer')
+
+    def __init__(self, handle):
+        self.handle = handle
+        self.refs = 0
+        self.timer = None
+
+class _HDwfLease(object):
+    '''Lease of a pooled handle, passed to the DWF functions like
+    dwf.api._HDwf. Closing it (or deleting it) gives the handle back.
+
+    Attributes:
+        handle (dwf.api._HDwf): Pooled handle, the same for all the leases
+            of a device: the per device state (executor, shadow cache) is
+            keyed on it.
+    '''
+    def __init__(self, pool, key, handle):
+        super(_HDwfLease, self).__init__()
+        self.pool = pool
+        self.key = key
+        self.handle = handle
+        self._released = False
+
+    @property
+    def hdwf(self):
+        if self._released:
+            return api._l.hdwfNone
+        return self.handle.hdwf
+
+    @property
+    def _as_parameter_(self):
+        return self.hdwf
+
+    def close(self):
+        '''Give the handle back to the pool.'''
+        if not self._released:
+            self._released = True
+            self.pool.release(self.key)
+
+    def __del__(self):
+        self.close()
+
+class DwfHandlePool(object):
+    '''Process-wide pool of device handles, keyed by serial number and
+    configuration, shared by reference counting.
+
+    Example:
+    >>> dwf.Dwf.pool = dwf.DwfHandlePool(idle_timeout=60)
+    >>> dev = dwf.DwfAnalogIn() # opens the first device
+    >>> dev.close()             # resets it, the handle stays open
+    >>> dev = dwf.DwfAnalogIn() # same handle, no delay
+
+    Args:
+        idle_timeout (float): Seconds a device without lease stays open.
+            Default is 60. None keeps it open until `close`.
+    '''
+    def __init__(self, idle_timeout=60.0):
+        super(DwfHandlePool, self).__init__()
+        self.idle_timeout = idle_timeout
+        self._entries = {}
+        self._serials = {} # device index: serial number, at the last FDwfEnum
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def leases(self, serial, config=None):
+        '''Number of leases of a pooled device, None if it is not open.'''
+        entry = self._entries.get((serial, config))
+        return None if entry is None else entry.refs
+
+    def lease(self, idxDevice=-1, idxCfg=None):
+        '''Lease the handle of a device, opening it if it is not pooled.
+
+        The devices are enumerated only when the pool does not hold the
+        device; an index refers to the enumeration of the last miss.
+
+        Args:
+            idxDevice (int): Device index. Default is -1, which takes a
+                pooled device, or else the first device not opened.
+            idxCfg (int): Device configuration. Default is None (current).
+
+        Returns:
+            Lease, used as the `hdwf` of a dwf.Dwf.
+
+        Raises:
+            RuntimeError: The device is not found.
+        '''
+        with self._lock:
+            # pool hit: no enumeration
+            if idxDevice < 0:
+                for key in self._entries:
+                    if key[1] == idxCfg:
+                        return self._lease(key)
+            elif (self._serials.get(idxDevice), idxCfg) in self._entries:
+                return self._lease((self._serials[idxDevice], idxCfg))
+            _l = api._l
+            count = _l.FDwfEnum(api.ENUMFILTER.ALL)
+            self._serials = dict((i, _l.FDwfEnumSN(i)) for i in range(count))
+            if idxDevice < 0:
+                indexes = range(count)
+            elif idxDevice < count:
+                indexes = [idxDevice]
+            else:
+                raise RuntimeError("Device is not found")
+            for i in indexes:
+                key = (self._serials[i], idxCfg)
+                if key in self._entries:
+                    return self._lease(key)
+            for i in indexes:
+                if idxDevice >= 0 or not _l.FDwfEnumDeviceIsOpened(i):
+                    self._open(i, self._serials[i], idxCfg)
+                    return self._lease((self._serials[i], idxCfg))
+            raise RuntimeError("Device is not found")
+
+    def _open(self, idxDevice, serial, idxCfg):
+        _l = api._l
+        if idxCfg is None:
+            hdwf = _l.FDwfDeviceOpen(idxDevice)
+        else:
+            hdwf = _l.FDwfDeviceConfigOpen(idxDevice, idxCfg)
+        if hdwf == _l.hdwfNone:
+            raise RuntimeError("Device is not found")
+        handle = api._HDwf(hdwf)
+        handle.pooled = True
+        self._entries[(serial, idxCfg)] = _Entry(handle)
+
+    def _lease(self, key):
+        entry = self._entries[key]
+        if entry.timer is not None:
+            entry.timer.cancel()
+            entry.timer = None
+        entry.refs += 1
+        return _HDwfLease(self, key, entry.handle)
+
+    def release(self, key):
+        '''End a lease: the device is reset once its last lease ends.'''
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None: # closed meanwhile
+                return
+            entry.refs -= 1
+            if entry.refs:
+                return
+            api._l.FDwfDeviceReset(entry.handle)
+            # the settings kept for the handle are those of the last lease
+            api._shadows.pop(entry.handle, None)
+            api._keep_sample_format(entry.handle, None)
+            if self.idle_timeout is not None:
+                entry.timer = threading.Timer(
+                    self.idle_timeout, self._expire, (key, entry))
+                entry.timer.daemon = True
+                entry.timer.start()
+
+    def _expire(self, key, entry):
+        with self._lock:
+            if self._entries.get(key) is entry and not entry.refs:
+                del self._entries[key]
+                self._close(entry)
+
+    @staticmethod
+    def _close(entry):
+        if entry.timer is not None:
+            entry.timer.cancel()
+        entry.handle.pooled = False
+        entry.handle.close()
+
+    def close(self):
+        '''Close every pooled device, leased or not.'''
+        with self._lock:
+            entries, self._entries = self._entries, {}
+            for entry in entries.values():
+                self._close(entry)
@@ -0,0 +1,198 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Direct to disk recording.
+
+A record stream (see `dwf.DwfAnalogIn.stream`, `dwf.DwfDigitalIn.stream`) is
+written chunk by chunk into a preallocated, memory-mapped file, so the
+capture length is only limited by the disk.
+
+Two file formats are supported:
+    - '.npy': a NumPy array file, readable with `numpy.load(path,
+      mmap_mode='r')`. The metadata is written next to it, in `path.json`.
+    - raw: a 32 byte header (see RAW_HEADER), the samples, then the metadata
+      as JSON.
+
+Analog In samples are float64, stored channel after channel (shape
+`(channels, samples)`); Digital In samples are uint8, uint16 or uint32
+(shape `(samples,)`). Lost samples are not in the file: the `lost` and
+`corrupted` metadata entries list `[index, count]` spans, where `index` is
+the first sample recorded after the span.
+'''
+
+import array
+import json
+import mmap
+import struct
+import sys
+import time
+
+from . import _buffer
+
+# magic, version, data offset, data size (bytes), metadata offset
+RAW_HEADER = struct.Struct('<6sHQQQ')
+RAW_MAGIC = b'DWFREC'
+RAW_VERSION = 1
+
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+
+def _descr(typecode):
+    '''NumPy type description of an `array` type code'''
+    itemsize = array.array(typecode).itemsize
+    kind = 'f' if typecode == 'd' else 'u'
+    order = '|' if itemsize == 1 else ('<' if sys.byteorder == 'little' else '>')
+    return '%s%s%d' % (order, kind, itemsize)
+
+def _npy_header(descr, shape):
+    '''Version 1.0 .npy header'''
+    header = "{'descr': '%s', 'fortran_order': False, 'shape': %r, }" % (
+        descr, tuple(shape))
+    # the data starts on a 64 bytes boundary
+    size = len(NPY_MAGIC) + 2 + len(header) + 1
+    header += ' ' * (-size % 64) + '\n'
+    return NPY_MAGIC + struct.pack('<H', len(header)) + header.encode('latin1')
+
+class DwfRecordFile(object):
+    '''Memory-mapped record file, written one chunk at a time.
+
+    Args:
+        path (str): File path. A '.npy' extension selects the NumPy format.
+        typecode (str): `array` type code of the samples ('d', 'B', 'H', 'I')
+        channels (int): Number of channels, or None for a single array of
+            samples (Digital In).
+        samples (int): Samples per channel to preallocate.
+        metadata (dict): Instrument metadata to store.
+        fmt (str): 'npy' or 'raw'. Default is None, which uses the extension.
+    '''
+    def __init__(self, path, typecode, channels, samples, metadata=None,
+                 fmt=None):
+        super(DwfRecordFile, self).__init__()
+        if fmt is None:
+            fmt = 'npy' if path.endswith('.npy') else 'raw'
+        if fmt not in ('npy', 'raw'):
+            raise ValueError("unknown record file format %r" % fmt)
+        self.path = path
+        self.fmt = fmt
+        self.itemsize = array.array(typecode).itemsize
+        self.channels = channels
+        self.samples = int(samples)
+        shape = (self.samples,) if channels is None else (channels, self.samples)
+        self.metadata = dict(metadata or {})
+        self.metadata.update({
+            'dtype': _descr(typecode),
+            'shape': list(shape),
+            'samples': 0,
+            'lost': [],
+            'corrupted': [],
+            'created': time.time(),
+        })
+        nbytes = self.itemsize * self.samples * (channels or 1)
+        if fmt == 'npy':
+            header = _npy_header(self.metadata['dtype'], shape)
+        else:
+            header = b'\0' * RAW_HEADER.size
+        self.offset = len(header)
+        self.nbytes = nbytes
+        self._file = open(path, 'w+b')
+        self._file.write(header)
+        self._file.truncate(self.offset + nbytes)
+        self._map = mmap.mmap(self._file.fileno(), self.offset + nbytes)
+        self._view = memoryview(self._map)
+
+    def write(self, chunk):
+        '''Copy a dwf.DwfStreamChunk into the file.'''
+        count = len(chunk)
+        if chunk.index + count > self.samples:
+            raise ValueError("record file is full")
+        parts = chunk.data if self.channels is not None else (chunk.data,)
+        for channel, part in enumerate(parts):
+            start = self.offset + self.itemsize * (
+                channel * self.samples + chunk.index)
+            nbytes = count * self.itemsize
+            self._view[start:start + nbytes] = memoryview(part).cast('B')[:nbytes]
+        for offset, lost in chunk.spans():
+            self.metadata['lost'].append([chunk.index + offset, lost])
+        if chunk.corrupted:
+            self.metadata['corrupted'].append([chunk.index, chunk.corrupted])
+        self.metadata['samples'] = max(
+            self.metadata['samples'], chunk.index + count)
+
+    def close(self):
+        '''Flush the samples and write the metadata.'''
+        if self._map is None:
+            return
+        self._view.release()
+        self._map.flush()
+        self._map.close()
+        self._map = None
+        metadata = json.dumps(self.metadata, sort_keys=True).encode('utf-8')
+        if self.fmt == 'npy':
+            with open(self.path + '.json', 'wb') as f:
+                f.write(metadata)
+        else:
+            self._file.seek(self.offset + self.nbytes)
+            self._file.write(metadata)
+            self._file.seek(0)
+            self._file.write(RAW_HEADER.pack(
+                RAW_MAGIC, RAW_VERSION, self.offset, self.nbytes,
+                self.offset + self.nbytes))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+def record(stream, path, metadata=None, fmt=None):
+    '''Run a record stream and write it to a file.
+
+    Args:
+        stream (dwf.DwfAnalogInStream or dwf.DwfDigitalInStream): Stream with
+            a known number of samples.
+        path (str): File path, see DwfRecordFile.
+        metadata (dict): Instrument metadata to store.
+        fmt (str): 'npy' or 'raw'. Default is None, which uses the extension.
+
+    Returns:
+        dict of the metadata written.
+    '''
+    if stream.samples is None:
+        raise ValueError("the number of samples to record must be known")
+    channels = getattr(stream, 'channels', None)
+    metadata = dict(metadata or {})
+    metadata['rate'] = stream.frequency
+    with DwfRecordFile(path, stream.typecode,
+                       None if channels is None else len(channels),
+                       stream.samples, metadata, fmt) as f:
+        for chunk in stream:
+            f.write(chunk)
+    return f.metadata
+
+def load(path):
+    '''Open a record file, memory-mapped. Requires NumPy.
+
+    Args:
+        path (str): File written by `record`.
+
+    Returns:
+        (numpy.memmap of the samples, dict of the metadata). Only the first
+        `metadata['samples']` samples of each channel were recorded.
+    '''
+    numpy = _buffer.numpy
+    if numpy is None:
+        raise ImportError("loading record files requires NumPy")
+    with open(path, 'rb') as f:
+        magic = f.read(RAW_HEADER.size)
+        if magic.startswith(NPY_MAGIC[:6]):
+            with open(path + '.json', 'rb') as m:
+                metadata = json.loads(m.read().decode('utf-8'))
+            return numpy.load(path, mmap_mode='r'), metadata
+        magic, version, offset, nbytes, meta_offset = RAW_HEADER.unpack(magic)
+        if magic != RAW_MAGIC:
+            raise ValueError("%s is not a record file" % path)
+        f.seek(meta_offset)
+        metadata = json.loads(f.read().decode('utf-8'))
+    data = numpy.memmap(path, dtype=metadata['dtype'], mode='r',
+                        offset=offset, shape=tuple(metadata['shape']))
+    return data, metadata
@@ -0,0 +1,248 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Pattern and trigger search over Digital In captures. Requires NumPy.
+
+The conditions are set in the terms of `dwf.DwfDigitalIn.triggerSet`: pins
+that must be low, pins that must be high, and pins of which a rising or a
+falling edge is awaited. Like the trigger detector, a condition is true on a
+sample when every level holds and, if any edge is set, one of the edges
+happens there.
+
+`DwfPatternSearch` scans the samples chunk by chunk with array operations,
+carrying the last sample and the sequence state over the chunk boundaries,
+and returns the sample indexes of the matches. It works as a software
+post-trigger on captures too long to be searched with Python loops.
+'''
+
+from collections import namedtuple
+
+from . import _buffer
+
+class DwfDigitalTrigger(namedtuple('DwfDigitalTrigger',
+                                   'level_low level_high edge_rise edge_fall')):
+    '''Trigger condition of a search step, as in `triggerSet`.
+
+    Any 4-tuple (level_low, level_high, edge_rise, edge_fall) can be used
+    instead, like the value returned by `dwf.DwfDigitalIn.triggerGet`.
+
+    Example:
+    >>> dwf.DwfDigitalTrigger(edge_rise=0x01)         # DIO 0 rising
+    >>> dwf.DwfDigitalTrigger.pattern(0xff00, 0x1200) # DIO 15..8 == 0x12
+
+    Args:
+        level_low (int): Pins that must be low.
+        level_high (int): Pins that must be high.
+        edge_rise (int): Pins of which a rising edge is awaited.
+        edge_fall (int): Pins of which a falling edge is awaited.
+    '''
+    __slots__ = ()
+
+    def __new__(cls, level_low=0, level_high=0, edge_rise=0, edge_fall=0):
+        return super(DwfDigitalTrigger, cls).__new__(
+            cls, level_low, level_high, edge_rise, edge_fall)
+
+    @classmethod
+    def pattern(cls, mask, value, edge_rise=0, edge_fall=0):
+        '''Condition on the bus value: `sample & mask == value & mask`.'''
+        return cls(mask & ~value, mask & value, edge_rise, edge_fall)
+
+    def match(self, data, previous=None):
+        '''Samples meeting the condition.
+
+        Args:
+            data: numpy.ndarray of samples.
+            previous (int): Sample before `data`. Default is None (unknown):
+                no edge is detected on the first sample.
+
+        Returns:
+            numpy.ndarray of bool.
+        '''
+        numpy = _buffer.numpy
+        low, high, rise, fall = self
+        result = (data & (low | high)) == high
+        if rise or fall:
+            before = numpy.empty_like(data)
+            before[1:] = data[:-1]
+            if len(data):
+                before[0] = data[0] if previous is None else previous
+            edges = ((data & ~before) & rise) | ((before & ~data) & fall)
+            result &= edges != 0
+        return result
+
+class DwfPatternSearch(object):
+    '''Search of a condition, or of a sequence of conditions, in Digital In
+    samples.
+
+    A step with edges matches on each edge. A step with levels only matches
+    on the samples where its condition becomes true, so a bus value held
+    for many samples is found once. A sequence matches when each step
+    matches after the previous one; the index of a match is that of its
+    last step, and the search of the next match starts after it.
+
+    Example:
+    >>> search = dwf.DwfPatternSearch((0, 0, 0x01, 0)) # DIO 0 rising
+    >>> search.find(data)
+    >>> search = dwf.DwfPatternSearch(
+    ...     dwf.DwfDigitalTrigger.pattern(0xff, 0x12),
+    ...     dwf.DwfDigitalTrigger.pattern(0xff, 0x34))
+    >>> for chunk in dev.stream(65536, samples=10**8):
+    ...     matches = search.add(chunk)
+
+    Args:
+        *steps: Conditions, as dwf.DwfDigitalTrigger or 4-tuples.
+        every (bool): Match level conditions on every sample where they
+            hold, not only on the first one of each run. Default is False.
+
+    Attributes:
+        samples (int): Samples searched, lost ones included.
+        matches (int): Matches found.
+    '''
+    def __init__(self, *steps, **kwargs):
+        super(DwfPatternSearch, self).__init__()
+        if _buffer.numpy is None:
+            raise ImportError("pattern search requires NumPy")
+        if not steps:
+            raise ValueError("at least one condition is needed")
+        self.steps = tuple(DwfDigitalTrigger(*step) for step in steps)
+        self.every = kwargs.pop('every', False)
+        if kwargs:
+            raise TypeError("unexpected argument %r" % next(iter(kwargs)))
+        self.reset()
+
+    def reset(self):
+        '''Restart the search.'''
+        self.samples = 0
+        self.matches = 0
+        self._restart()
+
+    def _restart(self):
+        self._previous = None
+        self._active = [False] * len(self.steps)
+        self._step = 0
+
+    def find(self, data):
+        '''Search an array of samples on its own.
+
+        Returns:
+            numpy.ndarray of the match indexes in `data`.
+        '''
+        self.reset()
+        return self.add(data)
+
+    def add(self, data, lost=0):
+        '''Search the next samples of a capture.
+
+        Args:
+            data: Array of samples, or a dwf.DwfStreamChunk. The edges and
+                the sequence in progress are lost with lost samples.
+            lost (int): Samples lost before `data`. Default is 0.
+
+        Returns:
+            numpy.ndarray of the match indexes, counted from the start of
+            the capture.
+        '''
+        numpy = _buffer.numpy
+        if hasattr(data, 'spans'):
+            gaps = tuple(data.spans())
+            data = data.data
+        else:
+            gaps = ((0, lost),) if lost else ()
+        x = numpy.asarray(data)
+        results = []
+        start = 0
+        for offset, count in gaps + ((len(x), 0),):
+            results.append(self._add(x[start:offset]))
+            if count:
+                self.samples += count
+                self._restart()
+            start = offset
+        result = numpy.concatenate(results)
+        self.matches += len(result)
+        return result
+
+    def _add(self, x):
+        numpy = _buffer.numpy
+        if not len(x):
+            return numpy.empty(0, numpy.int64)
+        events = []
+        for k, step in enumerate(self.steps):
+            match = step.match(x, self._previous)
+            if self.every or step.edge_rise or step.edge_fall:
+                events.append(numpy.flatnonzero(match))
+            else:
+                rise = numpy.flatnonzero(match[1:] & ~match[:-1]) + 1
+                if match[0] and not self._active[k]:
+                    rise = numpy.concatenate(([0], rise))
+                events.append(rise)
+            self._active[k] = bool(match[-1])
+        self._previous = x[-1]
+        found = []
+        # complete the sequence in progress
+        position = 0
+        if self._step:
+            self._step, last = self._follow(events, self._step, position)
+            if self._step:
+                self.samples += len(x)
+                return numpy.empty(0, numpy.int64)
+            found.append([last])
+            position = last + 1
+        if len(self.steps) == 1:
+            first = events[0]
+            found.append(first[numpy.searchsorted(first, position):])
+        else:
+            found.append(self._sequences(events, position))
+            if len(found[-1]):
+                position = found[-1][-1] + 1
+            self._step, _ = self._follow(events, 0, position)
+        self.samples += len(x)
+        return numpy.concatenate(found).astype(numpy.int64) + (
+            self.samples - len(x))
+
+    @staticmethod
+    def _follow(events, step, position):
+        '''Go through the steps from `step` on, each one after `position`
+        and after the previous step.
+
+        Returns:
+            (step, index): 0 and the index of the last step when the sequence
+            completes, or the step waited for and None.
+        '''
+        numpy = _buffer.numpy
+        index = None
+        while step < len(events):
+            e = events[step]
+            i = numpy.searchsorted(e, position)
+            if i == len(e):
+                return step, None
+            index = int(e[i])
+            position = index + 1
+            step += 1
+        return 0, index
+
+    @staticmethod
+    def _sequences(events, position):
+        '''Complete sequences starting from `position`, without overlap.'''
+        numpy = _buffer.numpy
+        starts = events[0][numpy.searchsorted(events[0], position):]
+        # earliest completion of a sequence from each start
+        ends = starts
+        for e in events[1:]:
+            i = numpy.searchsorted(e, ends, 'right')
+            ends = e[i[i < len(e)]]
+        starts = starts[:len(ends)]
+        result = []
+        i = 0
+        while i < len(ends):
+            result.append(ends[i])
+            i = numpy.searchsorted(starts, ends[i], 'right')
+        return numpy.array(result, numpy.int64)
+
+    def attach(self, stream):
+        '''Search the chunks of a record stream as they are iterated.
+
+        Yields:
+            (chunk, matches) tuples.
+        '''
+        for chunk in stream:
+            yield chunk, self.add(chunk)
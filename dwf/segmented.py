@@ -0,0 +1,121 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Segmented (multi-frame) triggered acquisition.
+
+The instrument is configured once, then re-armed with `configure(False,
+True)` as soon as each frame is copied. The frames are written straight into
+one preallocated (frames x channels x samples) array, so there is no
+allocation nor configuration call between two triggers, which keeps the
+dead time between frames short.
+'''
+
+import time
+
+from . import _buffer
+from .stream import enabled_channels
+
+class DwfAnalogInSegments(object):
+    '''Frames captured by `DwfAnalogIn.segmented`.
+
+    Attributes:
+        data: float64 samples, numpy.ndarray of shape (frames, channels,
+            samples). Without NumPy, a flat array.array in the same order.
+        timestamps: Time (s) each frame was seen done, from the first arm
+            (time.perf_counter), one float64 per frame.
+        channels (tuple): Channel indexes.
+        samples (int): Samples per frame and channel.
+        count (int): Number of frames captured, less than the number
+            allocated if the capture timed out or was stopped.
+    '''
+    def __init__(self, frames, channels, samples):
+        super(DwfAnalogInSegments, self).__init__()
+        self.channels = tuple(channels)
+        self.samples = int(samples)
+        self.count = 0
+        self.timestamps = _buffer.empty(frames, 'd')
+        self.data = _buffer.empty(frames * len(self.channels) * self.samples,
+                                  'd')
+        if _buffer.numpy is not None:
+            self.data = self.data.reshape(
+                frames, len(self.channels), self.samples)
+
+    def __len__(self):
+        return self.count
+
+    def frame(self, index):
+        '''Samples of a frame, one array per channel.'''
+        if _buffer.numpy is not None:
+            return tuple(self.data[index])
+        size = self.samples
+        start = index * len(self.channels) * size
+        return tuple(self.data[start + i * size:start + (i + 1) * size]
+                     for i in range(len(self.channels)))
+
+    def intervals(self):
+        '''Time (s) between consecutive frames: trigger period plus re-arm
+        dead time.'''
+        return [self.timestamps[i + 1] - self.timestamps[i]
+                for i in range(self.count - 1)]
+
+def segmented(dev, frames, channels=None, samples=None, trigsrc=None,
+              position=None, timeout=None, interval=0.0):
+    '''Capture `frames` triggered acquisitions into one array.
+
+    The trigger source and position are set once; the trigger itself (type,
+    channel, level, ...) is configured by the caller beforehand.
+
+    Args:
+        dev (dwf.DwfAnalogIn): Configured instrument.
+        frames (int): Number of frames to capture.
+        channels (list): Channel indexes. Default is None, which captures
+            every enabled channel.
+        samples (int): Samples per frame. Default is None, which keeps the
+            current buffer size.
+        trigsrc (dwf.Dwf.TRIGSRC): Trigger source. Default is None (keep).
+        position (float): Trigger position (s). Default is None (keep).
+        timeout (float): Seconds to wait for each trigger. Default is None
+            (no limit).
+        interval (float): Sleep (s) between two status reads while waiting
+            for a trigger. Default is 0, which polls without sleeping for the
+            shortest re-arm time.
+
+    Returns:
+        dwf.DwfAnalogInSegments, with `count` frames captured.
+    '''
+    if channels is None:
+        channels = enabled_channels(dev)
+    dev.acquisitionModeSet(dev.ACQMODE.SINGLE)
+    if samples is not None:
+        dev.bufferSizeSet(samples)
+    if trigsrc is not None:
+        dev.triggerSourceSet(trigsrc)
+    if position is not None:
+        dev.triggerPositionSet(position)
+    segments = DwfAnalogInSegments(frames, channels, dev.bufferSizeGet())
+    size = segments.samples
+    view = memoryview(segments.data).cast('B').cast('d')
+    stamps = segments.timestamps
+    done = dev.STATE.DONE
+    clock = time.perf_counter
+    dev.configure(True, True)
+    t0 = clock()
+    try:
+        offset = 0
+        for frame in range(frames):
+            deadline = None if timeout is None else clock() + timeout
+            while dev.status(True) != done:
+                if deadline is not None and clock() > deadline:
+                    return segments
+                if interval:
+                    time.sleep(interval)
+            stamps[frame] = clock() - t0
+            for channel in segments.channels:
+                dev.statusData(channel, size, out=view[offset:offset + size])
+                offset += size
+            segments.count = frame + 1
+            if frame + 1 < frames:
+                dev.configure(False, True)
+    finally:
+        dev.configure(False, False)
+    return segments
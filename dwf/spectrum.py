@@ -0,0 +1,219 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Spectrum analysis of Analog In streams. Requires NumPy.
+
+`DwfSpectrum` estimates the power spectral density of each channel with
+Welch's method: the samples are cut into overlapping segments, windowed and
+Fourier transformed, and the periodograms are averaged. Chunks are added as
+they arrive, the samples of a segment spanning two chunks are kept until it
+is complete.
+
+Scaling: `psd` is the one-sided density in V^2/Hz, so that `density()` (its
+square root, in V/sqrt(Hz)) reads the noise floor directly, whatever the
+window and segment size. A sine wave of amplitude A shows as a peak of
+about A^2 / 2 / `rbw` in `psd`; `power()` gives the power per bin (V^2),
+where it reads A^2 / 2.
+'''
+
+import threading
+
+from . import _buffer
+
+_windows = {}
+_windows_lock = threading.Lock()
+
+def _coefficients(name, size):
+    numpy = _buffer.numpy
+    # periodic windows, for spectral analysis
+    x = 2 * numpy.pi * numpy.arange(size) / size
+    if name in ('rect', 'rectangular', 'boxcar'):
+        return numpy.ones(size)
+    terms = {
+        'hann': (0.5, 0.5),
+        'hamming': (0.54, 0.46),
+        'blackman': (0.42, 0.5, 0.08),
+        'blackmanharris': (0.35875, 0.48829, 0.14128, 0.01168),
+        'flattop': (0.21557895, 0.41663158, 0.277263158, 0.083578947,
+                    0.006947368),
+    }.get(name)
+    if terms is None:
+        raise ValueError("unknown window %r" % name)
+    w = numpy.zeros(size)
+    for k, a in enumerate(terms):
+        w += (-1) ** k * a * numpy.cos(k * x)
+    return w
+
+def get_window(name, size):
+    '''Window coefficients, cached per name and size.
+
+    Args:
+        name (str): 'hann', 'hamming', 'blackman', 'blackmanharris',
+            'flattop' or 'rect'.
+        size (int): Number of samples.
+
+    Returns:
+        Read-only numpy.ndarray
+    '''
+    key = (name, size)
+    with _windows_lock:
+        w = _windows.get(key)
+        if w is None:
+            w = _coefficients(name, size)
+            w.flags.writeable = False
+            _windows[key] = w
+    return w
+
+class DwfSpectrum(object):
+    '''Streaming Welch power spectral density, with running average and
+    peak hold.
+
+    Example:
+    >>> spec = dev.spectrum(nfft=8192)
+    >>> for chunk in spec.attach(dev.stream(65536)):
+    ...     plot(spec.frequencies, spec.density()[0])
+
+    Args:
+        rate (float): Sample rate (Hz).
+        nfft (int): Segment size. The bin width is `rate / nfft`.
+        channels (int): Number of channels. Default is 1.
+        window (str): Window name, see `get_window`. Default is 'hann'.
+        overlap (float): Overlap of consecutive segments, from 0 to less
+            than 1. Default is 0.5.
+        alpha (float): Weight of the last segment in an exponential running
+            average. Default is None, which averages all the segments with
+            the same weight.
+
+    Attributes:
+        frequencies: Frequency of each bin (Hz).
+        rbw (float): Resolution bandwidth (Hz): the equivalent noise
+            bandwidth of a bin, with the window.
+        psd: Averaged power spectral density (V^2/Hz), numpy.ndarray of
+            shape (channels, bins).
+        peak: Peak hold of the segments' PSD, like `psd`.
+        segments (int): Number of segments averaged.
+    '''
+    def __init__(self, rate, nfft, channels=1, window='hann', overlap=0.5,
+                 alpha=None):
+        super(DwfSpectrum, self).__init__()
+        numpy = _buffer.numpy
+        if numpy is None:
+            raise ImportError("spectrum analysis requires NumPy")
+        if not 0 <= overlap < 1:
+            raise ValueError("overlap must be in [0, 1)")
+        self.rate = float(rate)
+        self.nfft = int(nfft)
+        self.channels = int(channels)
+        self.window_name = window
+        self.step = max(int(round(self.nfft * (1 - overlap))), 1)
+        self.alpha = alpha
+        self._window = get_window(window, self.nfft)
+        power = float(numpy.dot(self._window, self._window))
+        self.rbw = self.rate * power / float(self._window.sum()) ** 2
+        # one-sided density: double everything but DC and Nyquist
+        scale = numpy.full(self.nfft // 2 + 1, 2.0 / (self.rate * power))
+        scale[0] /= 2
+        if self.nfft % 2 == 0:
+            scale[-1] /= 2
+        self._scale = scale
+        self.frequencies = numpy.fft.rfftfreq(self.nfft, 1.0 / self.rate)
+        self.reset()
+
+    def reset(self):
+        '''Clear the averages and the samples kept.'''
+        numpy = _buffer.numpy
+        bins = self.nfft // 2 + 1
+        self.psd = numpy.zeros((self.channels, bins))
+        self.peak = numpy.zeros((self.channels, bins))
+        self.segments = 0
+        self._tail = numpy.empty((self.channels, 0))
+
+    def add(self, data):
+        '''Add samples.
+
+        Args:
+            data: A tuple with one array per channel, or a
+                dwf.DwfStreamChunk. Lost samples break the continuity of the
+                stream: no segment spans them, the samples before them that
+                do not fill a segment are dropped.
+
+        Returns:
+            Number of new segments averaged.
+        '''
+        numpy = _buffer.numpy
+        gaps = tuple(data.spans()) if hasattr(data, 'spans') else ()
+        data = getattr(data, 'data', data)
+        x = numpy.asarray(data, 'd').reshape(self.channels, -1)
+        count = 0
+        start = 0
+        for offset, lost in gaps + ((x.shape[1], 0),):
+            count += self._add(x[:, start:offset])
+            if lost:
+                self._tail = self._tail[:, :0]
+            start = offset
+        return count
+
+    def _add(self, x):
+        numpy = _buffer.numpy
+        x = numpy.concatenate((self._tail, x), axis=1)
+        count = 0
+        if x.shape[1] >= self.nfft:
+            count = (x.shape[1] - self.nfft) // self.step + 1
+            # (channels, segments, nfft) view of the samples
+            segments = numpy.lib.stride_tricks.as_strided(
+                x, (self.channels, count, self.nfft),
+                (x.strides[0], x.strides[1] * self.step, x.strides[1]),
+                writeable=False)
+            spectra = numpy.fft.rfft(segments * self._window, axis=2)
+            psd = (spectra.real ** 2 + spectra.imag ** 2) * self._scale
+            self._average(psd)
+            numpy.maximum(self.peak, psd.max(axis=1), out=self.peak)
+        self._tail = x[:, count * self.step:].copy()
+        return count
+
+    def _average(self, psd):
+        count = psd.shape[1]
+        if self.alpha is None:
+            total = self.segments + count
+            self.psd *= self.segments / float(total)
+            self.psd += psd.sum(axis=1) / total
+        else:
+            for i in range(count):
+                if self.segments + i == 0:
+                    self.psd[:] = psd[:, i]
+                else:
+                    self.psd += self.alpha * (psd[:, i] - self.psd)
+        self.segments += count
+
+    def density(self):
+        '''Amplitude spectral density (V/sqrt(Hz)), per channel.'''
+        return _buffer.numpy.sqrt(self.psd)
+
+    def power(self):
+        '''Power in each bin (V^2), per channel.'''
+        return self.psd * self.rbw
+
+    def noise_floor(self):
+        '''Noise floor of each channel (V/sqrt(Hz)).
+
+        The median of the PSD, which is not pulled up by the tones, divided
+        by the median to mean ratio of an average of `segments` periodograms
+        of white noise (chi-square distributed).
+        '''
+        numpy = _buffer.numpy
+        if self.alpha is None:
+            k = max(self.segments, 1)
+        else:
+            k = (2 - self.alpha) / self.alpha # segments of the same variance
+        ratio = (1 - 1 / (9.0 * k)) ** 3
+        return numpy.sqrt(numpy.median(self.psd, axis=1) / ratio)
+
+    def attach(self, stream):
+        '''Add the chunks of a record stream as they are iterated.
+
+        Yields:
+            The chunks, after adding them.
+        '''
+        for chunk in stream:
+            self.add(chunk)
+            yield chunk
@@ -0,0 +1,363 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Incremental / streaming readers for the acquisition instruments.
+
+These classes only use the public methods of the instrument they are given,
+so they work with any `dwf.DwfAnalogIn` (or `dwf.DwfDigitalIn`) instance.
+'''
+
+from . import _buffer
+from .poll import DwfPollScheduler
+
+def enabled_channels(dev):
+    '''List the enabled channels of an Analog In instrument.
+
+    Args:
+        dev (dwf.DwfAnalogIn): Instrument
+
+    Returns:
+        list of channel indexes
+    '''
+    return [i for i in range(dev.channelCount()) if dev.channelEnableGet(i)]
+
+class DwfAnalogInScanReader(object):
+    '''Read only the newly written samples in the SCAN_SHIFT and SCAN_SCREEN
+    acquisition modes.
+
+    The write pointer (`statusIndexWrite`) is tracked between polls, and the
+    region written since the previous poll is copied with `statusData2`. The
+    cost of a poll is proportional to the number of new samples, not to the
+    buffer size.
+
+    The returned arrays are views of buffers reused by the next `read`, so
+    consume (or copy) them before polling again. More than one buffer of
+    samples written between two polls cannot be detected from the write
+    pointer, so poll at least once per buffer duration.
+
+    The acquisition mode and buffer size are read when the reader is created:
+    create it after configuring the instrument.
+
+    Args:
+        dev (dwf.DwfAnalogIn): Instrument to read from
+        channels (list): Channel indexes to read. Default is None, which reads
+            every enabled channel.
+    '''
+    def __init__(self, dev, channels=None):
+        super(DwfAnalogInScanReader, self).__init__()
+        if channels is None:
+            channels = enabled_channels(dev)
+        self.dev = dev
+        self.channels = tuple(channels)
+        self.shift = dev.acquisitionModeGet() == dev.ACQMODE.SCAN_SHIFT
+        self.size = dev.bufferSizeGet()
+        self.index = 0
+        self.total = 0
+        self._buffers = [_buffer.empty(self.size, 'd') for _ in self.channels]
+
+    def reset(self):
+        '''Forget the write pointer, after restarting the acquisition.'''
+        self.index = 0
+        self.total = 0
+
+    def read(self, read_status=True):
+        '''Poll the instrument and copy the samples written since the last
+        call.
+
+        Args:
+            read_status (bool): If True, call `status(True)` first. Set to
+                False when the caller already did. Default is True.
+
+        Returns:
+            Tuple with one array of new samples per channel, oldest first.
+        '''
+        if read_status:
+            self.dev.status(True)
+        index = self.dev.statusIndexWrite()
+        count = (index - self.index) % self.size
+        if self.shift:
+            # samples are returned oldest first, the new ones are at the end
+            valid = self.dev.statusSamplesValid()
+            count = min(count, valid)
+            regions = ((valid - count, count, 0),)
+        elif self.index + count <= self.size:
+            regions = ((self.index, count, 0),)
+        else:
+            first = self.size - self.index
+            regions = ((self.index, first, 0), (0, count - first, first))
+
+        result = []
+        for channel, buf in zip(self.channels, self._buffers):
+            view = memoryview(buf)
+            for idxData, num, offset in regions:
+                if num:
+                    self.dev.statusData2(
+                        channel, idxData, num, out=view[offset:])
+            result.append(buf[:count])
+        self.index = index
+        self.total += count
+        return tuple(result)
+
+class DwfStreamChunk(object):
+    '''A chunk of samples yielded by a record stream.
+
+    Attributes:
+        data: Samples. For Analog In, a tuple with one float64 array per
+            channel; for Digital In, one array of packed samples.
+        index (int): Number of samples received before this chunk.
+        lost (int): Samples lost by the device (reported by `statusRecord`)
+            since the previous chunk. They are not part of `data`.
+        corrupted (int): Samples possibly corrupted since the previous chunk.
+        gaps (tuple): Where the lost samples were, as (offset, count) pairs:
+            `count` samples were lost just before `data[offset]`.
+    '''
+    __slots__ = ('data', 'index', 'lost', 'corrupted', 'gaps')
+
+    def __init__(self, data, index, lost, corrupted, gaps=()):
+        super(DwfStreamChunk, self).__init__()
+        self.data = data
+        self.index = index
+        self.lost = lost
+        self.corrupted = corrupted
+        self.gaps = gaps
+
+    def spans(self):
+        '''Lost samples as (offset, count) pairs, from `gaps`, or at the
+        start of the chunk when only `lost` is known.'''
+        if self.gaps or not self.lost:
+            return self.gaps
+        return ((0, self.lost),)
+
+    def __len__(self):
+        if isinstance(self.data, tuple):
+            return len(self.data[0]) if self.data else 0
+        return len(self.data)
+
+class _RecordStream(object):
+    '''Common part of the record streams: polling, chunking and the lost /
+    corrupted sample counts.
+
+    Iterating runs the whole acquisition, sleeping between polls as planned
+    by `scheduler` (a dwf.DwfPollScheduler, created by `start`). It can also
+    be driven step by step with `start`, `poll` (until `done`) and `stop`,
+    which is what the asynchronous API does.
+
+    Subclasses set `frequency` and `samples`, and implement `_start`,
+    `_alloc` (buffers of one chunk), `_copy` and `_data`.
+    '''
+    def __init__(self, dev, chunk_size, samples, buffers):
+        super(_RecordStream, self).__init__()
+        self.dev = dev
+        self.chunk_size = int(chunk_size)
+        self.samples = samples
+        self.received = 0
+        self.lost = 0
+        self.corrupted = 0
+        self.done = False
+        self.scheduler = None
+        self._available, self._offset = 0, 0
+        self._ring = [self._alloc() for _ in range(buffers)]
+
+    @property
+    def pending(self):
+        '''True if samples of the last poll are still to be copied.'''
+        return self._offset < self._available
+
+    def start(self):
+        '''Start the acquisition.'''
+        self.received = 0
+        self.lost = 0
+        self.corrupted = 0
+        self.done = False
+        self._slot, self._fill = 0, 0
+        self._chunk_lost, self._chunk_corrupted = 0, 0
+        self._gaps = []
+        self._available, self._offset = 0, 0
+        self._ending = self.samples is not None and self.samples <= 0
+        self.scheduler = DwfPollScheduler(
+            self.frequency, self.dev.bufferSizeGet())
+        self._start()
+
+    def stop(self):
+        '''Stop the acquisition.'''
+        self.dev.configure(False, False)
+
+    def poll(self):
+        '''Read the instrument status, or copy the samples left from the
+        last status read.
+
+        Returns:
+            dwf.DwfStreamChunk when a chunk is complete, None otherwise. Set
+            `done` once the acquisition is over.
+        '''
+        if not self.pending and not self._ending:
+            self._read_status()
+        while self.pending:
+            count = min(self._available - self._offset,
+                        self.chunk_size - self._fill)
+            self._copy(self._ring[self._slot], self._fill, self._offset, count)
+            self._fill += count
+            self._offset += count
+            self.received += count
+            if self._fill == self.chunk_size:
+                return self._chunk()
+        if self._ending:
+            self.done = True
+            if self._fill or self._chunk_lost or self._chunk_corrupted:
+                return self._chunk()
+        return None
+
+    def _read_status(self):
+        dev = self.dev
+        sts = dev.status(True)
+        if self.received == 0 and sts in (
+                dev.STATE.CONFIG, dev.STATE.PREFILL, dev.STATE.ARMED):
+            # acquisition not yet started
+            return
+        available, cLost, cCorrupted = dev.statusRecord()
+        self.scheduler.update(available, cLost)
+        self.lost += cLost
+        self.corrupted += cCorrupted
+        self._chunk_lost += cLost
+        if cLost:
+            self._gaps.append((self._fill, cLost))
+        self._chunk_corrupted += cCorrupted
+        if sts == dev.STATE.DONE and not available:
+            self._ending = True
+        if self.samples is not None:
+            left = self.samples - self.received - self.lost
+            if available >= left:
+                available = max(left, 0)
+                self._ending = True
+        self._available, self._offset = available, 0
+
+    def _chunk(self):
+        chunk = DwfStreamChunk(self._data(self._ring[self._slot], self._fill),
+                               self.received - self._fill,
+                               self._chunk_lost, self._chunk_corrupted,
+                               tuple(self._gaps))
+        self._slot = (self._slot + 1) % len(self._ring)
+        self._fill = 0
+        self._chunk_lost, self._chunk_corrupted = 0, 0
+        self._gaps = []
+        return chunk
+
+    def __iter__(self):
+        self.start()
+        try:
+            while not self.done:
+                chunk = self.poll()
+                if chunk is not None:
+                    yield chunk
+                elif not self.pending:
+                    self.scheduler.wait()
+        finally:
+            self.stop()
+
+class DwfAnalogInStream(_RecordStream):
+    '''Record mode acquisition, yielded as fixed size chunks.
+
+    Iterating starts a RECORD mode acquisition, polls the instrument and
+    copies the samples of each channel into a ring of preallocated buffers.
+    Memory use does not depend on the capture length. A chunk's arrays are
+    reused `buffers` chunks later, so process (or copy) them before then.
+
+    The acquisition stops after `samples` samples (received or lost), after
+    `duration` seconds worth of samples at the configured frequency, or
+    never when both are None. It is stopped as well when the iteration is
+    interrupted.
+
+    Example:
+    >>> dev.frequencySet(1e6)
+    >>> for chunk in dev.stream(65536, duration=3600):
+    ...     if chunk.lost:
+    ...         print("lost %d samples" % chunk.lost)
+    ...     process(chunk.data[0])
+
+    Args:
+        dev (dwf.DwfAnalogIn): Instrument, with frequency and channels set up.
+        chunk_size (int): Samples per channel in each chunk. The last chunk
+            can be shorter.
+        channels (list): Channel indexes. Default is None, which streams every
+            enabled channel.
+        samples (int): Number of samples to acquire. Default is None.
+        duration (float): Acquisition length in seconds, used when `samples`
+            is None. Default is None.
+        buffers (int): Number of chunks in the buffer ring. Default is 4.
+    '''
+    typecode = 'd'
+
+    def __init__(self, dev, chunk_size, channels=None, samples=None,
+                 duration=None, buffers=4):
+        if channels is None:
+            channels = enabled_channels(dev)
+        self.channels = tuple(channels)
+        self.frequency = dev.frequencyGet()
+        if samples is None and duration is not None:
+            samples = int(round(duration * self.frequency))
+        super(DwfAnalogInStream, self).__init__(
+            dev, chunk_size, samples, buffers)
+
+    def _alloc(self):
+        return [_buffer.empty(self.chunk_size, 'd') for _ in self.channels]
+
+    def _start(self):
+        dev = self.dev
+        dev.acquisitionModeSet(dev.ACQMODE.RECORD)
+        if self.samples is None:
+            dev.recordLengthSet(0) # record until stopped
+        else:
+            dev.recordLengthSet(self.samples / self.frequency)
+        dev.configure(False, True)
+
+    def _copy(self, buffers, fill, offset, count):
+        for channel, buf in zip(self.channels, buffers):
+            self.dev.statusData2(
+                channel, offset, count, out=memoryview(buf)[fill:])
+
+    def _data(self, buffers, count):
+        return tuple(buf[:count] for buf in buffers)
+
+class DwfDigitalInStream(_RecordStream):
+    '''Digital In record mode acquisition, yielded as fixed size chunks.
+
+    Same as DwfAnalogInStream, for the logic analyzer: each chunk's `data` is
+    a single array of packed samples (uint8, uint16 or uint32 for the 8, 16
+    and 32 bit sample formats), taken from a ring of preallocated buffers.
+
+    In RECORD mode the trigger position is the number of samples recorded.
+    When `samples` is None, it is read from the instrument (a trigger
+    position of 0 records until stopped); otherwise it is set to `samples`.
+
+    Args:
+        dev (dwf.DwfDigitalIn): Instrument, with divider, sample format and
+            trigger set up.
+        chunk_size (int): Samples in each chunk. The last chunk can be
+            shorter.
+        samples (int): Number of samples to acquire. Default is None.
+        buffers (int): Number of chunks in the buffer ring. Default is 4.
+    '''
+    def __init__(self, dev, chunk_size, samples=None, buffers=4):
+        self.typecode = dev._TYPECODES[dev._sampleFormat()]
+        self.frequency = dev.internalClockInfo() / float(dev.dividerGet())
+        self._position = samples
+        if samples is None:
+            samples = dev.triggerPositionGet() or None
+        super(DwfDigitalInStream, self).__init__(
+            dev, chunk_size, samples, buffers)
+
+    def _alloc(self):
+        return _buffer.empty(self.chunk_size, self.typecode)
+
+    def _start(self):
+        dev = self.dev
+        dev.acquisitionModeSet(dev.ACQMODE.RECORD)
+        if self._position is not None:
+            dev.triggerPositionSet(self._position)
+        dev.configure(False, True)
+
+    def _copy(self, buf, fill, offset, count):
+        self.dev.statusData2(offset, count, out=memoryview(buf)[fill:])
+
+    def _data(self, buf, count):
+        return buf[:count]
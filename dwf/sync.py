@@ -0,0 +1,216 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Synchronized Analog In acquisitions on several devices.
+
+The devices share a trigger line: their external trigger pins are wired
+together. One device, the master, drives its trigger source (a PC trigger
+by default) on that pin with `dwf.Dwf.triggerSet`; the Analog In of every
+device, the master included, triggers on the line. All the instruments are
+armed in parallel threads before the trigger is sent, so with the same
+sample rate and trigger position, sample `i` of every device is taken at
+the same time (within a sample period).
+'''
+
+import threading
+import time
+
+from .api import Dwf, DwfAnalogIn, DwfEnumeration
+from .segmented import DwfAnalogInSegments
+
+class DwfSyncCapture(DwfAnalogInSegments):
+    '''Time aligned captures of `DwfAnalogInSync.acquire`, one frame per
+    device, in the order of `DwfAnalogInSync.instruments`.
+
+    Attributes:
+        data: float64 samples, numpy.ndarray of shape (devices, channels,
+            samples). Without NumPy, a flat array.array in the same order.
+        timestamps: Time (s) each device was seen done, from the trigger.
+        frequency (float): Sample rate (Hz).
+        count (int): Number of devices.
+    '''
+    def __init__(self, devices, channels, samples, frequency):
+        super(DwfSyncCapture, self).__init__(devices, channels, samples)
+        self.frequency = frequency
+
+    def device(self, index):
+        '''Samples of a device, one array per channel.'''
+        return self.frame(index)
+
+class DwfAnalogInSync(object):
+    '''Trigger master and slaves of a rack of devices.
+
+    Example:
+    >>> with dwf.DwfAnalogInSync() as sync:
+    ...     for dev in sync.instruments:
+    ...         dev.channelEnableSet(0, True)
+    ...         dev.channelRangeSet(0, 5.0)
+    ...     capture = sync.acquire(8192, frequency=1e6)
+    >>> capture.data[:, 0] # channel 0 of every device
+
+    Args:
+        devices (list): Devices to synchronize: indexes, dwf.DwfDevice or
+            opened dwf.Dwf. Default is None, which opens every device of
+            `dwf.DwfEnumeration()`.
+        master (int): Position of the trigger master in `devices`. Default
+            is 0.
+        pin (int): External trigger pin wired between the devices (0 for
+            Trigger 1). Default is 0.
+        source (dwf.Dwf.TRIGSRC): Trigger sent by the master on the pin.
+            Default is dwf.Dwf.TRIGSRC.PC, sent by `acquire`. With another
+            source (e.g. DETECTOR_ANALOG_IN), configure the master's trigger
+            detector beforehand.
+
+    Attributes:
+        instruments (list): dwf.DwfAnalogIn of each device.
+        master (dwf.DwfAnalogIn): Trigger master.
+    '''
+    def __init__(self, devices=None, master=0, pin=0, source=Dwf.TRIGSRC.PC):
+        super(DwfAnalogInSync, self).__init__()
+        if devices is None:
+            devices = DwfEnumeration()
+        if not devices:
+            raise RuntimeError("No device found")
+        if not 0 <= master < len(devices):
+            raise ValueError("master must be the position of a device")
+        self.pin = pin
+        self.source = Dwf.TRIGSRC(source)
+        self._opened = []
+        self.instruments = []
+        try:
+            for dev in devices:
+                instrument = DwfAnalogIn(dev)
+                if not isinstance(dev, Dwf):
+                    self._opened.append(instrument)
+                self.instruments.append(instrument)
+        except Exception:
+            self.close()
+            raise
+        self.master = self.instruments[master]
+        line = Dwf.TRIGSRC(Dwf.TRIGSRC.EXTERNAL1 + pin)
+        for instrument in self.instruments:
+            if instrument is self.master:
+                instrument.triggerSet(pin, self.source)
+            else:
+                instrument.triggerSet(pin, Dwf.TRIGSRC.NONE)
+            instrument.triggerSourceSet(line)
+
+    def close(self):
+        '''Close the devices opened by this instance.'''
+        for instrument in self._opened:
+            instrument.close()
+        self._opened = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def acquire(self, samples=None, frequency=None, channels=None,
+                position=None, timeout=None, interval=0.001):
+        '''Capture one triggered acquisition on every device.
+
+        The acquisition parameters are set the same on every device; the
+        rest of the channel configuration is left to the caller.
+
+        Args:
+            samples (int): Samples per channel. Default is None, which keeps
+                the master's buffer size.
+            frequency (float): Sample rate (Hz). Default is None, which uses
+                the master's.
+            channels (list): Channel indexes. Default is None, which uses
+                the channels enabled on the master.
+            position (float): Trigger position (s). Default is None (keep).
+            timeout (float): Seconds to wait for the devices to arm and to
+                trigger. Default is None (no limit).
+            interval (float): Sleep (s) between two status reads. Default is
+                0.001.
+
+        Returns:
+            dwf.DwfSyncCapture
+
+        Raises:
+            RuntimeError: A device did not arm or trigger before the timeout.
+        '''
+        master = self.master
+        if frequency is None:
+            frequency = master.frequencyGet()
+        if samples is None:
+            samples = master.bufferSizeGet()
+        if channels is None:
+            channels = [i for i in range(master.channelCount())
+                        if master.channelEnableGet(i)]
+        for instrument in self.instruments:
+            instrument.acquisitionModeSet(instrument.ACQMODE.SINGLE)
+            instrument.frequencySet(frequency)
+            instrument.bufferSizeSet(samples)
+            instrument.triggerAutoTimeoutSet(0) # wait for the line only
+            if position is not None:
+                instrument.triggerPositionSet(position)
+        capture = DwfSyncCapture(len(self.instruments), channels, samples,
+                                 frequency)
+        view = memoryview(capture.data).cast('B').cast('d')
+        armed = [threading.Event() for _ in self.instruments]
+        trigger = threading.Event()
+        abort = threading.Event()
+        errors = []
+        clock = time.perf_counter
+        start = [None]
+
+        def run(index, instrument):
+            try:
+                states = (instrument.STATE.CONFIG, instrument.STATE.PREFILL)
+                instrument.configure(True, True)
+                deadline = None if timeout is None else clock() + timeout
+                while instrument.status(False) in states:
+                    if deadline is not None and clock() > deadline:
+                        raise RuntimeError("Device %d did not arm" % index)
+                    time.sleep(interval)
+                armed[index].set()
+                trigger.wait()
+                if abort.is_set():
+                    return
+                deadline = None if timeout is None else clock() + timeout
+                while instrument.status(True) != instrument.STATE.DONE:
+                    if abort.is_set():
+                        return
+                    if deadline is not None and clock() > deadline:
+                        raise RuntimeError("Device %d was not triggered"
+                                           % index)
+                    time.sleep(interval)
+                capture.timestamps[index] = clock() - start[0]
+                offset = index * len(capture.channels) * samples
+                for channel in capture.channels:
+                    instrument.statusData(
+                        channel, samples, out=view[offset:offset + samples])
+                    offset += samples
+            except Exception as e:
+                errors.append(e)
+                abort.set()
+                armed[index].set()
+
+        threads = [threading.Thread(target=run, args=(i, instrument))
+                   for i, instrument in enumerate(self.instruments)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        try:
+            for event in armed:
+                event.wait()
+            start[0] = clock()
+            trigger.set()
+            if not errors and self.source == Dwf.TRIGSRC.PC:
+                master.triggerPC()
+            for thread in threads:
+                thread.join()
+        finally:
+            abort.set()
+            trigger.set()
+            if errors:
+                for instrument in self.instruments:
+                    instrument.configure(False, False)
+        if errors:
+            raise errors[0]
+        capture.count = len(self.instruments)
+        return capture
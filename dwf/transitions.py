@@ -0,0 +1,220 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Transition list compression of Digital In captures. Requires NumPy.
+
+Logic captures are mostly idle: `DwfTransitions` only stores the samples
+where the bus value changes, as (sample index, new value) pairs. The list
+is built chunk by chunk with array operations while streaming, the bus
+value at any index is found with a binary search, and the edges of a pin
+come from the list without expanding the samples.
+'''
+
+from . import _buffer
+
+class DwfTransitions(object):
+    '''Transition list of a Digital In capture.
+
+    Example:
+    >>> trans = dwf.DwfTransitions(rate=sample_rate)
+    >>> for chunk in trans.attach(dev.stream(65536, samples=10**8)):
+    ...     pass
+    >>> trans.value_at(5 * 10**7), trans.edges(3, 'rising')
+
+    Args:
+        typecode (str): `array` type code of the samples ('B', 'H' or 'I').
+            Default is 'H'.
+        rate (float): Sample rate (Hz), for the exporters. Default is None.
+
+    Attributes:
+        samples (int): Length of the capture in samples, lost ones included.
+        indexes: Sample index of each transition (numpy.ndarray, int64).
+        values: Bus value from each transition on (numpy.ndarray).
+    '''
+    def __init__(self, typecode='H', rate=None):
+        super(DwfTransitions, self).__init__()
+        if _buffer.numpy is None:
+            raise ImportError("transition lists require NumPy")
+        self.typecode = typecode
+        self.rate = rate
+        self.reset()
+
+    def reset(self):
+        '''Clear the list.'''
+        numpy = _buffer.numpy
+        self.samples = 0
+        self._count = 0
+        self._indexes = numpy.empty(1024, numpy.int64)
+        self._values = numpy.empty(1024, self.typecode)
+
+    @classmethod
+    def from_samples(cls, data, rate=None):
+        '''Build the transition list of an array of samples.'''
+        data = _buffer.numpy.asarray(data)
+        result = cls(data.dtype.char, rate)
+        result.add(data)
+        return result
+
+    @property
+    def indexes(self):
+        return self._indexes[:self._count]
+
+    @property
+    def values(self):
+        return self._values[:self._count]
+
+    def __len__(self):
+        return self._count
+
+    def _append(self, indexes, values):
+        numpy = _buffer.numpy
+        count = self._count + len(indexes)
+        if count > len(self._indexes):
+            size = max(count, 2 * len(self._indexes))
+            for name in ('_indexes', '_values'):
+                old = getattr(self, name)
+                new = numpy.empty(size, old.dtype)
+                new[:self._count] = old[:self._count]
+                setattr(self, name, new)
+        self._indexes[self._count:count] = indexes
+        self._values[self._count:count] = values
+        self._count = count
+
+    def add(self, data, lost=0):
+        '''Append samples.
+
+        Args:
+            data: Array of samples, or a dwf.DwfStreamChunk (its lost
+                samples are then put where they were).
+            lost (int): Samples lost before `data`. Default is 0. The value
+                of the lost samples is unknown: the one before them is
+                extended up to the next sample.
+        '''
+        numpy = _buffer.numpy
+        if hasattr(data, 'spans'):
+            gaps = tuple(data.spans())
+            data = data.data
+        else:
+            gaps = ((0, lost),) if lost else ()
+        x = numpy.asarray(data)
+        start = 0
+        for offset, count in gaps + ((len(x), 0),):
+            self._add(x[start:offset])
+            self.samples += count
+            start = offset
+
+    def _add(self, x):
+        numpy = _buffer.numpy
+        if not len(x):
+            return
+        changes = numpy.flatnonzero(x[1:] != x[:-1]) + 1
+        if not self._count or x[0] != self._values[self._count - 1]:
+            changes = numpy.concatenate(([0], changes))
+        self._append(changes + self.samples, x[changes])
+        self.samples += len(x)
+
+    def attach(self, stream):
+        '''Append the chunks of a record stream as they are iterated.
+
+        Yields:
+            The chunks, after appending them.
+        '''
+        for chunk in stream:
+            self.add(chunk)
+            yield chunk
+
+    def _find(self, index):
+        '''Transition in effect at each sample index'''
+        numpy = _buffer.numpy
+        return numpy.searchsorted(self.indexes, index, 'right') - 1
+
+    def value_at(self, index):
+        '''Bus value at a sample index (or an array of indexes).'''
+        k = self._find(index)
+        if _buffer.numpy.any(k < 0) or _buffer.numpy.any(
+                _buffer.numpy.asarray(index) >= self.samples):
+            raise IndexError("sample index out of the capture")
+        return self.values[k]
+
+    def edges(self, bit, kind='both'):
+        '''Sample indexes where a pin changes.
+
+        Args:
+            bit (int): DIO pin.
+            kind (str): 'rising', 'falling' or 'both'. Default is 'both'.
+
+        Returns:
+            numpy.ndarray of sample indexes.
+        '''
+        numpy = _buffer.numpy
+        level = (self.values >> bit) & 1
+        change = numpy.flatnonzero(level[1:] != level[:-1]) + 1
+        if kind == 'rising':
+            change = change[level[change] == 1]
+        elif kind == 'falling':
+            change = change[level[change] == 0]
+        elif kind != 'both':
+            raise ValueError("kind must be 'rising', 'falling' or 'both'")
+        return self.indexes[change]
+
+    def expand(self, start=0, stop=None):
+        '''Samples of a range of the capture.
+
+        Returns:
+            numpy.ndarray of `stop - start` samples.
+        '''
+        numpy = _buffer.numpy
+        if stop is None:
+            stop = self.samples
+        start, stop = max(start, 0), min(stop, self.samples)
+        if start >= stop or not self._count:
+            return numpy.empty(0, self.typecode)
+        first, last = self._find(start), self._find(stop - 1)
+        bounds = numpy.concatenate(
+            ([start], self.indexes[first + 1:last + 1], [stop]))
+        return numpy.repeat(self.values[first:last + 1], numpy.diff(bounds))
+
+    def chunks(self, size):
+        '''Expand the capture `size` samples at a time, to feed consumers
+        of sample arrays without expanding all of it.'''
+        for start in range(0, self.samples, size):
+            yield self.expand(start, start + size)
+
+    def write_vcd(self, path, bits=None, names=None, timescale=1e-9):
+        '''Export to a Value Change Dump file, straight from the list.
+
+        Args:
+            path (str): File path.
+            bits (list): DIO pins to export. Default is None, which exports
+                every bit of the samples.
+            names (dict): {bit: signal name}. Default is None ('DIO<n>').
+            timescale (float): VCD time unit (s): 1e-3, 1e-6, 1e-9 or
+                1e-12. Default is 1e-9.
+        '''
+        numpy = _buffer.numpy
+        if self.rate is None:
+            raise ValueError("the sample rate is needed to export to VCD")
+        if bits is None:
+            bits = range(8 * self._values.itemsize)
+        bits = list(bits)
+        names = names or {}
+        units = {1e-3: 'ms', 1e-6: 'us', 1e-9: 'ns', 1e-12: 'ps'}
+        ids = {bit: chr(33 + i) for i, bit in enumerate(bits)}
+        times = numpy.round(self.indexes / (self.rate * timescale))
+        with open(path, 'w') as f:
+            f.write("$timescale 1 %s $end\n$scope module dwf $end\n"
+                    % units[timescale])
+            for bit in bits:
+                f.write("$var wire 1 %s %s $end\n" % (
+                    ids[bit], names.get(bit, 'DIO%d' % bit)))
+            f.write("$upscope $end\n$enddefinitions $end\n")
+            previous = None
+            for time, value in zip(times.astype(numpy.int64), self.values):
+                value = int(value)
+                changed = [b for b in bits if previous is None
+                           or (value ^ previous) >> b & 1]
+                if changed:
+                    f.write("#%d\n" % time)
+                    f.write("".join("%d%s\n" % (value >> b & 1, ids[b])
+                                    for b in changed))
+                previous = value
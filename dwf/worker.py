@@ -0,0 +1,299 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Background acquisition.
+
+A worker thread iterates over a record stream (see `dwf.DwfAnalogIn.stream`
+and `dwf.DwfDigitalIn.stream`): it only polls the instrument and copies each
+chunk into a pool of preallocated buffers, so slow processing on the consumer
+side does not make the device lose samples.
+'''
+
+import collections
+import queue
+import tempfile
+import threading
+
+from . import _buffer
+from .stream import DwfStreamChunk
+
+_END = object()
+
+def _parts(data):
+    '''Arrays of a chunk: one per channel for Analog In, one for Digital In'''
+    return data if isinstance(data, tuple) else (data,)
+
+class DwfAcquisitionWorker(object):
+    '''Run a record stream on a background thread, through a bounded queue.
+
+    The consumer gets the chunks with `get` or by iterating over the worker.
+    A chunk's arrays stay valid until the next chunk is taken.
+
+    When the queue is full, `overflow` selects what the worker does:
+        - 'block': wait for the consumer. The instrument keeps acquiring, so
+          samples can be lost on the device (see `lost`).
+        - 'drop_oldest': discard the oldest queued chunk (see `dropped`).
+        - 'spill': append the chunk to a temporary file in `spill_dir`. The
+          spilled chunks are read back, in order, once the queue is empty.
+
+    Example:
+    >>> with dwf.DwfAcquisitionWorker(dev.stream(65536), overflow='spill') as w:
+    ...     for chunk in w:
+    ...         process(chunk.data[0])
+
+    Args:
+        stream: Record stream (dwf.DwfAnalogInStream, dwf.DwfDigitalInStream)
+        maxsize (int): Maximum number of queued chunks. Default is 16.
+        overflow (str): 'block', 'drop_oldest' or 'spill'. Default is 'block'.
+        spill_dir (str): Directory of the spill file. Default is None, which
+            uses the system temporary directory.
+
+    Attributes:
+        received (int): Samples queued for the consumer.
+        dropped (int): Samples discarded by the 'drop_oldest' policy.
+        spilled (int): Chunks written to the spill file.
+        depth (int): Chunks waiting for the consumer, queued or spilled.
+        max_depth (int): Largest `depth` seen.
+    '''
+    OVERFLOW = ('block', 'drop_oldest', 'spill')
+
+    def __init__(self, stream, maxsize=16, overflow='block', spill_dir=None):
+        super(DwfAcquisitionWorker, self).__init__()
+        if overflow not in self.OVERFLOW:
+            raise ValueError("overflow must be one of %s, not %r" % (
+                ", ".join(self.OVERFLOW), overflow))
+        self.stream = stream
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.spill_dir = spill_dir
+        self.received = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.max_depth = 0
+        self.depth = 0
+        self.error = None
+        self._queue = queue.Queue(maxsize)
+        self._free = collections.deque()
+        self._held = None
+        self._ended = False
+        self._lock = threading.Lock()
+        self._depth_lock = threading.Lock()
+        self._spill = None
+        self._spill_chunks = collections.deque()
+        self._spill_read = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+
+    @property
+    def lost(self):
+        '''Samples lost on the device, as reported by statusRecord.'''
+        return self.stream.lost
+
+    @property
+    def corrupted(self):
+        '''Samples possibly corrupted on the device.'''
+        return self.stream.corrupted
+
+    def start(self):
+        '''Start the acquisition thread.'''
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        '''Stop the acquisition and wait for the thread to exit.
+
+        The thread checks for the stop request between chunks. The chunks
+        already spilled can still be read with `get`: the spill file is
+        closed once they are.
+
+        Args:
+            timeout (float): Seconds to wait. Default is None (no limit).
+        '''
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+        with self._lock:
+            if not self._spill_chunks:
+                self._close_spill()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def __iter__(self):
+        while True:
+            chunk = self.get()
+            if chunk is None:
+                return
+            yield chunk
+
+    def get(self, timeout=None):
+        '''Get the next chunk, releasing the previous one.
+
+        Args:
+            timeout (float): Seconds to wait. Default is None (no limit).
+
+        Returns:
+            dwf.DwfStreamChunk, or None at the end of the acquisition (and
+            on every call after it).
+
+        Raises:
+            queue.Empty: No chunk arrived before the timeout.
+            Exception: The error that ended the acquisition thread, once,
+                after the chunks acquired before it.
+        '''
+        if self._held is not None:
+            self._free.append(self._held)
+            self._held = None
+        if self._ended:
+            return None
+        # under the lock the producer cannot spill a chunk queued after the
+        # ones checked: the queue goes first, then the spill file
+        with self._lock:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                item = self._unspill()
+        if item is None:
+            item = self._queue.get(timeout=timeout)
+        if item is _END:
+            self._ended = True
+            if self.error is not None:
+                raise self.error
+            return None
+        self._held, chunk = item
+        self._count(-1)
+        return chunk
+
+    def _run(self):
+        chunks = None
+        try:
+            chunks = iter(self.stream)
+            for chunk in chunks:
+                self._put(chunk)
+                if self._stop.is_set():
+                    break
+        except BaseException as e: # re-raised by get
+            self.error = e
+        try:
+            if hasattr(chunks, 'close'):
+                chunks.close() # stops the acquisition
+        except BaseException as e:
+            if self.error is None:
+                self.error = e
+        self._end()
+
+    def _end(self):
+        with self._lock:
+            if self._spill_chunks:
+                self._spill_chunks.append(_END)
+                return
+        while True:
+            try:
+                self._queue.put(_END, timeout=0.1)
+                break
+            except queue.Full:
+                if self._stop.is_set():
+                    # stopped: nobody may be reading, make room
+                    self._drop()
+
+    def _drop(self):
+        try:
+            buffers, old = self._queue.get_nowait()
+        except queue.Empty:
+            return
+        self._free.append(buffers)
+        self.dropped += len(old)
+        self._count(-1)
+
+    def _take(self, parts):
+        if self._free:
+            return self._free.popleft()
+        size = self.stream.chunk_size
+        return [_buffer.empty(size, memoryview(p).format) for p in parts]
+
+    def _wrap(self, buffers, chunk, count, channels):
+        data = tuple(buf[:count] for buf in buffers)
+        if not channels:
+            data = data[0]
+        return buffers, DwfStreamChunk(
+            data, chunk.index, chunk.lost, chunk.corrupted, chunk.gaps)
+
+    def _put(self, chunk):
+        count = len(chunk)
+        with self._lock:
+            spilling = bool(self._spill_chunks)
+            if spilling or (self.overflow == 'spill' and self._queue.full()):
+                self._write_spill(chunk)
+                self.received += count
+                self._count(1)
+                return
+        if self.overflow == 'drop_oldest' and self._queue.full():
+            self._drop()
+        parts = _parts(chunk.data)
+        buffers = self._take(parts)
+        for buf, part in zip(buffers, parts):
+            buf[:count] = part
+        item = self._wrap(
+            buffers, chunk, count, isinstance(chunk.data, tuple))
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        else:
+            self._free.append(buffers)
+            return
+        self.received += count
+        self._count(1)
+
+    def _count(self, n):
+        with self._depth_lock:
+            self.depth += n
+            self.max_depth = max(self.max_depth, self.depth)
+
+    def _write_spill(self, chunk):
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile(dir=self.spill_dir)
+        self._spill.seek(0, 2)
+        for part in _parts(chunk.data):
+            self._spill.write(memoryview(part).cast('B'))
+        # keep the chunk, without its data, to rebuild it when read back
+        self._spill_chunks.append((
+            len(chunk), isinstance(chunk.data, tuple), DwfStreamChunk(
+            _parts(chunk.data), chunk.index, chunk.lost, chunk.corrupted,
+            chunk.gaps)))
+        self.spilled += 1
+
+    def _close_spill(self):
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+            self._spill_read = 0
+
+    def _unspill(self):
+        # called with self._lock held
+        if not self._spill_chunks:
+            return None
+        spilled = self._spill_chunks.popleft()
+        if spilled is _END:
+            self._close_spill()
+            return _END
+        count, channels, chunk = spilled
+        parts = chunk.data
+        buffers = self._take(parts)
+        self._spill.seek(self._spill_read)
+        for buf, part in zip(buffers, parts):
+            nbytes = count * memoryview(part).itemsize
+            self._spill.readinto(memoryview(buf).cast('B')[:nbytes])
+            self._spill_read += nbytes
+        if not self._spill_chunks:
+            # drained: reuse the file from the start
+            self._spill.seek(0)
+            self._spill.truncate()
+            self._spill_read = 0
+        return self._wrap(buffers, chunk, count, channels)
@@ -9,7 +9,7 @@
    Original Revision: 12/28/2015
 
    Requires:                       
-       Python 2.7, 3.3 or later
+       Python 3.7 or later
 """
 
 import dwf
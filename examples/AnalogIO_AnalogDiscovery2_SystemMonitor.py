@@ -8,7 +8,7 @@
    Original Revision: 12/29/2015
 
    Requires:                       
-       Python 2.7, 3.3 or lator
+       Python 3.7 or later
 """
 
 import dwf
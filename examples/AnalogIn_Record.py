@@ -6,7 +6,7 @@
    Revision: 10/17/2013
 
    Requires:                       
-       Python 2.7, 3.3 or later
+       Python 3.7 or later
        numpy, matplotlib
 """
 
@@ -40,47 +40,29 @@ dwf_ai.channelEnableSet(0, True)
 dwf_ai.channelRangeSet(0, 5.0)
 dwf_ai.acquisitionModeSet(dwf_ai.ACQMODE.RECORD)
 dwf_ai.frequencySet(HZ_ACQ)
-dwf_ai.recordLengthSet(N_SAMPLES / HZ_ACQ)
 
 #wait at least 2 seconds for the offset to stabilize
 time.sleep(2)
 
-#begin acquisition
-dwf_ai.configure(False, True)
 print("   waiting to finish")
 
 rgdSamples = []
-cSamples = 0
 fLost = False
 fCorrupted = False
-while cSamples < N_SAMPLES:
-    sts = dwf_ai.status(True)
-    if cSamples == 0 and sts in (dwf_ai.STATE.CONFIG,
-                                 dwf_ai.STATE.PREFILL,
-                                 dwf_ai.STATE.ARMED):
-        # Acquisition not yet started.
-        continue
-
-    cAvailable, cLost, cCorrupted = dwf_ai.statusRecord()
-    cSamples += cLost
-        
-    if cLost > 0:
+# the stream sleeps between polls, at a rate matching the acquisition
+stream = dwf_ai.stream(8192, channels=[0], samples=N_SAMPLES)
+for chunk in stream:
+    if chunk.lost:
         fLost = True
-    if cCorrupted > 0:
+    if chunk.corrupted:
         fCorrupted = True
-    if cAvailable == 0:
-        continue
-    if cSamples + cAvailable > N_SAMPLES:
-        cAvailable = N_SAMPLES - cSamples
-    
-    # get samples
-    rgdSamples.extend(dwf_ai.statusData(0, cAvailable))
-    cSamples += cAvailable
+    rgdSamples.extend(chunk.data[0])
 
 print("Recording finished")
+print("Buffer headroom: %.0f%%" % (100 * stream.scheduler.headroom))
 if fLost:
     print("Samples were lost! Reduce frequency")
-if cCorrupted:
+if fCorrupted:
     print("Samples could be corrupted! Reduce frequency")
 
 with open("record.csv", "w") as f:
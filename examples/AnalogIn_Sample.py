@@ -9,7 +9,7 @@
    Original Revision: 10/17/2013
 
    Requires:                       
-       Python 2.7, 3.3 or later
+       Python 3.7 or later
 """
 
 import dwf
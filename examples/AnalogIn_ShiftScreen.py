@@ -9,7 +9,7 @@
    Original Revision: 1/11/2016
 
    Requires:                       
-       Python 2.7, 3.3 or later
+       Python 3.7 or later
        numpy, matplotlib
 """
 
@@ -50,6 +50,9 @@ dwf_ai.bufferSizeSet(N_SAMPLES)
 #wait at least 2 seconds for the offset to stabilize
 time.sleep(2)
 
+#only copy the samples written since the previous poll
+reader = dwf_ai.scanReader([0])
+
 #begin acquisition
 dwf_ai.configure(False, True)
 
@@ -57,15 +60,16 @@ plt.axis([0, N_SAMPLES, -2.5, 2.5])
 plt.ion()
 hl, = plt.plot([], [])
 hl.set_xdata(np.arange(0, N_SAMPLES))
+rgdSamples = np.zeros(N_SAMPLES)
 
 while True:
-    sts = dwf_ai.status(True)
-
-    cValid = dwf_ai.statusSamplesValid()
-
-    # get samples
-    rgdSamples = dwf_ai.statusData(0, cValid)
-    print(cValid)
+    # get new samples
+    (rgdNew,) = reader.read()
+    cNew = len(rgdNew)
+    if cNew:
+        rgdSamples[:-cNew] = rgdSamples[cNew:]
+        rgdSamples[-cNew:] = rgdNew
+    print(cNew)
     hl.set_ydata(rgdSamples)
     plt.draw()
     plt.pause(0.01)
@@ -9,7 +9,7 @@
    Original Revision: 11/24/2014
 
    Requires:                       
-       Python 2.7, 3.3 or later
+       Python 3.7 or later
 """
 
 import dwf
@@ -49,49 +49,17 @@ dwf_di.triggerSourceSet(dwf_di.TRIGSRC.DETECTOR_DIGITAL_IN)
 # trigger detector mask:   low &   high & ( rising | falling )
 dwf_di.triggerSet(0xFFFF,  0x0000, 0x0000, 0x0000)
 
-# begin acquisition
-dwf_di.configure(False, True)
-
 print("Starting record")
 
-cSamples = 0
-rgwSamples = []
-fLost = False
-fCorrupted = False
-while cSamples < N_SAMPLES:
-    sts = dwf_di.status(True)
-    if cSamples == 0 and sts in (dwf_di.STATE.CONFIG,
-                                 dwf_di.STATE.PREFILL,
-                                 dwf_di.STATE.ARMED):
-        # acquisition not yet started.
-        continue
-    
-    cAvailable, cLost, cCorrupted = dwf_di.statusRecord()
-    cSamples += cLost
-    
-    if cLost > 0:
-        fLost = True
-    if cCorrupted > 0:
-        fCorrupted = True
-    if cAvailable == 0:
-        continue
-    
-    if cSamples + cAvailable > N_SAMPLES:
-        cAvailable = N_SAMPLES - cSamples
-    
-    # get samples
-    rgwSamples.extend(dwf_di.statusData(cAvailable))
-    cSamples += cAvailable
+# samples go straight to a memory-mapped file, in the 16bit sample format.
+# read it back with dwf.record.load("record.npy") or numpy.load
+info = dwf_di.record_to_file("record.npy")
 
 dwf_do.close()
 dwf_di.close()
 
 print("Recording finished")
-if fLost:
+if info["lost"]:
     print("Samples were lost! Reduce sample rate")
-if fCorrupted:
+if info["corrupted"]:
     print("Samples could be corrupted! Reduce sample rate")
-
-with open("record.csv", "w") as f:
-    for v in rgwSamples:
-        f.write("%s\n" % v)
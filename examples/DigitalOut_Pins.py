@@ -9,7 +9,7 @@
    Original Revision: 8/21/2014
 
    Requires:                       
-       Python 2.7, 3.3 or later
+       Python 3.7 or later
 """
 
 import dwf
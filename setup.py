@@ -19,9 +19,10 @@ setup(
     author='Richard Hoberecht',
     author_email='richardhob@gmail.com',
     license='MIT',
-    install_requires=[
-        'enum34'
-    ],
+    python_requires='>=3.7',
+    extras_require={
+        'numpy': ['numpy'],
+    },
     classifiers=[
         'Development Status :: 3 - Alpha',
 
@@ -34,9 +35,8 @@ setup(
         'Operating System :: POSIX :: Linux',
         'Operating System :: MacOS :: MacOS X',
 
-        'Programming Language :: Python :: 2',
-        'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3 :: Only',
         'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
         'Programming Language :: Python :: 3.9',
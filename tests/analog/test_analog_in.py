@@ -0,0 +1,148 @@
+import array
+import unittest.mock
+
+import pytest
+
+import dwf
+
+def test_status_data_default():
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfAnalogIn()
+
+            value = dev.statusData(0, 10)
+
+            low_level_patch.FDwfAnalogInStatusData.assert_called_once_with(dev.hdwf, 0, 10)
+            assert value == low_level_patch.FDwfAnalogInStatusData.return_value
+
+@pytest.mark.parametrize('channel', [0, 1])
+def test_status_data_out(channel):
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfAnalogIn()
+            out = array.array('d', [0.0] * 16)
+
+            value = dev.statusData(channel, 10, out=out)
+
+            low_level_patch.FDwfAnalogInStatusData.assert_called_once_with(dev.hdwf, channel, out, 10)
+            assert value is out
+
+def test_status_data_asarray():
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfAnalogIn()
+
+            value = dev.statusData(0, 10, asarray=True)
+
+            args = low_level_patch.FDwfAnalogInStatusData.call_args[0]
+            assert args[2] is value
+            assert len(value) == 10
+            assert memoryview(value).format == 'd'
+
+def test_status_noise_out():
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfAnalogIn()
+            out = (array.array('d', [0.0] * 4), array.array('d', [0.0] * 4))
+
+            value = dev.statusNoise(1, 4, out=out)
+
+            low_level_patch.FDwfAnalogInStatusNoise.assert_called_once_with(dev.hdwf, 1, out[0], out[1], 4)
+            assert value is out
+
+def test_status_data_raw():
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfAnalogIn()
+
+            value = dev.statusDataRaw(1, 10)
+
+            args = low_level_patch.FDwfAnalogInStatusData16.call_args[0]
+            assert args == (dev.hdwf, 1, value.data, 0, 10)
+            assert len(value) == 10
+            assert memoryview(value.data).format == 'h'
+
+def test_status_data_raw_volts():
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfAnalogIn()
+            low_level_patch.FDwfAnalogInChannelRangeGet.return_value = 5.0
+            low_level_patch.FDwfAnalogInChannelOffsetGet.return_value = 0.5
+            low_level_patch.FDwfAnalogInBitsInfo.return_value = 14
+
+            raw = dev.statusDataRaw(0, 3, out=array.array('h', [0, 16384, -32768]))
+
+            low_level_patch.FDwfAnalogInChannelRangeGet.assert_called_once_with(dev.hdwf, 0)
+            low_level_patch.FDwfAnalogInChannelOffsetGet.assert_called_once_with(dev.hdwf, 0)
+
+            # Converted with the configuration of the acquisition
+            low_level_patch.FDwfAnalogInChannelRangeGet.return_value = 50.0
+            low_level_patch.FDwfAnalogInChannelOffsetGet.return_value = 0.0
+
+            assert list(raw.volts()) == [0.5, 1.75, -2.0]
+            assert raw.resolution == 5.0 / (1 << 14)
+            assert low_level_patch.FDwfAnalogInChannelRangeGet.call_count == 1
+
+def test_status_data2_out():
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfAnalogIn()
+            out = array.array('d', [0.0] * 4)
+
+            value = dev.statusData2(0, 100, 4, out=out)
+
+            low_level_patch.FDwfAnalogInStatusData2.assert_called_once_with(dev.hdwf, 0, out, 100, 4)
+            assert value is out
+
+class ScanDevice(object):
+    '''Stand-in for DwfAnalogIn, holding a circular buffer of samples.'''
+    ACQMODE = dwf.DwfAnalogIn.ACQMODE
+
+    def __init__(self, mode, size):
+        self.mode = mode
+        self.size = size
+        self.written = 0
+
+    def write(self, count):
+        self.written += count
+
+    def sample(self, n):
+        return float(n)
+
+    def buffer(self):
+        if self.mode == self.ACQMODE.SCAN_SHIFT:
+            start = max(0, self.written - self.size)
+            return [self.sample(n) for n in range(start, self.written)]
+        result = [0.0] * self.size
+        for n in range(max(0, self.written - self.size), self.written):
+            result[n % self.size] = self.sample(n)
+        return result
+
+    def acquisitionModeGet(self):
+        return self.mode
+    def bufferSizeGet(self):
+        return self.size
+    def status(self, read_data):
+        pass
+    def statusIndexWrite(self):
+        return self.written % self.size
+    def statusSamplesValid(self):
+        return min(self.written, self.size)
+    def statusData2(self, idxChannel, idxData, data_num, out):
+        out[:data_num] = array.array('d', self.buffer()[idxData:idxData + data_num])
+
+@pytest.mark.parametrize('mode', [dwf.DwfAnalogIn.ACQMODE.SCAN_SHIFT,
+                                  dwf.DwfAnalogIn.ACQMODE.SCAN_SCREEN])
+def test_scan_reader(mode):
+    dev = ScanDevice(mode, 10)
+    reader = dwf.DwfAnalogInScanReader(dev, [0])
+
+    received = []
+    for count in [3, 0, 5, 4, 9, 1]:
+        dev.write(count)
+        (data,) = reader.read()
+        assert len(data) == count
+        received.extend(data)
+
+    assert received == [float(n) for n in range(dev.written)]
+    assert reader.total == dev.written
@@ -0,0 +1,109 @@
+import array
+import math
+import unittest.mock
+
+import pytest
+
+import dwf
+
+class RepeatDevice(object):
+    '''Stand-in for DwfAnalogIn in SINGLE mode, returning `frames` in turn.
+
+    `positions` are the trigger positions (s) reported for each frame.
+    '''
+    ACQMODE = dwf.DwfAnalogIn.ACQMODE
+    STATE = dwf.DwfAnalogIn.STATE
+
+    def __init__(self, frames, positions=None):
+        self.frames = list(frames)
+        self.positions = list(positions or [0.0] * len(self.frames))
+        self.calls = []
+        self.frame = -1
+
+    def channelCount(self):
+        return 1
+    def channelEnableGet(self, idxChannel):
+        return True
+    def bufferSizeGet(self):
+        return len(self.frames[0])
+    def frequencyGet(self):
+        return 1000.0
+    def acquisitionModeSet(self, acqmode):
+        self.calls.append(('acquisitionModeSet', acqmode))
+    def configure(self, reconfigure, start):
+        self.calls.append(('configure', reconfigure, start))
+        if start:
+            self.frame += 1
+    def status(self, read_data):
+        if self.frame < len(self.frames):
+            return self.STATE.DONE
+        return self.STATE.ARMED
+    def statusData(self, idxChannel, data_num, out):
+        out[:data_num] = array.array('d', self.frames[self.frame])
+    def triggerPositionStatus(self):
+        return self.positions[self.frame]
+
+@pytest.fixture(params=['numpy', 'array'])
+def backend(request):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+        yield
+    else:
+        with unittest.mock.patch.object(dwf._buffer, 'numpy', None):
+            yield
+
+def test_averager(backend):
+    avg = dwf.DwfAnalogInAverager(2, 3, alpha=0.5)
+
+    avg.add(([1, 2, 3], [0, 0, 0]))
+    avg.add(([3, 2, 1], [0, 0, 4]))
+    avg.add(([2, 2, 5], [0, 0, 2]))
+
+    assert avg.frames == 3
+    assert list(avg.mean[0]) == [2, 2, 3]
+    assert list(avg.mean[1]) == [0, 0, 2]
+    assert list(avg.minimum[0]) == [1, 2, 1]
+    assert list(avg.maximum[0]) == [3, 2, 5]
+    assert list(avg.variance()[0]) == [1, 0, 4]
+    assert list(avg.std()[1]) == [0, 0, 2]
+    assert list(avg.ema[0]) == [2, 2, 3.5]
+
+def test_averager_shift(backend):
+    avg = dwf.DwfAnalogInAverager(1, 4)
+
+    avg.add(([1, 2, 3, 4],))
+    avg.add(([9, 2, 3, 4],), shift=-1)
+    avg.add(([1, 2, 3, 9],), shift=1)
+
+    assert list(avg.counts) == [2, 3, 3, 2]
+    assert list(avg.mean[0]) == [1.5, 2, 3, 3.5]
+    variance = avg.variance()[0]
+    assert list(variance)[1:3] == [1, 1]
+    avg.reset()
+    assert avg.frames == 0
+    assert math.isnan(avg.variance()[0][0])
+
+def test_average(backend):
+    dev = RepeatDevice([[1, 2, 3, 4], [2, 3, 4, 9], [1, 2, 3, 4]],
+                       positions=[0.0, 0.001, 0.0])
+
+    avg = dwf.DwfAnalogIn.average(dev, 3)
+
+    # the trigger of the second frame is one sample earlier in the buffer
+    assert list(avg.counts) == [2, 3, 3, 3]
+    assert list(avg.mean[0]) == [1, 2, 3, 4]
+    assert dev.calls == [
+        ('acquisitionModeSet', dev.ACQMODE.SINGLE),
+        ('configure', True, True),
+        ('configure', False, True),
+        ('configure', False, True),
+        ('configure', False, False),
+    ]
+
+def test_average_timeout(backend):
+    dev = RepeatDevice([[1, 1], [3, 3]])
+
+    avg = dwf.averaging.average(dev, 4, align=False, timeout=0.01)
+
+    assert avg.frames == 2
+    assert list(avg.mean[0]) == [2, 2]
@@ -0,0 +1,105 @@
+import array
+
+import pytest
+
+import dwf
+
+class TriggeredDevice(object):
+    '''Stand-in for DwfAnalogIn in SINGLE mode.
+
+    Each frame is done after `waits` status reads. Channel `c` sample `n` of
+    frame `f` has the value `1000 * f + 100 * c + n`.
+    '''
+    ACQMODE = dwf.DwfAnalogIn.ACQMODE
+    STATE = dwf.DwfAnalogIn.STATE
+    TRIGSRC = dwf.DwfAnalogIn.TRIGSRC
+
+    def __init__(self, waits, size=4):
+        self.waits = list(waits)
+        self.size = size
+        self.frame = -1
+        self.calls = []
+
+    def channelCount(self):
+        return 2
+    def channelEnableGet(self, idxChannel):
+        return True
+    def acquisitionModeSet(self, acqmode):
+        self.calls.append(('acquisitionModeSet', acqmode))
+    def bufferSizeSet(self, size):
+        self.size = size
+    def bufferSizeGet(self):
+        return self.size
+    def triggerSourceSet(self, trigsrc):
+        self.calls.append(('triggerSourceSet', trigsrc))
+    def triggerPositionSet(self, position):
+        self.calls.append(('triggerPositionSet', position))
+    def configure(self, reconfigure, start):
+        self.calls.append(('configure', reconfigure, start))
+        if start:
+            self.frame += 1
+            self.left = self.waits.pop(0) if self.waits else None
+
+    def status(self, read_data):
+        if self.left is None:
+            return self.STATE.ARMED
+        if self.left:
+            self.left -= 1
+            return self.STATE.ARMED
+        return self.STATE.DONE
+    def statusData(self, idxChannel, data_num, out):
+        base = 1000.0 * self.frame + 100 * idxChannel
+        out[:data_num] = array.array('d', [base + n for n in range(data_num)])
+
+def frames(segments):
+    return [[list(ch) for ch in segments.frame(i)]
+            for i in range(segments.count)]
+
+def test_segmented():
+    dev = TriggeredDevice([0, 2, 1])
+
+    seg = dwf.segmented.segmented(
+        dev, 3, samples=3, trigsrc=dev.TRIGSRC.EXTERNAL1, position=0.5)
+
+    assert seg.count == 3
+    assert frames(seg) == [
+        [[0, 1, 2], [100, 101, 102]],
+        [[1000, 1001, 1002], [1100, 1101, 1102]],
+        [[2000, 2001, 2002], [2100, 2101, 2102]],
+    ]
+    assert list(seg.timestamps) == sorted(seg.timestamps)
+    assert len(seg.intervals()) == 2
+    assert dev.calls == [
+        ('acquisitionModeSet', dev.ACQMODE.SINGLE),
+        ('triggerSourceSet', dev.TRIGSRC.EXTERNAL1),
+        ('triggerPositionSet', 0.5),
+        ('configure', True, True),
+        ('configure', False, True),
+        ('configure', False, True),
+        ('configure', False, False),
+    ]
+
+def test_segmented_shape():
+    numpy = pytest.importorskip('numpy')
+    dev = TriggeredDevice([0, 0])
+
+    seg = dwf.segmented.segmented(dev, 2, channels=[1])
+
+    assert seg.data.shape == (2, 1, 4)
+    assert numpy.array_equal(seg.data[1, 0], [1100, 1101, 1102, 1103])
+
+def test_segmented_timeout():
+    dev = TriggeredDevice([0])
+
+    seg = dwf.segmented.segmented(dev, 3, timeout=0.01)
+
+    assert seg.count == 1
+    assert frames(seg) == [[[0, 1, 2, 3], [100, 101, 102, 103]]]
+    assert dev.calls[-1] == ('configure', False, False)
+
+def test_analog_in_segmented():
+    dev = TriggeredDevice([0])
+
+    seg = dwf.DwfAnalogIn.segmented(dev, 1, samples=2)
+
+    assert frames(seg) == [[[0, 1], [100, 101]]]
@@ -0,0 +1,82 @@
+import unittest.mock
+
+import pytest
+
+import dwf
+
+numpy = pytest.importorskip('numpy')
+
+def test_window_cache():
+    w = dwf.spectrum.get_window('hann', 16)
+
+    assert dwf.spectrum.get_window('hann', 16) is w
+    assert not w.flags.writeable
+    assert w[0] == 0 and w[8] == pytest.approx(1.0)
+    with pytest.raises(ValueError):
+        dwf.spectrum.get_window('nope', 16)
+
+@pytest.mark.parametrize('window', ['hann', 'blackmanharris', 'flattop'])
+def test_sine_power(window):
+    rate, nfft = 1000.0, 256
+    spec = dwf.DwfSpectrum(rate, nfft, window=window)
+    t = numpy.arange(4096) / rate
+    frequency = spec.frequencies[32]
+
+    spec.add((2.0 * numpy.sin(2 * numpy.pi * frequency * t),))
+
+    assert spec.segments == (4096 - 256) // 128 + 1
+    assert spec.power()[0].argmax() == 32
+    assert spec.power()[0][32] == pytest.approx(2.0, rel=1e-3) # A^2 / 2
+    assert spec.peak[0][32] == pytest.approx(spec.psd[0][32])
+
+def test_noise_floor():
+    rate, sigma = 10000.0, 0.01
+    spec = dwf.DwfSpectrum(rate, 512, channels=2)
+    noise = numpy.random.default_rng(0).normal(0, sigma, (2, 200000))
+    t = numpy.arange(200000) / rate
+    noise[1] += numpy.sin(2 * numpy.pi * 1000 * t)
+
+    # in chunks that do not line up with the segments
+    for i in range(0, 200000, 3000):
+        spec.add(noise[:, i:i + 3000])
+
+    # white noise: sigma^2 spread over rate / 2
+    expected = sigma * numpy.sqrt(2 / rate)
+    assert spec.noise_floor() == pytest.approx([expected] * 2, rel=0.05)
+    assert numpy.median(spec.density()[0]) == pytest.approx(expected, rel=0.05)
+    assert spec.rbw == pytest.approx(1.5 * rate / 512)
+
+def test_exponential_average():
+    spec = dwf.DwfSpectrum(100.0, 8, overlap=0, alpha=0.5)
+
+    spec.add((numpy.ones(8),))
+    first = spec.psd.copy()
+    spec.add(dwf.DwfStreamChunk((numpy.zeros(4),), 8, 0, 0))
+    spec.add(dwf.DwfStreamChunk((numpy.zeros(8),), 12, 3, 0)) # drops the tail
+
+    assert spec.segments == 2
+    assert spec.psd == pytest.approx(first / 2)
+    assert spec.peak == pytest.approx(first)
+
+def test_lost_samples_mid_chunk():
+    spec = dwf.DwfSpectrum(100.0, 8, overlap=0)
+
+    # 5 samples lost after the 6th: no segment spans the gap
+    count = spec.add(dwf.DwfStreamChunk((numpy.ones(12),), 0, 5, 0, ((6, 5),)))
+
+    assert count == spec.segments == 0
+    assert spec._tail.shape == (1, 6)
+    assert spec.add((numpy.ones(2),)) == 1
+
+def test_analog_in_spectrum():
+    with unittest.mock.patch.object(dwf.api, "_HDwf"):
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfAnalogIn()
+            low_level_patch.FDwfAnalogInFrequencyGet.return_value = 1e6
+            low_level_patch.FDwfAnalogInBufferSizeGet.return_value = 1024
+
+            spec = dev.spectrum(channels=[0, 1])
+
+            assert spec.nfft == 1024
+            assert spec.channels == 2
+            assert spec.frequencies[1] == pytest.approx(1e6 / 1024)
@@ -0,0 +1,98 @@
+import array
+
+import pytest
+
+import dwf
+
+class RecordDevice(object):
+    '''Stand-in for DwfAnalogIn in RECORD mode.
+
+    `polls` is the list of (available, lost, corrupted) returned by
+    statusRecord. Channel `c` sample `n` has the value `1000 * c + n`, where n
+    counts lost samples too.
+    '''
+    ACQMODE = dwf.DwfAnalogIn.ACQMODE
+    STATE = dwf.DwfAnalogIn.STATE
+
+    def __init__(self, polls, frequency=1000.0):
+        self.polls = list(polls)
+        self.frequency = frequency
+        self.position = 0
+        self.available = 0
+        self.calls = []
+
+    def channelCount(self):
+        return 2
+    def channelEnableGet(self, idxChannel):
+        return True
+    def frequencyGet(self):
+        return self.frequency
+    def bufferSizeGet(self):
+        return 8
+    def acquisitionModeSet(self, acqmode):
+        self.calls.append(('acquisitionModeSet', acqmode))
+    def recordLengthSet(self, length):
+        self.calls.append(('recordLengthSet', length))
+    def configure(self, reconfigure, start):
+        self.calls.append(('configure', reconfigure, start))
+
+    def status(self, read_data):
+        if not self.polls:
+            return self.STATE.DONE
+        self.record = self.polls.pop(0)
+        return self.STATE.RUNNING
+    def statusRecord(self):
+        if not self.polls and self.record is None:
+            return 0, 0, 0
+        available, lost, corrupted = self.record
+        self.record = None
+        self.position += lost
+        self.base = self.position
+        self.position += available
+        return available, lost, corrupted
+    def statusData2(self, idxChannel, idxData, data_num, out):
+        start = self.base + idxData
+        out[:data_num] = array.array(
+            'd', [1000.0 * idxChannel + n for n in range(start, start + data_num)])
+
+def test_stream_chunks():
+    dev = RecordDevice([(3, 0, 0), (0, 0, 0), (6, 0, 1), (2, 0, 0)])
+
+    chunks = [(list(c.data[0]), list(c.data[1]), c.index, c.lost, c.corrupted)
+              for c in dwf.DwfAnalogInStream(dev, 4, buffers=2)]
+
+    assert chunks == [
+        ([0, 1, 2, 3], [1000, 1001, 1002, 1003], 0, 0, 1),
+        ([4, 5, 6, 7], [1004, 1005, 1006, 1007], 4, 0, 0),
+        ([8, 9, 10], [1008, 1009, 1010], 8, 0, 0),
+    ]
+    assert dev.calls[0] == ('acquisitionModeSet', dev.ACQMODE.RECORD)
+    assert dev.calls[1] == ('recordLengthSet', 0)
+    assert dev.calls[-1] == ('configure', False, False)
+
+def test_stream_samples_and_lost():
+    dev = RecordDevice([(3, 0, 0), (3, 2, 0), (10, 0, 0)])
+    stream = dwf.DwfAnalogInStream(dev, 4, channels=[0], samples=10)
+
+    chunks = [(list(c.data[0]), c.lost) for c in stream]
+
+    assert chunks == [([0, 1, 2, 5], 2), ([6, 7, 8, 9], 0)]
+    assert stream.received == 8
+    assert stream.lost == 2
+    assert stream.scheduler.polls == 3
+    assert stream.scheduler.overflows == 2 # lost samples, then 10 > 8 samples
+    assert ('recordLengthSet', 10 / 1000.0) in dev.calls
+
+def test_stream_duration():
+    dev = RecordDevice([(100, 0, 0)], frequency=10.0)
+    stream = dwf.DwfAnalogInStream(dev, 8, channels=[1], duration=1.5)
+
+    assert [len(c) for c in stream] == [8, 7]
+
+def test_stream_stop_on_break():
+    dev = RecordDevice([(100, 0, 0)] * 10)
+
+    for chunk in dwf.DwfAnalogInStream(dev, 8):
+        break
+
+    assert dev.calls[-1] == ('configure', False, False)
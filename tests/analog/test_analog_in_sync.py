@@ -0,0 +1,109 @@
+import array
+import unittest.mock
+
+import pytest
+
+import dwf
+
+STATE = dwf.DwfAnalogIn.STATE
+TRIGSRC = dwf.Dwf.TRIGSRC
+
+class Handle(int):
+    '''Device handle, closed in place of dwf.api._HDwf'''
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+def rack(low_level_patch, count, arm_reads=2):
+    '''Script `count` devices sharing a trigger line.
+
+    Device handles are 100 + index. A device is armed `arm_reads` status
+    reads after it is started, and done once the PC trigger was sent.
+    Device `d` channel `c` sample `n` has the value `1000 * d + 100 * c + n`.
+    '''
+    state = {'triggered': False, 'reads': {}}
+
+    def configure(hdwf, reconfigure, start):
+        if start:
+            state['reads'][hdwf] = arm_reads
+
+    def status(hdwf, read_data):
+        left = state['reads'].get(hdwf)
+        if left is None:
+            return STATE.READY
+        if left:
+            state['reads'][hdwf] -= 1
+            return STATE.PREFILL
+        return STATE.DONE if state['triggered'] else STATE.ARMED
+
+    def trigger_pc(hdwf):
+        assert len(state['reads']) == count # everybody armed
+        state['triggered'] = True
+
+    def status_data(hdwf, idxChannel, out, data_num):
+        base = 1000.0 * (hdwf - 100) + 100 * idxChannel
+        out[:data_num] = array.array('d', [base + n for n in range(data_num)])
+
+    low_level_patch.hdwfNone = dwf.lowlevel.hdwfNone
+    low_level_patch.FDwfEnum.return_value = count
+    low_level_patch.FDwfDeviceOpen.side_effect = lambda idx: 100 + idx
+    low_level_patch.FDwfAnalogInConfigure.side_effect = configure
+    low_level_patch.FDwfAnalogInStatus.side_effect = status
+    low_level_patch.FDwfDeviceTriggerPC.side_effect = trigger_pc
+    low_level_patch.FDwfAnalogInStatusData.side_effect = status_data
+    low_level_patch.FDwfAnalogInFrequencyGet.return_value = 1e6
+    low_level_patch.FDwfAnalogInChannelCount.return_value = 2
+    low_level_patch.FDwfAnalogInChannelEnableGet.return_value = True
+
+def test_sync():
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            hdwf_patch.side_effect = Handle
+            rack(low_level_patch, 3)
+
+            sync = dwf.DwfAnalogInSync(master=1, pin=1)
+            capture = sync.acquire(4, position=0.0, timeout=5)
+
+            assert capture.count == 3
+            assert capture.frequency == 1e6
+            assert [[list(c) for c in capture.device(d)] for d in range(3)] \
+                == [[[1000 * d + 100 * c + n for n in range(4)]
+                     for c in range(2)] for d in range(3)]
+            low_level_patch.FDwfDeviceTriggerSet.assert_has_calls([
+                unittest.mock.call(100, 1, TRIGSRC.NONE),
+                unittest.mock.call(101, 1, TRIGSRC.PC),
+                unittest.mock.call(102, 1, TRIGSRC.NONE),
+            ])
+            for hdwf in (100, 101, 102):
+                low_level_patch.FDwfAnalogInTriggerSourceSet.assert_any_call(
+                    hdwf, TRIGSRC.EXTERNAL2)
+                low_level_patch.FDwfAnalogInTriggerAutoTimeoutSet \
+                    .assert_any_call(hdwf, 0)
+                low_level_patch.FDwfAnalogInBufferSizeSet.assert_any_call(
+                    hdwf, 4)
+            low_level_patch.FDwfDeviceTriggerPC.assert_called_once_with(101)
+
+            sync.close()
+            assert all(dev.hdwf.closed for dev in sync.instruments)
+
+def test_sync_timeout():
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            hdwf_patch.side_effect = Handle
+            rack(low_level_patch, 2)
+
+            sync = dwf.DwfAnalogInSync(source=TRIGSRC.DETECTOR_ANALOG_IN)
+            with pytest.raises(RuntimeError):
+                sync.acquire(4, timeout=0.05)
+
+            low_level_patch.FDwfDeviceTriggerPC.assert_not_called()
+            low_level_patch.FDwfAnalogInConfigure.assert_called_with(
+                101, False, False)
+
+def test_sync_no_device():
+    with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+        low_level_patch.FDwfEnum.return_value = 0
+
+        with pytest.raises(RuntimeError):
+            dwf.DwfAnalogInSync()
@@ -0,0 +1,44 @@
+import array
+import unittest.mock
+
+import pytest
+
+import dwf
+
+@pytest.mark.parametrize('channel', [0, 1])
+@pytest.mark.parametrize('node', dwf.DwfAnalogOut.NODE)
+def test_node_data_set(channel, node):
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfAnalogOut()
+            data = array.array('d', [0.0, 1.0])
+
+            dev.nodeDataSet(channel, node, data)
+
+            low_level_patch.FDwfAnalogOutNodeDataSet.assert_called_once_with(dev.hdwf, channel, node, data)
+
+@pytest.mark.parametrize('channel', [0, 1])
+@pytest.mark.parametrize('node', dwf.DwfAnalogOut.NODE)
+def test_node_play_data(channel, node):
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfAnalogOut()
+            data = array.array('d', [0.0, 1.0])
+
+            dev.nodePlayData(channel, node, data)
+
+            low_level_patch.FDwfAnalogOutNodePlayData.assert_called_once_with(dev.hdwf, channel, node, data)
+
+def test_play_scheduler():
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfAnalogOut()
+            low_level_patch.FDwfAnalogOutNodeFrequencyGet.return_value = 100e3
+            low_level_patch.FDwfAnalogOutNodeDataInfo.return_value = (32, 4096)
+
+            sched = dev.playScheduler(1, dev.NODE.CARRIER, target=0.25)
+
+            low_level_patch.FDwfAnalogOutNodeFrequencyGet.assert_called_once_with(dev.hdwf, 1, dev.NODE.CARRIER)
+            assert sched.rate == 100e3
+            assert sched.buffer_size == 4096
+            assert sched.interval() == pytest.approx(1024 / 100e3)
@@ -0,0 +1,160 @@
+import unittest.mock
+
+import pytest
+
+import dwf
+
+numpy = pytest.importorskip('numpy')
+
+def uart(data, per_bit=10, parity=None, idle=25, stop=1):
+    '''Samples of a UART line on DIO 2, other pins toggling'''
+    bits = [1] * idle
+    for byte in data:
+        frame = [0] + [(byte >> i) & 1 for i in range(8)]
+        if parity is not None:
+            frame.append((bin(byte).count('1') + (parity == 'odd')) % 2)
+        frame += [stop] + [1] * 3
+        bits += frame
+    bits += [1] * idle
+    line = numpy.repeat(numpy.array(bits, numpy.uint16), per_bit)
+    noise = numpy.arange(len(line), dtype=numpy.uint16) & 1
+    return (line << 2) | noise
+
+def chunked(decoder, samples, size):
+    records = []
+    for i in range(0, len(samples), size):
+        records += decoder.feed(samples[i:i + size])
+    return records
+
+@pytest.mark.parametrize('size', [7, 64, 100000])
+def test_uart(size):
+    samples = uart(b'Hello\x00\xff', parity='even')
+    decoder = dwf.DwfUartDecoder(1e6, rx=2, baud=1e5, parity='even')
+
+    records = chunked(decoder, samples, size)
+
+    assert b''.join(r.data for r in records) == b'Hello\x00\xff'
+    assert all(r.errors == () for r in records)
+    assert records[0].index == 250
+    assert records[0].time == pytest.approx(250e-6)
+    assert records[1].index == 250 + 14 * 10
+
+def test_uart_errors():
+    samples = uart(b'AB', parity='odd', stop=0)
+    decoder = dwf.DwfUartDecoder(1e6, rx=2, baud=1e5, parity='even')
+
+    records = decoder.decode(samples)
+
+    assert [r.errors for r in records] == [('parity', 'framing')] * 2
+
+def test_uart_rate_from_device():
+    dev = unittest.mock.Mock()
+    dev.internalClockInfo.return_value = 100e6
+    dev.dividerGet.return_value = 100
+
+    decoder = dwf.DwfUartDecoder(dev, rx=0, baud=9600)
+
+    assert decoder.rate == 1e6
+    assert dwf.decode.sample_rate(dev) == 1e6
+
+def spi(words, cs_gaps=True, mode=0):
+    '''SCLK on DIO 0, MOSI on 1, MISO on 2, CS on 3; 4 samples per bit'''
+    polarity = mode >> 1
+    samples = [8 | polarity] * 5
+    for mosi, miso in words:
+        for bit in range(7, -1, -1):
+            data = (((mosi >> bit) & 1) << 1) | (((miso >> bit) & 1) << 2)
+            samples += [data] * 2 + [data | 1] * 2
+        if cs_gaps:
+            samples += [polarity] * 2
+    samples += [8 | polarity] * 5
+    return numpy.array(samples, numpy.uint8)
+
+@pytest.mark.parametrize('size', [5, 1000])
+def test_spi_cs(size):
+    samples = numpy.concatenate((spi([(0x12, 0xa1), (0x34, 0xb2)], False),
+                                 spi([(0x56, 0xc3)], False)))
+    decoder = dwf.DwfSpiDecoder(1e6, sclk=0, mosi=1, miso=2, cs=3)
+
+    records = chunked(decoder, samples, size)
+
+    assert [(r.data, r.info['miso']) for r in records] == [
+        (b'\x12\x34', b'\xa1\xb2'), (b'\x56', b'\xc3')]
+    assert records[0].index == 5
+
+@pytest.mark.parametrize('mode', [0, 3])
+def test_spi_words(mode):
+    samples = spi([(0x12, 0), (0x34, 0)], mode=mode)
+    decoder = dwf.DwfSpiDecoder(1e6, sclk=0, mosi=1, mode=mode)
+
+    records = chunked(decoder, samples, 9)
+
+    assert [r.data for r in records] == [b'\x12', b'\x34']
+
+def test_spi_incomplete():
+    samples = spi([(0xff, 0)], False)
+    samples = numpy.concatenate((samples[:5 + 4 * 5], samples[-5:]))
+    decoder = dwf.DwfSpiDecoder(1e6, sclk=0, mosi=1, cs=3)
+
+    (record,) = decoder.decode(samples)
+
+    assert record.errors == ('incomplete',)
+    assert record.data == b''
+
+def i2c(transfers):
+    '''SCL on DIO 0, SDA on DIO 1. `transfers` are (bytes, acks, stop)'''
+    samples = [3] * 4
+    for data, acks, stop in transfers:
+        if samples[-1] != 3: # repeated start: release SDA, then SCL
+            samples += [2, 3]
+        samples += [1, 1] # start: SDA falls with SCL high
+        for byte, ack in zip(data, acks):
+            bits = [(byte >> b) & 1 for b in range(7, -1, -1)]
+            bits.append(0 if ack else 1)
+            for bit in bits:
+                samples += [bit << 1, (bit << 1) | 1, (bit << 1) | 1, bit << 1]
+        if stop:
+            samples += [0, 1, 3, 3] # stop: SDA rises with SCL high
+        else:
+            samples += [0]
+    return numpy.array(samples, numpy.uint8)
+
+@pytest.mark.parametrize('size', [3, 1000])
+def test_i2c(size):
+    samples = i2c([(b'\xa0\x10', (True, True), False),
+                   (b'\xa1\x55\xaa', (True, True, False), True),
+                   (b'\x42', (False,), True)])
+    decoder = dwf.DwfI2cDecoder(1e6, scl=0, sda=1)
+
+    records = chunked(decoder, samples, size)
+
+    assert [(r.info['address'], r.info['read'], r.data, r.info['stop'])
+            for r in records] == [
+        (0x50, False, b'\x10', False),
+        (0x50, True, b'\x55\xaa', True),
+        (0x21, False, b'', True),
+    ]
+    assert records[1].info['acks'] == (True, True, False)
+    assert [r.errors for r in records] == [(), (), ('nack',)]
+
+def test_lost_samples_drop_frame():
+    samples = uart(b'AB')
+    decoder = dwf.DwfUartDecoder(1e6, rx=2, baud=1e5)
+
+    first = decoder.feed(samples[:300])
+    second = decoder.feed(dwf.DwfStreamChunk(samples[350:], 300, 50, 0))
+
+    assert first == []
+    assert [r.data for r in second] == [b'B']
+    assert second[0].index == 250 + 130
+
+def test_lost_samples_mid_chunk():
+    samples = uart(b'ABC')
+    decoder = dwf.DwfUartDecoder(1e6, rx=2, baud=1e5)
+    # samples lost from the middle of 'B' to the idle line after it
+    chunk = numpy.concatenate((samples[:400], samples[490:]))
+
+    records = decoder.feed(dwf.DwfStreamChunk(chunk, 0, 90, 0, ((400, 90),)))
+
+    assert [(r.index, r.data) for r in records] == [(250, b'A'), (510, b'C')]
+    assert decoder.position == len(samples)
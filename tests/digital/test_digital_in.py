@@ -1,4 +1,5 @@
 
+import array
 import unittest.mock
 
 import pytest
@@ -132,8 +133,16 @@ def test_status_auto_triggered(return_value):
             low_level_patch.FDwfDigitalInStatusAutoTriggered.assert_called_once_with(dev.hdwf)
             assert value == return_value
 
+def fill_status_data(data):
+    '''FDwfDigitalInStatusData side effect: copy `data` bytes into the buffer'''
+    def status_data(hdwf, rgData, countOfDataBytes):
+        assert countOfDataBytes == len(data)
+        memoryview(rgData).cast('B')[:countOfDataBytes] = bytes(data)
+    return status_data
+
 EXPECTED = [
     # Sample Format, Samples, Data,                         Expected
+    (8,              2,       [0x12, 0x34],                 [0x12, 0x34]),
     (16,             1,       [0xFF, 0x00],                 [0x00FF]),
     (16,             1,       [0x00, 0xFF],                 [0xFF00]),
     (16,             1,       [0xF0, 0x0F],                 [0x0FF0]),
@@ -150,13 +159,72 @@ def test_status_data(sample_format, samples, data, expected):
             dev = dwf.DwfDigitalIn()
 
             low_level_patch.FDwfDigitalInSampleFormatGet.return_value = sample_format
-            low_level_patch.FDwfDigitalInStatusData.return_value = data
+            low_level_patch.FDwfDigitalInStatusData.side_effect = fill_status_data(data)
 
             value = dev.statusData(samples)
 
-            assert value == expected
+            assert list(value) == expected
+            assert memoryview(value).itemsize == sample_format // 8
             low_level_patch.FDwfDigitalInStatusData.assert_called_once()
 
+@pytest.mark.parametrize('sample_format,samples,data,expected', EXPECTED)
+def test_status_data_cached_format(sample_format, samples, data, expected):
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfDigitalIn()
+
+            dev.sampleFormatSet(sample_format)
+            low_level_patch.FDwfDigitalInStatusData.side_effect = fill_status_data(data)
+
+            value = dev.statusData(samples)
+            value = dev.statusData(samples)
+
+            assert list(value) == expected
+            low_level_patch.FDwfDigitalInSampleFormatGet.assert_not_called()
+
+def test_status_data_format_shared():
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfDigitalIn()
+            other = dwf.DwfDigitalIn(dev)
+            dev.sampleFormatSet(8)
+
+            other.sampleFormatSet(32)
+            value = dev.statusData(2)
+
+            assert memoryview(value).itemsize == 4
+            dev.reset()
+            low_level_patch.FDwfDigitalInSampleFormatGet.return_value = 16
+            assert memoryview(other.statusData(2)).itemsize == 2
+
+def test_typecodes():
+    for bits, typecode in dwf.DwfDigitalIn._TYPECODES.items():
+        assert array.array(typecode).itemsize * 8 == bits
+
+def test_status_data_out():
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfDigitalIn()
+            dev.sampleFormatSet(16)
+            out = array.array('H', [0] * 8)
+
+            value = dev.statusData(4, out=out)
+
+            low_level_patch.FDwfDigitalInStatusData.assert_called_once_with(dev.hdwf, out, 8)
+            assert value is out
+
+def test_status_data2():
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfDigitalIn()
+            dev.sampleFormatSet(32)
+            out = array.array('I', [0] * 8)
+
+            value = dev.statusData2(3, 4, out=out)
+
+            low_level_patch.FDwfDigitalInStatusData2.assert_called_once_with(dev.hdwf, out, 3, 16)
+            assert value is out
+
 def test_status_record():
     with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
         with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
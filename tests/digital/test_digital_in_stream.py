@@ -0,0 +1,160 @@
+import unittest.mock
+
+import pytest
+
+import dwf
+
+RUNNING = dwf.DwfDigitalIn.STATE.RUNNING
+DONE = dwf.DwfDigitalIn.STATE.DONE
+
+def record(dev, low_level_patch, polls, sample_format):
+    '''Script a record acquisition.
+
+    `polls` is the list of (available, lost, corrupted) returned by
+    statusRecord. Sample `n` has the value `n`, where n counts lost samples
+    too.
+    '''
+    size = sample_format // 8
+    state = {'base': 0, 'position': 0}
+
+    def status_record(hdwf):
+        available, lost, corrupted = polls.pop(0) if polls else (0, 0, 0)
+        state['position'] += lost
+        state['base'] = state['position']
+        state['position'] += available
+        return available, lost, corrupted
+
+    def status_data2(hdwf, rgData, idxSample, countOfDataBytes):
+        start = state['base'] + idxSample
+        values = range(start, start + countOfDataBytes // size)
+        data = b''.join(v.to_bytes(size, 'little') for v in values)
+        memoryview(rgData).cast('B')[:countOfDataBytes] = data
+
+    low_level_patch.FDwfDigitalInInternalClockInfo.return_value = 1e8
+    low_level_patch.FDwfDigitalInDividerGet.return_value = 1000
+    low_level_patch.FDwfDigitalInBufferSizeGet.return_value = 64
+    low_level_patch.FDwfDigitalInStatus.side_effect = \
+        lambda hdwf, read: RUNNING if polls else DONE
+    low_level_patch.FDwfDigitalInStatusRecord.side_effect = status_record
+    low_level_patch.FDwfDigitalInStatusData2.side_effect = status_data2
+    dev.sampleFormatSet(sample_format)
+
+@pytest.mark.parametrize('sample_format', [8, 16, 32])
+def test_stream(sample_format):
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfDigitalIn()
+            record(dev, low_level_patch,
+                   [(5, 0, 0), (0, 0, 0), (4, 1, 2), (1, 0, 0)], sample_format)
+
+            chunks = [(list(c.data), c.index, c.lost, c.corrupted, c.gaps,
+                       memoryview(c.data).itemsize)
+                      for c in dev.stream(4, samples=100)]
+
+            size = sample_format // 8
+            assert chunks == [
+                ([0, 1, 2, 3], 0, 0, 0, (), size),
+                ([4, 6, 7, 8], 4, 1, 2, ((1, 1),), size),
+                ([9, 10], 8, 0, 0, (), size),
+            ]
+            low_level_patch.FDwfDigitalInAcquisitionModeSet.assert_called_once_with(
+                dev.hdwf, dwf.DwfDigitalIn.ACQMODE.RECORD)
+            low_level_patch.FDwfDigitalInTriggerPositionSet.assert_called_once_with(dev.hdwf, 100)
+            low_level_patch.FDwfDigitalInConfigure.assert_called_with(dev.hdwf, False, False)
+
+def test_stream_trigger_position():
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfDigitalIn()
+            record(dev, low_level_patch, [(4, 0, 0), (4, 0, 0), (4, 0, 0)], 16)
+            low_level_patch.FDwfDigitalInTriggerPositionGet.return_value = 6
+
+            stream = dev.stream(4)
+            chunks = [list(c.data) for c in stream]
+
+            assert chunks == [[0, 1, 2, 3], [4, 5]]
+            assert stream.received == 6
+            low_level_patch.FDwfDigitalInTriggerPositionSet.assert_not_called()
+
+def test_stream_recycles_buffers():
+    numpy = pytest.importorskip('numpy')
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfDigitalIn()
+            record(dev, low_level_patch, [(16, 0, 0)], 8)
+            low_level_patch.FDwfDigitalInTriggerPositionGet.return_value = 0
+
+            chunks = [c.data for c in dev.stream(4, buffers=2)]
+
+            assert len(chunks) == 4
+            assert numpy.shares_memory(chunks[0], chunks[2])
+            assert numpy.shares_memory(chunks[1], chunks[3])
+            assert not numpy.shares_memory(chunks[0], chunks[1])
+
+def test_record_to_file(tmp_path):
+    numpy = pytest.importorskip('numpy')
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfDigitalIn()
+            record(dev, low_level_patch, [(5, 0, 0), (3, 1, 0), (10, 0, 0)], 16)
+            path = str(tmp_path / 'capture.npy')
+
+            info = dev.record_to_file(path, samples=12, chunk_size=4)
+            data, metadata = dwf.record.load(path)
+
+            assert data.tolist()[:11] == [0, 1, 2, 3, 4, 6, 7, 8, 9, 10, 11]
+            assert metadata == info
+            assert metadata['instrument'] == 'DigitalIn'
+            assert metadata['sample_format'] == 16
+            assert metadata['rate'] == 1e5
+            assert metadata['trigger_position'] == 12
+            assert metadata['lost'] == [[5, 1]]
+
+def test_capture_to_file(tmp_path):
+    pytest.importorskip('numpy')
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfDigitalIn()
+            record(dev, low_level_patch, [(5, 0, 0), (3, 1, 0), (10, 0, 0)], 8)
+            path = str(tmp_path / 'capture.dwfcap')
+
+            dev.capture_to_file(path, samples=12, chunk_size=4)
+
+            with dwf.DwfCaptureFile(path) as cap:
+                assert cap.metadata['instrument'] == 'DigitalIn'
+                assert cap.samples == 12
+                assert cap.read(0, 12).tolist() == [
+                    0, 1, 2, 3, 4, 0, 6, 7, 8, 9, 10, 11]
+                assert cap.metadata['lost'] == [[5, 1]]
+
+def test_transitions():
+    pytest.importorskip('numpy')
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfDigitalIn()
+            record(dev, low_level_patch, [(5, 0, 0), (3, 1, 0), (10, 0, 0)], 8)
+
+            trans = dev.transitions(12, chunk_size=4)
+
+            assert trans.rate == 1e5
+            assert trans.samples == 12
+            assert trans.expand().tolist() == [
+                0, 1, 2, 3, 4, 4, 6, 7, 8, 9, 10, 11]
+
+def test_search():
+    pytest.importorskip('numpy')
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfDigitalIn()
+            record(dev, low_level_patch, [(5, 0, 0), (3, 1, 0), (10, 0, 0)], 8)
+
+            matches = dev.search((0, 0, 0x02, 0), samples=12, chunk_size=4)
+            record(dev, low_level_patch, [(5, 0, 0), (3, 1, 0), (10, 0, 0)], 8)
+            first = dev.search(dwf.DwfDigitalTrigger.pattern(0x03, 0x03),
+                               samples=12, chunk_size=4, limit=1)
+
+            # DIO 1 rises at 2, 6 and 10: lost sample 5 hides the edge at 6
+            assert matches.tolist() == [2, 10]
+            assert first.tolist() == [3]
+            low_level_patch.FDwfDigitalInConfigure.assert_called_with(
+                dev.hdwf, False, False)
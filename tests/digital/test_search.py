@@ -0,0 +1,70 @@
+import pytest
+
+import dwf
+
+numpy = pytest.importorskip('numpy')
+
+def chunked(search, data, size):
+    return numpy.concatenate([search.add(data[i:i + size])
+                              for i in range(0, len(data), size)]).tolist()
+
+@pytest.mark.parametrize('size', [1, 7, 1000])
+def test_edges(size):
+    data = numpy.array([0, 1, 1, 0, 1, 3, 2, 0, 1, 1], numpy.uint8)
+
+    rising = dwf.DwfPatternSearch((0, 0, 0x01, 0))
+    falling = dwf.DwfPatternSearch((0, 0, 0, 0x03))
+    gated = dwf.DwfPatternSearch((0, 0x02, 0, 0x01))
+
+    assert chunked(rising, data, size) == [1, 4, 8]
+    assert chunked(falling, data, size) == [3, 6, 7]
+    assert chunked(gated, data, size) == [6]
+    assert rising.samples == 10
+    assert rising.matches == 3
+
+def test_pattern_runs():
+    data = numpy.array([0x12, 0x12, 0x13, 0x12, 0x34, 0x112, 0x112],
+                       numpy.uint16)
+    trigger = dwf.DwfDigitalTrigger.pattern(0xff, 0x12)
+
+    assert trigger == (0xed, 0x12, 0, 0)
+    assert dwf.DwfPatternSearch(trigger).find(data).tolist() == [0, 3, 5]
+    assert dwf.DwfPatternSearch(trigger, every=True).find(data).tolist() == [
+        0, 1, 3, 5, 6]
+
+@pytest.mark.parametrize('size', [1, 3, 1000])
+def test_sequence(size):
+    data = numpy.array([1, 0, 2, 1, 1, 3, 0, 2, 3, 1, 0, 2, 0, 3],
+                       numpy.uint8)
+    search = dwf.DwfPatternSearch(dwf.DwfDigitalTrigger.pattern(3, 1),
+                                  dwf.DwfDigitalTrigger.pattern(3, 2),
+                                  dwf.DwfDigitalTrigger.pattern(3, 3))
+
+    # 1 at 0, 3 and 9; 2 at 2, 7 and 11; 3 at 5, 8 and 13
+    assert chunked(search, data, size) == [5, 13]
+
+def test_sequence_of_edges():
+    clock = numpy.tile(numpy.array([0, 0, 1, 1], numpy.uint8), 5)
+    search = dwf.DwfPatternSearch((0, 0, 1, 0), (0, 0, 0, 1), (0, 0, 1, 0))
+
+    assert search.find(clock).tolist() == [6, 14]
+
+def test_lost_samples():
+    search = dwf.DwfPatternSearch((0, 0, 1, 0), (0, 0, 1, 0))
+
+    first = search.add(numpy.array([0, 1, 1, 1], numpy.uint8))
+    second = search.add(dwf.DwfStreamChunk(
+        numpy.array([0, 0, 1, 0, 1, 1], numpy.uint8), 4, 2, 0, ((2, 2),)))
+    third = search.add(numpy.array([0, 1], numpy.uint8))
+
+    # the gap drops the edge at 8 and the sequence started at 1
+    assert first.tolist() == []
+    assert second.tolist() == []
+    assert third.tolist() == [13]
+    assert search.samples == 14
+
+def test_arguments():
+    with pytest.raises(ValueError):
+        dwf.DwfPatternSearch()
+    with pytest.raises(TypeError):
+        dwf.DwfPatternSearch((0, 0, 1, 0), limit=1)
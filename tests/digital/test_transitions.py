@@ -0,0 +1,107 @@
+import pytest
+
+import dwf
+
+numpy = pytest.importorskip('numpy')
+
+def capture():
+    '''Idle bus with a few toggles of DIO 0 and 3'''
+    data = numpy.zeros(1000, numpy.uint16)
+    data[100:200] |= 1
+    data[150:600] |= 8
+    data[700:701] |= 1
+    return data
+
+def test_from_chunks():
+    data = capture()
+    trans = dwf.DwfTransitions('H')
+
+    for i in range(0, 1000, 64):
+        trans.add(data[i:i + 64])
+
+    assert trans.samples == 1000
+    assert trans.indexes.tolist() == [0, 100, 150, 200, 600, 700, 701]
+    assert trans.values.tolist() == [0, 1, 9, 8, 0, 1, 0]
+    assert numpy.array_equal(trans.expand(), data)
+    assert numpy.array_equal(trans.expand(120, 650), data[120:650])
+    assert numpy.array_equal(numpy.concatenate(list(trans.chunks(300))), data)
+
+def test_grows():
+    data = numpy.arange(5000, dtype=numpy.uint8)
+    trans = dwf.DwfTransitions.from_samples(data)
+
+    assert len(trans) == 5000
+    assert trans.typecode == 'B'
+    assert numpy.array_equal(trans.expand(), data)
+
+def test_value_at():
+    trans = dwf.DwfTransitions.from_samples(capture())
+
+    assert trans.value_at(0) == 0
+    assert trans.value_at(150) == 9
+    assert trans.value_at(599) == 8
+    assert trans.value_at([99, 100, 700, 999]).tolist() == [0, 1, 1, 0]
+    with pytest.raises(IndexError):
+        trans.value_at(1000)
+
+def test_edges():
+    trans = dwf.DwfTransitions.from_samples(capture())
+
+    assert trans.edges(0).tolist() == [100, 200, 700, 701]
+    assert trans.edges(0, 'rising').tolist() == [100, 700]
+    assert trans.edges(3, 'falling').tolist() == [600]
+    assert trans.edges(5).tolist() == []
+    with pytest.raises(ValueError):
+        trans.edges(0, 'up')
+
+def test_lost_samples():
+    trans = dwf.DwfTransitions('H')
+
+    trans.add(numpy.array([1, 1, 2], numpy.uint16))
+    trans.add(dwf.DwfStreamChunk(numpy.array([2, 3], numpy.uint16), 3, 5, 0))
+
+    assert trans.samples == 10
+    assert trans.indexes.tolist() == [0, 2, 9]
+    assert trans.expand().tolist() == [1, 1, 2, 2, 2, 2, 2, 2, 2, 3]
+
+def test_write_vcd(tmp_path):
+    trans = dwf.DwfTransitions.from_samples(capture(), rate=1e6)
+    path = str(tmp_path / 'capture.vcd')
+
+    trans.write_vcd(path, bits=[0, 3], names={3: 'CS'})
+
+    with open(path) as f:
+        text = f.read()
+    assert "$timescale 1 ns $end" in text
+    assert "$var wire 1 \" CS $end" in text
+    body = text.split("$enddefinitions $end\n")[1]
+    assert body.split() == [
+        '#0', '0!', '0"', '#100000', '1!', '#150000', '1"', '#200000', '0!',
+        '#600000', '0"', '#700000', '1!', '#701000', '0!']
+
+def test_decode_transitions():
+    uart = dwf.DwfUartDecoder(1e6, rx=0, baud=1e5)
+    bits = [1] * 30 + [0] + [(0x5a >> i) & 1 for i in range(8)] + [1] * 30
+    data = numpy.repeat(numpy.array(bits, numpy.uint8), 10)
+    trans = dwf.DwfTransitions.from_samples(data)
+
+    (record,) = uart.decode_transitions(trans)
+
+    assert record.data == b'\x5a'
+    assert record.index == 300
+    assert uart.decode_transitions(trans) == uart.decode(data)
+
+def test_decode_transitions_i2c():
+    # start, address 0x21 write, ACK, stop; SCL on DIO 0, SDA on DIO 1
+    samples = [3, 3, 1, 1]
+    for bit in [0, 1, 0, 0, 0, 0, 1, 0, 0]:
+        samples += [bit << 1, (bit << 1) | 1, (bit << 1) | 1, bit << 1]
+    samples += [0, 1, 3, 3]
+    data = numpy.repeat(numpy.array(samples, numpy.uint8), 3)
+    i2c = dwf.DwfI2cDecoder(1e6, scl=0, sda=1)
+
+    (record,) = i2c.decode_transitions(dwf.DwfTransitions.from_samples(data))
+
+    assert record.info['address'] == 0x21
+    assert record.index == 6
+    assert record == i2c.decode(data)[0]
@@ -0,0 +1,130 @@
+import asyncio
+import unittest.mock
+
+import pytest
+
+import dwf
+from dwf import aio
+
+RUNNING = dwf.Dwf.STATE.RUNNING
+DONE = dwf.Dwf.STATE.DONE
+
+def fill(value):
+    '''FDwfAnalogInStatusData side effect: fill the buffer with `value`'''
+    def status_data(hdwf, idxChannel, rgdVoltData, cdData):
+        for i in range(cdData):
+            rgdVoltData[i] = value + idxChannel
+    return status_data
+
+def test_executor_per_device():
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            hdwf_patch.side_effect = lambda hdwf: unittest.mock.Mock()
+            ai = dwf.DwfAnalogIn()
+            ao = dwf.DwfAnalogOut(ai)
+            other = dwf.DwfAnalogIn()
+
+            assert aio.executor(ai) is aio.executor(ao)
+            assert aio.executor(ai) is not aio.executor(other)
+
+def test_analog_in_acquire():
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfAnalogIn()
+            low_level_patch.FDwfAnalogInFrequencyGet.return_value = 1e6
+            low_level_patch.FDwfAnalogInBufferSizeGet.return_value = 8192
+            low_level_patch.FDwfAnalogInStatus.side_effect = [RUNNING, RUNNING, DONE]
+            low_level_patch.FDwfAnalogInStatusSamplesValid.return_value = 3
+            low_level_patch.FDwfAnalogInChannelCount.return_value = 2
+            low_level_patch.FDwfAnalogInChannelEnableGet.return_value = True
+            low_level_patch.FDwfAnalogInStatusData.side_effect = fill(1.5)
+
+            ch0, ch1 = asyncio.run(dev.acquire())
+
+            assert list(ch0) == [1.5] * 3
+            assert list(ch1) == [2.5] * 3
+            low_level_patch.FDwfAnalogInConfigure.assert_called_once_with(dev.hdwf, False, True)
+            assert low_level_patch.FDwfAnalogInStatus.call_count == 3
+
+def test_digital_in_acquire():
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfDigitalIn()
+            dev.sampleFormatSet(16)
+            low_level_patch.FDwfDigitalInInternalClockInfo.return_value = 1e8
+            low_level_patch.FDwfDigitalInDividerGet.return_value = 100
+            low_level_patch.FDwfDigitalInBufferSizeGet.return_value = 4096
+            low_level_patch.FDwfDigitalInStatus.side_effect = [RUNNING, DONE]
+            low_level_patch.FDwfDigitalInStatusSamplesValid.return_value = 4
+
+            data = asyncio.run(dev.acquire())
+
+            assert len(data) == 4
+            low_level_patch.FDwfDigitalInStatusData.assert_called_once_with(dev.hdwf, data, 8)
+
+def test_analog_in_astream():
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfAnalogIn()
+            low_level_patch.FDwfAnalogInFrequencyGet.return_value = 1e6
+            low_level_patch.FDwfAnalogInBufferSizeGet.return_value = 8192
+            low_level_patch.FDwfAnalogInStatus.return_value = RUNNING
+            low_level_patch.FDwfAnalogInStatusRecord.side_effect = \
+                [(0, 0, 0), (6, 0, 0), (0, 0, 0), (6, 0, 0)]
+
+            async def collect():
+                return [(c.index, len(c)) for c in
+                        [c async for c in dev.astream(4, channels=[0], samples=10)]]
+
+            assert asyncio.run(collect()) == [(0, 4), (4, 4), (8, 2)]
+            low_level_patch.FDwfAnalogInConfigure.assert_called_with(dev.hdwf, False, False)
+
+def test_astream_break_stops():
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfDigitalIn()
+            dev.sampleFormatSet(8)
+            low_level_patch.FDwfDigitalInInternalClockInfo.return_value = 1e8
+            low_level_patch.FDwfDigitalInDividerGet.return_value = 1
+            low_level_patch.FDwfDigitalInBufferSizeGet.return_value = 4096
+            low_level_patch.FDwfDigitalInTriggerPositionGet.return_value = 0
+            low_level_patch.FDwfDigitalInStatus.return_value = RUNNING
+            low_level_patch.FDwfDigitalInStatusRecord.return_value = (100, 0, 0)
+
+            async def first():
+                chunks = dev.astream(16)
+                async for chunk in chunks:
+                    await chunks.aclose()
+                    return len(chunk)
+
+            assert asyncio.run(first()) == 16
+            low_level_patch.FDwfDigitalInConfigure.assert_called_with(dev.hdwf, False, False)
+
+def test_analog_out_wait_done():
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfAnalogOut()
+            low_level_patch.FDwfAnalogOutRunGet.return_value = 0.004
+            low_level_patch.FDwfAnalogOutStatus.side_effect = [RUNNING, RUNNING, DONE]
+
+            asyncio.run(dev.wait_done(1))
+
+            low_level_patch.FDwfAnalogOutStatus.assert_called_with(dev.hdwf, 1)
+            assert low_level_patch.FDwfAnalogOutStatus.call_count == 3
+
+def test_analog_out_wait_done_infinite(monkeypatch):
+    sleeps = []
+    async def sleep(seconds):
+        sleeps.append(seconds)
+    monkeypatch.setattr(asyncio, 'sleep', sleep)
+    with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+        with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+            dev = dwf.DwfAnalogOut()
+            low_level_patch.FDwfAnalogOutRunGet.return_value = 0
+            low_level_patch.FDwfAnalogOutStatus.side_effect = [RUNNING] * 10 + [DONE]
+
+            asyncio.run(dev.wait_done(0))
+
+            assert sleeps[:3] == [0.001, 0.002, 0.004]
+            assert sleeps[-1] == dwf.poll.POLL_MAX
+            assert max(sleeps) == dwf.poll.POLL_MAX
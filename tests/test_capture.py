@@ -0,0 +1,127 @@
+import array
+import unittest.mock
+
+import pytest
+
+import dwf
+from dwf import capture
+
+numpy = pytest.importorskip('numpy')
+
+class FakeStream(object):
+    '''Record stream of chunks of `chunk_size` samples, sample `n` of channel
+    `c` being `100 * c + n` (n counts the lost samples too).
+
+    `lost` maps a chunk number to the samples lost before it.'''
+    def __init__(self, chunks, chunk_size=4, channels=None, typecode='d', lost=None):
+        self.chunks = chunks
+        self.chunk_size = chunk_size
+        self.channels = channels
+        self.typecode = typecode
+        self.frequency = 1000.0
+        self.lost = lost or {}
+
+    def __iter__(self):
+        position, index = 0, 0
+        for i in range(self.chunks):
+            lost = self.lost.get(i, 0)
+            position += lost
+            values = range(position, position + self.chunk_size)
+            if self.channels is None:
+                data = array.array(self.typecode, values)
+            else:
+                data = tuple(array.array(self.typecode, [100 * c + v for v in values])
+                             for c in range(len(self.channels)))
+            yield dwf.DwfStreamChunk(data, index, lost, 0)
+            position += self.chunk_size
+            index += self.chunk_size
+
+@pytest.fixture
+def analog(tmp_path):
+    path = str(tmp_path / 'capture.dwfcap')
+    capture.capture(FakeStream(5, channels=[0, 1], lost={2: 3}), path, {'range': [5.0, 5.0]})
+    with dwf.DwfCaptureFile(path) as cap:
+        yield cap
+
+def test_metadata(analog):
+    assert len(analog) == 5
+    assert analog.samples == 23
+    assert analog.rate == 1000.0
+    assert analog.channels == 2
+    assert analog.metadata['range'] == [5.0, 5.0]
+    assert analog.metadata['lost'] == [[8, 3]]
+    assert analog.starts.tolist() == [0, 4, 11, 15, 19]
+    assert analog.counts.tolist() == [4] * 5
+
+def test_chunk(analog):
+    assert analog.chunk(2).tolist() == [[11, 12, 13, 14], [111, 112, 113, 114]]
+
+def test_read(analog):
+    data = analog.read(2, 13)
+
+    assert data.shape == (2, 11)
+    assert data[0, :6].tolist() == [2, 3, 4, 5, 6, 7]
+    assert numpy.isnan(data[:, 6:9]).all() # lost samples
+    assert data[1, 9:].tolist() == [111, 112]
+
+def test_read_bounds(analog):
+    assert analog.read(20, 100)[0].tolist() == [20, 21, 22]
+    assert analog.read(-5, 2)[0].tolist() == [0, 1]
+    assert analog.read(10, 5).shape == (2, 0)
+
+def test_time(analog):
+    assert analog.time(0.015, 0.017)[0].tolist() == [15, 16]
+
+def test_summary(analog):
+    low, high = analog.summary(5, 12)
+
+    assert low.tolist() == [4, 104]
+    assert high.tolist() == [14, 114]
+    assert analog.mins[:, 1].tolist() == [100, 104, 111, 115, 119]
+
+@pytest.mark.parametrize('typecode,dtype', [('B', numpy.uint8), ('H', numpy.uint16), ('I', numpy.uint32)])
+def test_digital(tmp_path, typecode, dtype):
+    path = str(tmp_path / 'capture.dwfcap')
+    capture.capture(FakeStream(3, chunk_size=5, typecode=typecode, lost={1: 1}), path)
+
+    with dwf.DwfCaptureFile(path) as cap:
+        data = cap.read(3, 9)
+        assert data.dtype == dtype
+        assert data.tolist() == [3, 4, 0, 6, 7, 8]
+        assert cap.chunk(0).tolist() == [0, 1, 2, 3, 4]
+
+def test_not_a_capture(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'\0' * 128)
+
+    with pytest.raises(ValueError):
+        dwf.DwfCaptureFile(str(path))
+
+def test_device_info():
+    with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+        low_level_patch.FDwfEnumDeviceType.return_value = (
+            dwf.DwfDevice.DEVID.DISCOVERY, dwf.DwfDevice.DEVVER.DISCOVERY_B)
+        low_level_patch.FDwfEnumDeviceName.return_value = 'Analog Discovery 2'
+        low_level_patch.FDwfEnumSN.return_value = 'SN:210321A1B2C3'
+        low_level_patch.FDwfEnumUserName.return_value = 'bench'
+        low_level_patch.FDwfEnumConfigInfo.side_effect = \
+            lambda cfg, info: 100 * cfg + int(info)
+
+        info = dwf.DwfDevice(3).info(config=1)
+
+        assert info['deviceName'] == 'Analog Discovery 2'
+        assert info['SN'] == 'SN:210321A1B2C3'
+        assert info['deviceType'] == 'DISCOVERY'
+        assert info['deviceVersion'] == int(dwf.DwfDevice.DEVVER.DISCOVERY_B)
+        assert info['config'] == 1
+        assert info['configInfo']['ANALOG_IN_BUFFER_SIZE'] == \
+            100 + int(dwf.DwfDevice.CONFIGINFO.ANALOG_IN_BUFFER_SIZE)
+        low_level_patch.FDwfEnumConfig.assert_called_once_with(3)
+
+def test_device_info_unknown_type():
+    with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+        low_level_patch.FDwfEnumDeviceType.return_value = (3, 1)
+
+        info = dwf.DwfDevice(0).info()
+
+        assert info['deviceType'] == 3
@@ -0,0 +1,68 @@
+import array
+import unittest.mock
+
+import pytest
+
+import dwf
+
+@pytest.fixture(params=['numpy', 'array'])
+def backend(request):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+        yield
+    else:
+        with unittest.mock.patch.object(dwf._buffer, 'numpy', None):
+            yield
+
+def samples(values):
+    return array.array('d', values)
+
+def test_envelope(backend):
+    view = dwf.DwfDecimator(3, 9, channels=2)
+
+    view.add((samples([1, 5, 2, 0]), samples([0, 0, 0, 0])))
+    view.add((samples([3, 4, 9, 8, 7]), samples([1, 2, 3, 4, 5])))
+
+    low, high = view.envelope()
+    assert view.samples_per_pixel == 3
+    assert view.pixels == 3
+    assert [list(a) for a in low] == [[1, 0, 7], [0, 0, 3]]
+    assert [list(a) for a in high] == [[5, 4, 9], [0, 2, 5]]
+    assert view.start == 0
+
+def test_envelope_scrolls(backend):
+    view = dwf.DwfDecimator(2, 4, channels=1)
+
+    view.add((samples(range(5)),))
+    view.add((samples(range(5, 11)),))
+
+    low, high = view.envelope()
+    assert view.pixels == 5
+    assert list(low[0]) == [6, 8]
+    assert list(high[0]) == [7, 9]
+    assert view.start == 6
+
+def test_logic_envelope(backend):
+    view = dwf.DwfDecimator(4, 8, typecode='B')
+
+    chunk = dwf.DwfStreamChunk(array.array('B', [1, 3, 2, 2, 4, 5]), 0, 0, 0)
+    for _ in view.attach([chunk]):
+        pass
+
+    low, high = view.envelope()
+    assert list(low) == [1, 2, 4]
+    assert list(high) == [3, 2, 5]
+
+def test_lttb(backend):
+    view = dwf.DwfDecimator(4, 12, channels=1, lttb=True)
+
+    view.add((samples([0, 0, 0, 0, 9, 0, 0, 0, 0, 0, 0, 0]),))
+
+    indexes, values = view.points_lttb()
+    # the last pixel is picked when the next one is complete
+    assert list(indexes[0]) == [0, 4, 6]
+    assert list(values[0]) == [0, 9, 0]
+
+def test_lttb_digital():
+    with pytest.raises(ValueError):
+        dwf.DwfDecimator(4, 12, typecode='H', lttb=True)
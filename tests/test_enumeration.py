@@ -0,0 +1,92 @@
+import unittest.mock
+
+import pytest
+
+import dwf
+
+DEVID = dwf.DwfDevice.DEVID
+DEVVER = dwf.DwfDevice.DEVVER
+CONFIGINFO = dwf.DwfDevice.CONFIGINFO
+
+def devices(low_level_patch, count):
+    low_level_patch.FDwfEnum.return_value = count
+    low_level_patch.FDwfEnumDeviceType.side_effect = \
+        lambda idx: (DEVID.DISCOVERY, DEVVER.DISCOVERY_C)
+    low_level_patch.FDwfEnumDeviceName.side_effect = lambda idx: 'AD%d' % idx
+    low_level_patch.FDwfEnumUserName.side_effect = lambda idx: 'user'
+    low_level_patch.FDwfEnumSN.side_effect = lambda idx: 'SN:%d' % idx
+    low_level_patch.FDwfEnumDeviceIsOpened.side_effect = lambda idx: idx == 1
+    low_level_patch.FDwfEnumConfig.return_value = 2
+    low_level_patch.FDwfEnumConfigInfo.side_effect = \
+        lambda cfg, info: 100 * cfg + info
+
+def test_snapshot():
+    with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+        devices(low_level_patch, 2)
+
+        snapshot = dwf.DwfEnumerationSnapshot(dwf.ENUMFILTER.DISCOVERY)
+        calls = len(low_level_patch.mock_calls)
+
+        assert len(snapshot) == 2
+        assert [d.SN for d in snapshot] == ['SN:0', 'SN:1']
+        assert snapshot[0].deviceName == 'AD0'
+        assert snapshot[0].deviceType == DEVID.DISCOVERY
+        assert snapshot[0].deviceVersion == DEVVER.DISCOVERY_C
+        assert type(snapshot[0].deviceVersion) is int
+        assert [d.opened for d in snapshot] == [False, True]
+        assert snapshot[1].configs[1][CONFIGINFO.ANALOG_IN_CHANNEL_COUNT] \
+            == 100 + CONFIGINFO.ANALOG_IN_CHANNEL_COUNT
+        assert snapshot.find('SN:1') is snapshot[1]
+        assert snapshot.find('SN:2') is None
+        with pytest.raises(AttributeError):
+            snapshot[0].extra = 1
+
+        # all read in the first pass
+        assert len(low_level_patch.mock_calls) == calls
+        low_level_patch.FDwfEnum.assert_called_once_with(
+            dwf.ENUMFILTER.DISCOVERY)
+
+def test_snapshot_refresh():
+    with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+        devices(low_level_patch, 1)
+        snapshot = dwf.DwfEnumerationSnapshot()
+        devices(low_level_patch, 3)
+
+        assert len(snapshot) == 1
+        snapshot.refresh()
+        assert len(snapshot) == 3
+
+def test_snapshot_ttl():
+    with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+        devices(low_level_patch, 1)
+        snapshot = dwf.DwfEnumerationSnapshot(ttl=10)
+        devices(low_level_patch, 2)
+
+        assert not snapshot.expired
+        assert len(snapshot) == 1
+        snapshot.timestamp -= 11
+        assert snapshot.expired
+        assert len(snapshot) == 2
+        assert not snapshot.expired
+
+def test_record_open():
+    with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+        with unittest.mock.patch.object(dwf.api, "_HDwf") as hdwf_patch:
+            devices(low_level_patch, 1)
+
+            dwf.DwfEnumerationSnapshot()[0].open(1)
+
+            low_level_patch.FDwfDeviceConfigOpen.assert_called_once_with(0, 1)
+
+def test_snapshot_unknown_device_type():
+    with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+        devices(low_level_patch, 2)
+        low_level_patch.FDwfEnumDeviceType.side_effect = \
+            lambda idx: (3, 2) if idx else (DEVID.DISCOVERY, 99)
+
+        snapshot = dwf.DwfEnumerationSnapshot()
+
+        assert snapshot[0].deviceType is DEVID.DISCOVERY
+        assert snapshot[0].deviceVersion == 99
+        assert (snapshot[1].deviceType, snapshot[1].deviceVersion) == \
+            (3, DEVVER.EEXPLORER_C)
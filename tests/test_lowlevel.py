@@ -0,0 +1,181 @@
+import array
+import ctypes
+
+import pytest
+
+import dwf
+from dwf.lowlevel import _c_array
+
+def test_c_array_shares_memory():
+    buf = array.array('d', [0.0] * 4)
+    arr = _c_array(buf, ctypes.c_double)
+
+    arr[2] = 1.5
+    assert buf[2] == 1.5
+    assert len(arr) == 4
+
+def test_c_array_ctypes_passthrough():
+    buf = (ctypes.c_double * 4)()
+    assert _c_array(buf, ctypes.c_double) is buf
+
+def test_c_array_bytes_any_format():
+    buf = array.array('H', [0] * 4)
+    arr = _c_array(buf, ctypes.c_ubyte)
+
+    arr[1] = 0x12
+    assert len(arr) == 8
+    assert buf[0] == 0x1200
+
+def test_c_array_wrong_format():
+    with pytest.raises(TypeError):
+        _c_array(array.array('f', [0.0] * 4), ctypes.c_double)
+
+def test_c_array_read_only():
+    with pytest.raises(TypeError):
+        _c_array(bytes(32), ctypes.c_ubyte)
+
+def test_c_array_too_small():
+    with pytest.raises(ValueError):
+        _c_array(array.array('d', [0.0] * 4), ctypes.c_double, 5)
+
+@pytest.fixture(params=['numpy', 'python'])
+def backend(request, monkeypatch):
+    if request.param == 'python':
+        monkeypatch.setattr(dwf.lowlevel, '_np', None)
+    elif dwf.lowlevel._np is None:
+        pytest.skip('NumPy is not installed')
+    return request.param
+
+PACK_BITS = [
+    # Bits,                       MSB first, Expected
+    ([],                          False,     b''),
+    ([1, 0, 0, 0, 0, 0, 0, 0],    False,     b'\x01'),
+    ([1, 0, 0, 0, 0, 0, 0, 0],    True,      b'\x80'),
+    ([True, True, False, True],   False,     b'\x0b'),
+    ([True, True, False, True],   True,      b'\xd0'),
+    (b'\x01\x00\x00\x00\x00\x00\x00\x00\x00\x05', False, b'\x01\x02'),
+]
+
+@pytest.mark.parametrize('bits,msb_first,expected', PACK_BITS)
+def test_pack_bits(backend, bits, msb_first, expected):
+    assert dwf.pack_bits(bits, msb_first) == expected
+
+def test_interleave_tristate(backend):
+    expected = [1, 0, 0, 1, 1, 1]
+
+    assert list(dwf.interleave_tristate([1, 0, 1], [0, 1, 1])) == expected
+    assert list(dwf.interleave_tristate([(1, 0), (0, 1), (1, 1)])) == expected
+
+@pytest.mark.parametrize('msb_first', [True, False])
+def test_create_bitdata_stream(backend, msb_first):
+    value = dwf.create_bitdata_stream([0x12, 0x34], 8, msb_first)
+
+    expected = ''.join(format(v, '08b')[::1 if msb_first else -1]
+                       for v in [0x12, 0x34])
+    assert isinstance(value, list)
+    assert value == [c == '1' for c in expected]
+
+def test_create_bus_bitdata_streams(backend):
+    value = dwf.create_bus_bitdata_streams([0b01, 0b10, 0b11], 2)
+
+    assert value == ([True, False, True], [False, True, True])
+
+def test_bitdata_negative_words(backend):
+    assert dwf.create_bitdata_stream([-1, -2], 4) == [True] * 4 + [False] + [True] * 3
+    assert dwf.create_bitdata_stream([-2], 4, True) == [True] * 3 + [False]
+    assert dwf.create_bus_bitdata_streams([-1, 2], 2) == ([True, False],
+                                                          [True, True])
+
+def test_bitdata_wide_words(backend):
+    words = [-1, 1 << 70, (1 << 64) + 1]
+
+    stream = dwf.create_bitdata_stream(words, 72)
+    bus = dwf.create_bus_bitdata_streams(words, 72)
+
+    assert stream == [((v >> i) & 1) == 1 for v in words for i in range(72)]
+    assert bus[70] == [True, True, False]
+    assert bus[0] == [True, False, True]
+    assert dwf.create_bitdata_stream([1 << 64 | 3], 2) == [True, True]
+
+def test_bitdata_as_array():
+    numpy = dwf.lowlevel._np
+    if numpy is None:
+        pytest.skip('NumPy is not installed')
+
+    stream = dwf.create_bitdata_stream([0x12], 8, as_array=True)
+    bus = dwf.create_bus_bitdata_streams([0b01, 0b10], 2, as_array=True)
+
+    assert stream.dtype == numpy.bool_
+    assert stream.tolist() == [c == '1' for c in format(0x12, '08b')[::-1]]
+    assert [d.tolist() for d in bus] == [[True, False], [False, True]]
+
+def test_bitdata_as_array_requires_numpy(monkeypatch):
+    monkeypatch.setattr(dwf.lowlevel, '_np', None)
+
+    with pytest.raises(ImportError):
+        dwf.create_bitdata_stream([0x12], 8, as_array=True)
+    with pytest.raises(ImportError):
+        dwf.create_bus_bitdata_streams([0x12], 8, as_array=True)
+
+DATA_SET = [
+    # rgBits,                                     countOfBits, Expected
+    ([1, 1, 0, 1, 0, 0, 0, 0, 1],                 9,           b'\x0b\x01'),
+    ([(1, 1), (0, 1), (1, 0)],                    6,           b'\x1b'),
+]
+
+@pytest.mark.parametrize('bits,count,expected', DATA_SET)
+def test_digital_out_data_set(backend, monkeypatch, bits, count, expected):
+    calls = []
+    def data_set(hdwf, idxChannel, rgBits, countOfBits):
+        calls.append((hdwf, idxChannel, bytes(rgBits), countOfBits))
+    monkeypatch.setattr(dwf.lowlevel, '_FDwfDigitalOutDataSet', data_set)
+
+    dwf.FDwfDigitalOutDataSet(1, 2, bits)
+
+    assert calls == [(1, 2, expected, count)]
+
+def test_digital_out_data_set_packed(monkeypatch):
+    calls = []
+    def data_set(hdwf, idxChannel, rgBits, countOfBits):
+        calls.append((bytes(rgBits), countOfBits))
+    monkeypatch.setattr(dwf.lowlevel, '_FDwfDigitalOutDataSet', data_set)
+
+    dwf.FDwfDigitalOutDataSet(1, 2, b'\x0b\x01', 9)
+
+    assert calls == [(b'\x0b\x01', 9)]
+
+def capture_node_data(monkeypatch, name):
+    calls = []
+    def node_data(hdwf, idxChannel, node, rgdData, cdData):
+        calls.append((ctypes.addressof(rgdData), list(rgdData)[:cdData], cdData))
+    monkeypatch.setattr(dwf.lowlevel, name, node_data)
+    return calls
+
+@pytest.mark.parametrize('name', ['FDwfAnalogOutNodeDataSet', 'FDwfAnalogOutNodePlayData'])
+def test_analog_out_node_data_no_copy(monkeypatch, name):
+    calls = capture_node_data(monkeypatch, '_' + name)
+    data = array.array('d', [0.0, 0.5, -1.0])
+
+    getattr(dwf, name)(1, 0, 0, data)
+
+    assert calls == [(data.buffer_info()[0], [0.0, 0.5, -1.0], 3)]
+
+@pytest.mark.parametrize('name', ['FDwfAnalogOutNodeDataSet', 'FDwfAnalogOutNodePlayData'])
+@pytest.mark.parametrize('data', [[0, 0.5, -1], (0.0, 0.5, -1.0),
+                                  array.array('f', [0.0, 0.5, -1.0])])
+def test_analog_out_node_data_convert(backend, monkeypatch, name, data):
+    calls = capture_node_data(monkeypatch, '_' + name)
+
+    getattr(dwf, name)(1, 0, 0, data)
+
+    assert [c[1:] for c in calls] == [([0.0, 0.5, -1.0], 3)]
+
+def test_analog_out_play_data(monkeypatch):
+    calls = []
+    def play_data(hdwf, idxChannel, rgdData, cdData):
+        calls.append((list(rgdData), cdData))
+    monkeypatch.setattr(dwf.lowlevel, '_FDwfAnalogOutPlayData', play_data)
+
+    dwf.FDwfAnalogOutPlayData(1, 0, [0.25, 0.5])
+
+    assert calls == [([0.25, 0.5], 2)]
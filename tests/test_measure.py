@@ -0,0 +1,115 @@
+import array
+import math
+import unittest.mock
+
+import pytest
+
+import dwf
+
+@pytest.fixture(params=['numpy', 'array'])
+def backend(request):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+        yield
+    else:
+        with unittest.mock.patch.object(dwf._buffer, 'numpy', None):
+            yield
+
+def square(periods, high, low, period=10, duty=3):
+    '''Square wave starting low, `duty` high samples per `period`'''
+    one = [low] * (period - duty) + [high] * duty
+    return array.array('d', one * periods)
+
+def chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+def test_analog_measure(backend):
+    meas = dwf.DwfAnalogInMeasure(2, 1000.0, level=0.5, hysteresis=0.2)
+    data = square(5, 1.0, 0.0)
+
+    for part in chunks(data, 7): # edges across chunk boundaries
+        meas.add((part, array.array('d', [2.0] * len(part))))
+
+    first, second = meas.results()
+    assert meas.samples == 50
+    assert first['mean'] == pytest.approx(0.3)
+    assert first['rms'] == pytest.approx(math.sqrt(0.3))
+    assert first['ac_rms'] == pytest.approx(math.sqrt(0.3 - 0.09))
+    assert (first['min'], first['max'], first['pk2pk']) == (0.0, 1.0, 1.0)
+    assert first['frequency'] == pytest.approx(100.0)
+    assert first['period'] == pytest.approx(0.01)
+    assert first['duty'] == pytest.approx(0.3)
+    assert second['ac_rms'] == pytest.approx(0.0)
+    assert second['frequency'] is None
+
+def test_analog_measure_hysteresis(backend):
+    meas = dwf.DwfAnalogInMeasure(1, 1000.0, level=0.0, hysteresis=1.0)
+
+    # noise around the level does not make edges
+    meas.add((array.array('d', [0.2, -0.2, 0.6, 0.1, -0.1, 0.3, -0.6, 0.7,
+                                -0.7, 0.8]),))
+
+    assert meas._edges[0].edges == 2 # at 0.7 and 0.8, not at 0.6 (unknown)
+
+def test_analog_measure_chunk(backend):
+    meas = dwf.DwfAnalogInMeasure(1, 1000.0)
+    data = square(4, 2.0, -2.0)
+
+    for i, part in enumerate(chunks(data, 20)):
+        for _ in meas.attach([dwf.DwfStreamChunk((part,), i * 20, 0, 0)]):
+            pass
+
+    result = meas.results()[0]
+    assert meas._levels == [0.0]
+    assert result['frequency'] == pytest.approx(100.0)
+
+def test_digital_measure(backend):
+    meas = dwf.DwfDigitalInMeasure([0, 1, 2], 1e6)
+    data = array.array('B', [(i % 4) | ((i % 8 >= 6) << 2) for i in range(40)])
+
+    for part in chunks(data, 9):
+        meas.add(part)
+
+    results = meas.results()
+    assert results[0]['frequency'] == pytest.approx(0.5e6)
+    assert results[0]['duty'] == pytest.approx(0.5)
+    assert results[1]['frequency'] == pytest.approx(0.25e6)
+    assert results[1]['duty'] == pytest.approx(0.5)
+    assert results[2]['frequency'] == pytest.approx(0.125e6)
+    assert results[2]['duty'] == pytest.approx(0.25)
+    assert results[2]['edges'] == 5
+
+def test_measure_lost_samples(backend):
+    analog = dwf.DwfAnalogInMeasure(1, 1000.0, level=0.5)
+    digital = dwf.DwfDigitalInMeasure([0], 1000.0)
+    data = square(10, 1.0, 0.0)
+    bits = array.array('B', [int(v) for v in data])
+
+    # 1000 samples lost between the two halves
+    analog.add(dwf.DwfStreamChunk((data[:50],), 0, 0, 0))
+    analog.add(dwf.DwfStreamChunk((data[50:],), 1050, 1000, 0))
+    digital.add(dwf.DwfStreamChunk(bits[:50], 0, 0, 0))
+    digital.add(dwf.DwfStreamChunk(bits[50:], 1050, 1000, 0))
+
+    for result in (analog.results()[0], digital.results()[0]):
+        assert result['frequency'] == pytest.approx(100.0)
+        assert result['duty'] == pytest.approx(0.3)
+    assert digital.results()[0]['edges'] == 10
+
+def test_measure_lost_samples_mid_chunk(backend):
+    analog = dwf.DwfAnalogInMeasure(1, 1000.0, level=0.5)
+    digital = dwf.DwfDigitalInMeasure([0], 1000.0)
+    data = square(10, 1.0, 0.0)
+    # 1003 samples lost after sample 45: gluing the parts makes an edge
+    part = data[:45] + data[48:]
+    bits = array.array('B', [int(v) for v in part])
+
+    analog.add(dwf.DwfStreamChunk((part,), 0, 1003, 0, ((45, 1003),)))
+    digital.add(dwf.DwfStreamChunk(bits, 0, 1003, 0, ((45, 1003),)))
+
+    for result in (analog.results()[0], digital.results()[0]):
+        assert result['frequency'] == pytest.approx(100.0)
+        assert result['duty'] == pytest.approx(0.3)
+    assert digital.results()[0]['edges'] == 9
+    assert analog.samples == digital.samples == 97
+    assert analog._edges[0].last == digital._edges[0].last == 1097
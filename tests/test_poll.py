@@ -0,0 +1,78 @@
+import unittest.mock
+
+import pytest
+
+import dwf
+from dwf import poll
+
+class Clock(object):
+    '''Stand-in for time.monotonic'''
+    def __init__(self):
+        self.now = 100.0
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(poll.time, 'monotonic', clock)
+    return clock
+
+def test_poll_interval():
+    assert poll.poll_interval(0.4) == 0.1
+    assert poll.poll_interval(0.04) == pytest.approx(0.01)
+    assert poll.poll_interval(0.0) == poll.POLL_MIN
+    assert poll.poll_interval(100.0) == poll.POLL_MAX
+
+def test_nominal_interval():
+    sched = dwf.DwfPollScheduler(100e3, 8192)
+
+    # half of the buffer at the nominal rate
+    assert sched.interval() == pytest.approx(4096 / 100e3)
+    assert sched.delay() == pytest.approx(4096 / 100e3)
+
+@pytest.mark.parametrize('rate,expected', [(1e9, poll.POLL_MIN), (1.0, poll.POLL_MAX)])
+def test_interval_bounds(rate, expected):
+    assert dwf.DwfPollScheduler(rate, 8192).interval() == expected
+
+def test_follows_faster_fill(clock):
+    sched = dwf.DwfPollScheduler(10e3, 1024)
+    sched.update(0)
+    clock.now += 0.1
+    sched.update(2000) # 20 kHz
+
+    assert sched.fill_rate == pytest.approx(20e3)
+    assert sched.interval() == pytest.approx(512 / 20e3)
+    assert sched.delay() == pytest.approx(512 / 20e3)
+    clock.now += 0.02
+    assert sched.delay() == pytest.approx(512 / 20e3 - 0.02)
+
+def test_smooths_slower_fill(clock):
+    sched = dwf.DwfPollScheduler(10e3, 4096)
+    sched.update(0)
+    clock.now += 0.1
+    sched.update(0)
+
+    assert sched.fill_rate == pytest.approx(10e3 * (1 - sched.SMOOTHING))
+
+def test_max_fill_and_overflows(clock):
+    sched = dwf.DwfPollScheduler(10e3, 1000)
+    sched.update(250)
+    sched.update(800)
+    assert sched.max_fill == pytest.approx(0.8)
+    assert sched.headroom == pytest.approx(0.2)
+    assert sched.overflows == 0
+
+    sched.update(900, lost=200)
+    assert sched.max_fill == pytest.approx(1.1)
+    assert sched.headroom == 0.0
+    assert sched.overflows == 1
+    assert sched.polls == 3
+
+def test_wait(clock):
+    sched = dwf.DwfPollScheduler(10e3, 1024)
+    sched.update(0)
+    with unittest.mock.patch.object(poll.time, 'sleep') as sleep_patch:
+        sched.wait()
+
+    sleep_patch.assert_called_once_with(pytest.approx(512 / 10e3))
@@ -0,0 +1,129 @@
+import time
+import unittest.mock
+
+import pytest
+
+import dwf
+
+def devices(low_level_patch, serials, opened=()):
+    '''Enumerate devices: handles are 100 + index'''
+    low_level_patch.hdwfNone = dwf.lowlevel.hdwfNone
+    low_level_patch.FDwfEnum.return_value = len(serials)
+    low_level_patch.FDwfEnumSN.side_effect = lambda idx: serials[idx]
+    low_level_patch.FDwfEnumDeviceIsOpened.side_effect = \
+        lambda idx: idx in opened
+    low_level_patch.FDwfDeviceOpen.side_effect = lambda idx: 100 + idx
+    low_level_patch.FDwfDeviceConfigOpen.side_effect = \
+        lambda idx, cfg: 200 + idx
+
+@pytest.fixture
+def pool():
+    pool = dwf.DwfHandlePool(idle_timeout=None)
+    with unittest.mock.patch.object(dwf.Dwf, 'pool', pool):
+        yield pool
+
+def test_shared(pool):
+    with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+        devices(low_level_patch, ['SN:A', 'SN:B'])
+
+        first = dwf.DwfAnalogIn()
+        second = dwf.DwfDigitalIn(0)
+
+        assert first.hdwf._as_parameter_ == 100
+        assert second.hdwf._as_parameter_ == 100
+        assert pool.leases('SN:A') == 2
+        low_level_patch.FDwfDeviceOpen.assert_called_once_with(0)
+
+        first.close()
+        first.close()
+        low_level_patch.FDwfDeviceReset.assert_not_called()
+        assert pool.leases('SN:A') == 1
+
+        second.close()
+        assert pool.leases('SN:A') == 0
+        assert low_level_patch.FDwfDeviceReset.call_count == 1
+        low_level_patch.FDwfDeviceClose.assert_not_called()
+
+        third = dwf.DwfAnalogOut()
+        assert third.hdwf._as_parameter_ == 100
+        low_level_patch.FDwfDeviceOpen.assert_called_once_with(0)
+
+def test_keys(pool):
+    with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+        devices(low_level_patch, ['SN:A', 'SN:B'], opened=[0])
+
+        auto = dwf.Dwf()
+        other = dwf.Dwf(0, 3)
+
+        assert auto.hdwf._as_parameter_ == 101 # device 0 used elsewhere
+        assert other.hdwf._as_parameter_ == 200
+        assert pool.leases('SN:B') == 1
+        assert pool.leases('SN:A', 3) == 1
+        assert len(pool) == 2
+        with pytest.raises(RuntimeError):
+            dwf.Dwf(2)
+
+        pool.close()
+        assert len(pool) == 0
+        assert low_level_patch.FDwfDeviceClose.call_count == 2
+
+def test_idle_timeout():
+    pool = dwf.DwfHandlePool(idle_timeout=0.01)
+    with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+        devices(low_level_patch, ['SN:A'])
+
+        lease = pool.lease()
+        lease.close()
+        time.sleep(0.1)
+
+        assert pool.leases('SN:A') is None
+        low_level_patch.FDwfDeviceClose.assert_called_once_with(100)
+
+def test_pooled_handle_not_closed_on_delete(pool):
+    with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+        devices(low_level_patch, ['SN:A'])
+
+        dev = dwf.Dwf()
+        handle = pool._entries[('SN:A', None)].handle
+        del dev
+        handle.__del__()
+
+        assert pool.leases('SN:A') == 0
+        low_level_patch.FDwfDeviceClose.assert_not_called()
+
+def test_no_enumeration_on_hit(pool):
+    with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+        devices(low_level_patch, ['SN:A', 'SN:B'])
+
+        first = dwf.Dwf(1)
+        second = dwf.Dwf(1)
+        third = dwf.Dwf()
+
+        assert third.hdwf._as_parameter_ == 101
+        assert low_level_patch.FDwfEnum.call_count == 1
+        assert low_level_patch.FDwfEnumSN.call_count == 2
+        assert pool.leases('SN:B') == 3
+
+        dwf.Dwf(0)
+        assert low_level_patch.FDwfEnum.call_count == 2
+
+def test_leases_share_device_state(pool):
+    with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+        devices(low_level_patch, ['SN:A'])
+        low_level_patch.FDwfAnalogInFrequencyGet.return_value = 1e6
+
+        first = dwf.DwfAnalogIn()
+        second = dwf.DwfAnalogIn()
+        assert first.hdwf.handle is second.hdwf.handle
+        assert dwf.aio.executor(first) is dwf.aio.executor(second)
+
+        first.shadowCacheSet(True)
+        first.frequencyGet()
+        second.frequencyGet()
+        assert low_level_patch.FDwfAnalogInFrequencyGet.call_count == 1
+
+        first.close()
+        second.close()
+        third = dwf.DwfAnalogIn()
+        third.frequencyGet()
+        assert low_level_patch.FDwfAnalogInFrequencyGet.call_count == 2
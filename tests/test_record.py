@@ -0,0 +1,100 @@
+import array
+import json
+
+import pytest
+
+import dwf
+from dwf import record
+
+numpy = pytest.importorskip('numpy')
+
+class FakeStream(object):
+    '''Record stream of `samples` samples in chunks of 4, losing 2 samples
+    before the second chunk. Sample `n` of channel `c` is `100 * c + n`.'''
+    def __init__(self, samples, channels=None, typecode='d'):
+        self.samples = samples
+        self.channels = channels
+        self.typecode = typecode
+        self.frequency = 1000.0
+
+    def __iter__(self):
+        index = 0
+        while index < self.samples - 2:
+            count = min(4, self.samples - 2 - index)
+            values = range(index, index + count)
+            lost = 2 if index == 4 else 0
+            if self.channels is None:
+                data = array.array(self.typecode, values)
+            else:
+                data = tuple(array.array(self.typecode, [100 * c + v for v in values])
+                             for c in range(len(self.channels)))
+            yield dwf.DwfStreamChunk(data, index, lost, 1 if index == 0 else 0)
+            index += count
+
+def expected(channels, samples):
+    return [[100 * c + v for v in range(samples)] for c in range(channels)]
+
+@pytest.mark.parametrize('name', ['capture.npy', 'capture.bin'])
+def test_analog(tmp_path, name):
+    path = str(tmp_path / name)
+    stream = FakeStream(10, channels=[0, 1])
+
+    info = record.record(stream, path, {'range': [5.0, 5.0]})
+    data, metadata = record.load(path)
+
+    assert data.shape == (2, 10)
+    assert data.dtype == numpy.float64
+    assert data[:, :8].tolist() == expected(2, 8)
+    assert metadata == info
+    assert metadata['samples'] == 8
+    assert metadata['rate'] == 1000.0
+    assert metadata['range'] == [5.0, 5.0]
+    assert metadata['lost'] == [[4, 2]]
+    assert metadata['corrupted'] == [[0, 1]]
+
+@pytest.mark.parametrize('typecode,dtype', [('B', numpy.uint8), ('H', numpy.uint16), ('I', numpy.uint32)])
+@pytest.mark.parametrize('name', ['capture.npy', 'capture.raw'])
+def test_digital(tmp_path, name, typecode, dtype):
+    path = str(tmp_path / name)
+    stream = FakeStream(12, typecode=typecode)
+
+    record.record(stream, path, {'sample_format': 8})
+    data, metadata = record.load(path)
+
+    assert data.shape == (12,)
+    assert data.dtype == dtype
+    assert data[:10].tolist() == list(range(10))
+    assert metadata['samples'] == 10
+
+def test_npy_readable_by_numpy(tmp_path):
+    path = str(tmp_path / 'capture.npy')
+
+    record.record(FakeStream(10, channels=[0, 1, 2]), path)
+
+    data = numpy.load(path)
+    assert data.shape == (3, 10)
+    assert data[2, :8].tolist() == expected(3, 8)[2]
+    with open(path + '.json') as f:
+        assert json.load(f)['dtype'] == '<f8'
+
+def test_raw_header(tmp_path):
+    path = str(tmp_path / 'capture.raw')
+
+    record.record(FakeStream(6, typecode='H'), path)
+
+    with open(path, 'rb') as f:
+        magic, version, offset, nbytes, meta_offset = record.RAW_HEADER.unpack(
+            f.read(record.RAW_HEADER.size))
+        assert (magic, version) == (record.RAW_MAGIC, record.RAW_VERSION)
+        assert (offset, nbytes, meta_offset) == (32, 12, 44)
+        f.seek(offset)
+        assert array.array('H', f.read(8)).tolist() == [0, 1, 2, 3]
+
+def test_unknown_length(tmp_path):
+    with pytest.raises(ValueError):
+        record.record(FakeStream(None), str(tmp_path / 'capture.npy'))
+
+def test_file_full(tmp_path):
+    with record.DwfRecordFile(str(tmp_path / 'capture.raw'), 'd', 1, 2) as f:
+        with pytest.raises(ValueError):
+            f.write(dwf.DwfStreamChunk((array.array('d', [1, 2, 3]),), 0, 0, 0))
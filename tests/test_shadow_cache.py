@@ -0,0 +1,153 @@
+import unittest.mock
+
+import pytest
+
+import dwf
+
+@pytest.fixture
+def low_level_patch():
+    with unittest.mock.patch.object(dwf.api, '_l') as low_level_patch:
+        low_level_patch.hdwfNone = dwf.lowlevel.hdwfNone
+        yield low_level_patch
+
+@pytest.fixture
+def dev(low_level_patch):
+    dev = dwf.DwfAnalogIn()
+    dev.hdwf.pooled = True # not closed by the patched library
+    dev.shadowCacheSet(True)
+    return dev
+
+def test_disabled(low_level_patch):
+    dev = dwf.DwfAnalogIn()
+    dev.hdwf.pooled = True
+
+    dev.frequencyGet()
+    dev.frequencyGet()
+
+    assert not dev.shadowCacheGet()
+    assert low_level_patch.FDwfAnalogInFrequencyGet.call_count == 2
+
+def test_getter_cached(dev, low_level_patch):
+    low_level_patch.FDwfAnalogInChannelRangeGet.side_effect = \
+        lambda hdwf, idx: 5.0 * (idx + 1)
+
+    assert dev.shadowCacheGet()
+    assert [dev.channelRangeGet(i) for i in (0, 1, 0, 1)] == [5, 10, 5, 10]
+    assert low_level_patch.FDwfAnalogInChannelRangeGet.call_count == 2
+
+def test_value_setter_reads_back(dev, low_level_patch):
+    low_level_patch.FDwfAnalogInFrequencyGet.return_value = 1e6
+    low_level_patch.FDwfAnalogInBufferSizeGet.return_value = 8192
+    dev.frequencyGet()
+    dev.bufferSizeGet()
+
+    dev.frequencySet(1.1e6)
+    low_level_patch.FDwfAnalogInFrequencyGet.return_value = 1.111e6
+
+    # coerced by the device
+    assert dev.frequencyGet() == 1.111e6
+    dev.bufferSizeGet()
+    assert low_level_patch.FDwfAnalogInFrequencyGet.call_count == 2
+    assert low_level_patch.FDwfAnalogInBufferSizeGet.call_count == 1
+
+def test_value_setter_drops_dependents(dev, low_level_patch):
+    low_level_patch.FDwfAnalogInTriggerPositionGet.return_value = 0.0
+    dev.frequencyGet()
+    dev.triggerPositionGet()
+
+    dev.triggerLevelSet(1.0) # unrelated
+    dev.frequencyGet()
+    dev.triggerPositionGet()
+    assert low_level_patch.FDwfAnalogInFrequencyGet.call_count == 1
+    assert low_level_patch.FDwfAnalogInTriggerPositionGet.call_count == 1
+
+    dev.frequencySet(1e6) # the position is rounded to the sample period
+    dev.frequencyGet()
+    dev.triggerPositionGet()
+    assert low_level_patch.FDwfAnalogInFrequencyGet.call_count == 2
+    assert low_level_patch.FDwfAnalogInTriggerPositionGet.call_count == 2
+
+def test_exact_setter_updates(dev, low_level_patch):
+    ACQMODE = dwf.DwfAnalogIn.ACQMODE
+    low_level_patch.FDwfAnalogInAcquisitionModeGet.return_value = \
+        ACQMODE.SINGLE
+    low_level_patch.FDwfAnalogInFrequencyGet.return_value = 1e6
+    dev.acquisitionModeGet()
+    dev.frequencyGet()
+
+    dev.acquisitionModeSet(int(ACQMODE.RECORD))
+    dev.channelEnableSet(1, False)
+
+    assert dev.acquisitionModeGet() is ACQMODE.RECORD
+    assert dev.frequencyGet() == 1e6
+    assert low_level_patch.FDwfAnalogInAcquisitionModeGet.call_count == 1
+    # read back: the mode can change the coerced values
+    assert low_level_patch.FDwfAnalogInFrequencyGet.call_count == 2
+    low_level_patch.FDwfAnalogInAcquisitionModeSet.assert_called_once_with(
+        dev.hdwf, ACQMODE.RECORD)
+
+def test_exact_setter_before_get(dev, low_level_patch):
+    dev.acquisitionModeSet(dwf.DwfAnalogIn.ACQMODE.RECORD)
+    dev.channelEnableSet(0, 1)
+
+    assert dev.acquisitionModeGet() is dwf.DwfAnalogIn.ACQMODE.RECORD
+    assert dev.channelEnableGet(0) is True
+    low_level_patch.FDwfAnalogInAcquisitionModeGet.assert_not_called()
+    low_level_patch.FDwfAnalogInChannelEnableGet.assert_not_called()
+
+def test_reset_and_configure(dev, low_level_patch):
+    calls = low_level_patch.FDwfAnalogInFrequencyGet
+
+    dev.frequencyGet()
+    dev.configure(True, False)
+    dev.frequencyGet()
+    assert calls.call_count == 2
+
+    dev.reset()
+    dev.frequencyGet()
+    dev.frequencyGet()
+    assert calls.call_count == 3
+
+def test_shared_by_instruments(dev, low_level_patch):
+    digital = dwf.DwfDigitalIn(dev)
+    low_level_patch.FDwfDigitalInSampleFormatGet.return_value = 16
+    low_level_patch.FDwfDigitalInTriggerSourceGet.return_value = 0
+    low_level_patch.FDwfAnalogInTriggerSourceGet.return_value = 1
+
+    assert digital.sampleFormatGet() == 16
+    assert digital.triggerSourceGet() == dwf.Dwf.TRIGSRC.NONE
+    assert dev.triggerSourceGet() == dwf.Dwf.TRIGSRC.PC
+    dev.reset()                     # Analog In only
+    digital.statusData(4)
+    assert low_level_patch.FDwfDigitalInSampleFormatGet.call_count == 1
+
+    dev.reset(parent=True)          # whole device
+    digital.sampleFormatGet()
+    assert low_level_patch.FDwfDigitalInSampleFormatGet.call_count == 2
+
+    dev.shadowCacheSet(False)
+    assert not digital.shadowCacheGet()
+
+def test_all_channels_setter(dev, low_level_patch):
+    low_level_patch.FDwfAnalogInChannelEnableGet.return_value = False
+    assert not dev.channelEnableGet(0)
+    assert not dev.channelEnableGet(1)
+
+    dev.channelEnableSet(-1, True)
+    low_level_patch.FDwfAnalogInChannelEnableGet.return_value = True
+
+    assert dev.channelEnableGet(0) and dev.channelEnableGet(1)
+    assert low_level_patch.FDwfAnalogInChannelEnableGet.call_count == 4
+
+def test_exact_setter_drops_values(dev, low_level_patch):
+    low_level_patch.FDwfAnalogInBufferSizeGet.return_value = 8192
+    low_level_patch.FDwfAnalogInChannelEnableGet.return_value = True
+    dev.bufferSizeGet()
+    dev.channelEnableGet(1)
+
+    dev.channelEnableSet(1, False)
+    low_level_patch.FDwfAnalogInBufferSizeGet.return_value = 16384
+
+    assert dev.bufferSizeGet() == 16384
+    assert dev.channelEnableGet(1) is False
+    assert low_level_patch.FDwfAnalogInChannelEnableGet.call_count == 1
@@ -0,0 +1,158 @@
+import array
+import threading
+
+import pytest
+
+import dwf
+
+class FakeStream(object):
+    '''Record stream yielding `chunks` chunks of `chunk_size` samples.
+
+    Sample `n` has the value `n`. Every chunk is yielded from the same buffer,
+    like a stream with a single buffer in its ring.
+    '''
+    def __init__(self, chunks, chunk_size=4, channels=None, error=None):
+        self.chunks = chunks
+        self.chunk_size = chunk_size
+        self.channels = channels
+        self.error = error
+        self.lost = 0
+        self.corrupted = 0
+        self.done = threading.Event()
+
+    def __iter__(self):
+        size = self.chunk_size
+        try:
+            if self.channels is None:
+                buf = array.array('H', [0] * size)
+            else:
+                bufs = [array.array('d', [0] * size) for _ in range(self.channels)]
+            for i in range(self.chunks):
+                values = range(i * size, (i + 1) * size)
+                if self.channels is None:
+                    buf[:] = array.array('H', values)
+                    data = buf
+                else:
+                    for c, b in enumerate(bufs):
+                        b[:] = array.array('d', [1000 * c + v for v in values])
+                    data = tuple(bufs)
+                self.lost += 1
+                yield dwf.DwfStreamChunk(data, i * size, 1, 0)
+            if self.error is not None:
+                raise self.error
+        finally:
+            self.done.set()
+
+def expected(chunks, size=4):
+    return [list(range(i * size, (i + 1) * size)) for i in chunks]
+
+def test_block():
+    stream = FakeStream(20)
+
+    with dwf.DwfAcquisitionWorker(stream, maxsize=2) as worker:
+        chunks = [(list(c.data), c.index, c.lost) for c in worker]
+
+    assert chunks == [(d, d[0], 1) for d in expected(range(20))]
+    assert worker.received == 80
+    assert worker.lost == 20
+    assert worker.dropped == 0
+    assert worker.depth == 0
+
+def test_channels():
+    stream = FakeStream(3, channels=2)
+
+    with dwf.DwfAcquisitionWorker(stream) as worker:
+        chunks = [[list(d) for d in c.data] for c in worker]
+
+    assert chunks == [[d, [1000 + v for v in d]] for d in expected(range(3))]
+
+def test_drop_oldest():
+    stream = FakeStream(6)
+
+    with dwf.DwfAcquisitionWorker(stream, 2, 'drop_oldest') as worker:
+        stream.done.wait(5)
+        chunks = [list(c.data) for c in worker]
+
+    assert chunks == expected([4, 5])
+    assert worker.dropped == 16
+    assert worker.received == 24
+
+def test_spill(tmp_path):
+    stream = FakeStream(6)
+
+    with dwf.DwfAcquisitionWorker(stream, 2, 'spill', str(tmp_path)) as worker:
+        stream.done.wait(5)
+        assert worker.depth == 6
+        chunks = [list(c.data) for c in worker]
+
+    assert chunks == expected(range(6))
+    assert worker.spilled == 4
+    assert worker.max_depth == 6
+    assert worker.dropped == 0
+
+def test_spill_read_after_stop(tmp_path):
+    stream = FakeStream(6)
+
+    worker = dwf.DwfAcquisitionWorker(stream, 2, 'spill', str(tmp_path))
+    worker.start()
+    stream.done.wait(5)
+    worker.stop(5)
+    chunks = [list(c.data) for c in worker]
+
+    assert chunks == expected(range(6))
+    assert worker._spill is None
+
+def test_spill_channels(tmp_path):
+    stream = FakeStream(4, channels=2)
+
+    with dwf.DwfAcquisitionWorker(stream, 1, 'spill', str(tmp_path)) as worker:
+        stream.done.wait(5)
+        chunks = [[list(d) for d in c.data] for c in worker]
+
+    assert chunks == [[d, [1000 + v for v in d]] for d in expected(range(4))]
+
+def test_spill_concurrent(tmp_path):
+    stream = FakeStream(2000)
+
+    with dwf.DwfAcquisitionWorker(stream, 1, 'spill', str(tmp_path)) as worker:
+        chunks = [c.index for c in worker]
+
+    assert chunks == [4 * i for i in range(2000)]
+
+def test_end_latched():
+    with dwf.DwfAcquisitionWorker(FakeStream(1)) as worker:
+        assert worker.get() is not None
+        assert worker.get() is None
+        assert worker.get(timeout=0.1) is None
+        assert list(worker) == []
+
+def test_error():
+    stream = FakeStream(2, error=RuntimeError("device lost"))
+
+    with dwf.DwfAcquisitionWorker(stream) as worker:
+        assert list(worker.get().data) == expected([0])[0]
+        assert list(worker.get().data) == expected([1])[0]
+        with pytest.raises(RuntimeError):
+            worker.get()
+        assert worker.get() is None
+
+def test_base_exception():
+    stream = FakeStream(1, error=KeyboardInterrupt())
+
+    with dwf.DwfAcquisitionWorker(stream, 4, 'spill') as worker:
+        assert worker.get() is not None
+        with pytest.raises(KeyboardInterrupt):
+            worker.get()
+
+def test_stop_while_full():
+    stream = FakeStream(1000)
+
+    worker = dwf.DwfAcquisitionWorker(stream, 2).start()
+    worker.get()
+    worker.stop(5)
+
+    assert stream.done.is_set()
+
+def test_overflow_invalid():
+    with pytest.raises(ValueError):
+        dwf.DwfAcquisitionWorker(FakeStream(1), overflow='grow')